@@ -0,0 +1,373 @@
+# =========================
+# allocator.py
+# =========================
+# 자동 선석(안벽 위치) 배정 — 크롤링한 계획에서 최소한만 옮겨 겹침/이격 위반을 없앰
+#   from allocator import allocate
+#   out, report = allocate(norm_df, terminal="SND", allow_time_shift=True, budget_sec=0.5)
+#  - 배정 대상: 시간(start/end)과 터미널이 있는 행 — 선박 길이는 |e - f| (없으면 Length(m), 그것도 없으면 기본값)
+#  - 제약: 안벽 [0, QUAY_LENGTH_M], 선박 가운데(y_m)는 자기 선석 밴드(berth_band) 안,
+#          시간이 겹치는 선박 간 안벽 간격 >= MIN_CLEARANCE_M
+#          allow_time_shift=True면 같은 (terminal, berth) 시간 중첩도 뒤로 미뤄 없앰(validate_df 규칙)
+#  - 목적: Σ |f 이동량| + time_weight × Σ 지연(분)
+#  - 방법: 시작 순 그리디(원래 위치에서 가장 가까운 빈 자리) → 못 놓은 선박은 더 긴 지연/막는 선박과 자리 바꿔 구제
+#          → 시간 예산 안에서 한 척씩 빼고 다시 넣는 지역 탐색
+#          끝내 못 놓은 선박은 원래 행 그대로 두고 보고(장애물로 쓰지 않음)
+#  - 점유 질의는 schema.OccupancyIndex 사용
+import math
+import time
+
+import numpy as np
+import pandas as pd
+
+from schema import (
+    OccupancyIndex, ensure_row_id, MIN_CLEARANCE_M, MOVE_GRID_MIN, QUAY_LENGTH_M,
+)
+
+DEFAULT_LOA_M = 200.0          # 길이를 모를 때 쓰는 선박 길이(m)
+MAX_DELAY_MIN = 24 * 60        # 시간 이동 허용 최대 지연(분)
+MAX_TRIES = 50                 # 한 선박에 시도할 지연 후보 수
+RESCUE_DELAY_MIN = 3 * MAX_DELAY_MIN   # 구제 단계 최대 지연(분)
+RESCUE_TRIES = 4 * MAX_TRIES           # 구제 단계 지연 후보 수
+RESCUE_BLOCKERS = 8                    # 구제 단계에서 자리를 바꿔 볼 막는 선박 수
+RETRY_ROUNDS = 6                       # 그리디를 다시 돌리는 최대 횟수(지연 한도 ×2씩)
+_NS_PER_MIN = 60 * 10**9
+
+def berth_band(terminal: str, berth) -> tuple[float, float]:
+    """선석 번호 → 안벽 구간(m) — 그래프 선석 밴드와 같음(SND 300m×5, GAM 350m×4: 9,8,7,6 순)"""
+    try:
+        b = int(berth)
+    except Exception:
+        return 0.0, float(QUAY_LENGTH_M.get(terminal, 0))
+    if terminal == "SND":
+        return (b - 1) * 300.0, b * 300.0
+    return (9 - b) * 350.0, (10 - b) * 350.0
+
+# ---------------------------------------------------------
+# 배정 단위
+# ---------------------------------------------------------
+class _Vessel:
+    __slots__ = ("rid", "terminal", "berth", "s0", "e0", "f0", "L", "flip", "known", "lo", "hi", "pos", "delay")
+
+    def __init__(self, rid, terminal, berth, s0, e0, f0, L, flip, known):
+        self.rid, self.terminal, self.berth = rid, terminal, berth
+        self.s0, self.e0 = s0, e0          # 원래 시간(ns)
+        self.f0, self.L, self.flip = f0, L, flip   # 원래 아래쪽 끝(m), 길이, f > e 였는지
+        self.known = known                 # f/e가 원래 있었는지(없으면 선석 밴드 가운데가 기준)
+        # 아래쪽 끝 허용 범위: 안벽 안 + 가운데가 선석 밴드 안
+        b0, b1 = berth_band(terminal, berth)
+        quay = float(QUAY_LENGTH_M.get(terminal, 0))
+        self.lo, self.hi = max(0.0, b0 - L / 2.0), min(quay - L, b1 - L / 2.0)
+        self.pos, self.delay = None, 0     # 배정된 아래쪽 끝(m), 지연(ns)
+
+    def rect(self, pos=None, delay=None) -> dict:
+        p = self.pos if pos is None else pos
+        d = self.delay if delay is None else delay
+        return {"terminal": self.terminal, "start": self.s0 + d, "end": self.e0 + d, "f": p, "e": p + self.L}
+
+    def cost(self, time_weight: float, pos=None, delay=None) -> float:
+        p = self.pos if pos is None else pos
+        d = self.delay if delay is None else delay
+        return abs(p - self.f0) + time_weight * d / _NS_PER_MIN
+
+def _vessels(df: pd.DataFrame, terminals) -> list[_Vessel]:
+    out = []
+    L_col = df["Length(m)"] if "Length(m)" in df else pd.Series(np.nan, index=df.index)
+    for r, loa in zip(df.to_dict("records"), L_col):
+        t, s, e = r.get("terminal"), r.get("start"), r.get("end")
+        if t not in terminals or pd.isna(s) or pd.isna(e) or s >= e:
+            continue
+        f, en = pd.to_numeric(r.get("f"), errors="coerce"), pd.to_numeric(r.get("e"), errors="coerce")
+        if pd.notna(f) and pd.notna(en) and abs(float(en) - float(f)) > 0:
+            lo, L, flip, known = min(float(f), float(en)), abs(float(en) - float(f)), float(f) > float(en), True
+        else:
+            L = float(loa) if pd.notna(loa) and float(loa) > 0 else DEFAULT_LOA_M
+            b0, b1 = berth_band(t, r.get("berth"))
+            lo, flip, known = (b0 + b1) / 2.0 - L / 2.0, False, False
+        out.append(_Vessel(r["row_id"], t, r.get("berth"), pd.Timestamp(s).value, pd.Timestamp(e).value,
+                           lo, L, flip, known))
+    return out
+
+# ---------------------------------------------------------
+# 빈 자리 찾기
+# ---------------------------------------------------------
+def _closest_free(p0: float, L: float, blocked, lo: float, hi: float, clearance: float) -> float | None:
+    """
+    아래쪽 끝 p의 허용 범위 [lo, hi]에서 p0에 가장 가까운 빈 자리
+      blocked: 이미 놓인 선박들의 안벽 구간 [(y0, y1)] → p ∈ (y0 - L - c, y1 + c) 금지
+      - 가장자리는 m 단위로 바깥쪽 올림(간격 = clearance 이상 보장)
+    """
+    if hi < lo:
+        return None
+    p = min(max(p0, lo), hi)
+    bad = sorted((y0 - L - clearance, y1 + clearance) for y0, y1 in blocked)
+    merged = []
+    for a, b in bad:
+        if merged and a < merged[-1][1]:
+            merged[-1][1] = max(merged[-1][1], b)
+        else:
+            merged.append([a, b])
+    for a, b in merged:
+        if a < p < b:
+            cands = [c for c in (math.floor(a), math.ceil(b)) if lo <= c <= hi]
+            cands = [c for c in cands if not any(x < c < y for x, y in merged)]
+            return min(cands, key=lambda c: abs(c - p0)) if cands else None
+    return p
+
+def _snap_up(ns: int) -> int:
+    step = MOVE_GRID_MIN * _NS_PER_MIN
+    return -(-ns // step) * step
+
+def _place(v: _Vessel, occ: OccupancyIndex, placed: dict, allow_time_shift: bool, clearance: float,
+           max_delay_min: int = MAX_DELAY_MIN, tries: int = MAX_TRIES):
+    """v를 놓을 (pos, delay) — 지연 0부터, 자리가 없으면 막는 선박이 떠나는 시각으로 미뤄 다시 시도"""
+    delay = 0
+    for _ in range(tries):
+        s, e = v.s0 + delay, v.e0 + delay
+        others = [placed[rid] for rid in occ.query(v.terminal, s, e, exclude=v.rid)]
+        if allow_time_shift:
+            same = [o for o in others if o.berth == v.berth]
+            if same:   # 같은 선석은 시간이 겹치면 안 됨 → 먼저 온 선박이 떠날 때까지
+                delay = _snap_up(max(o.e0 + o.delay for o in same) - v.s0)
+                if delay > max_delay_min * _NS_PER_MIN:
+                    return None
+                continue
+        p = _closest_free(v.f0, v.L, [(o.pos, o.pos + o.L) for o in others], v.lo, v.hi, clearance)
+        if p is not None:
+            return p, delay
+        if not allow_time_shift or not others:
+            return None
+        delay = _snap_up(min(o.e0 + o.delay for o in others) - v.s0)
+        if delay > max_delay_min * _NS_PER_MIN:
+            return None
+    return None
+
+def _reinsert(order, occ: OccupancyIndex, placed: dict, allow_time_shift: bool, clearance: float,
+              time_weight: float) -> bool:
+    """
+    order의 선박들을 모두 빼고 그 순서대로 다시 놓음 → 비용 합이 줄었으면 True(채택)
+      - 못 놓는 선박이 있거나 비용이 줄지 않으면 원래 자리로 되돌리고 False
+    """
+    before = [(v.pos, v.delay) for v in order]
+    old = sum(v.cost(time_weight) for v in order)
+    for v in order:
+        occ.remove(v.rid)
+    ok = True
+    for v in order:
+        got = _place(v, occ, placed, allow_time_shift, clearance)
+        if got is None:
+            ok = False
+            break
+        v.pos, v.delay = got
+        occ.upsert(v.rid, v.rect())
+    if ok and sum(v.cost(time_weight) for v in order) < old - 1e-6:
+        return True
+    for v, (p, d) in zip(order, before):
+        occ.remove(v.rid)
+        v.pos, v.delay = p, d
+    for v in order:
+        occ.upsert(v.rid, v.rect())
+    return False
+
+def _greedy(vs, allow_time_shift: bool, clearance: float, max_delay_min: int = MAX_DELAY_MIN):
+    """vs 순서대로 그리디 → (occ, placed, unplaced) — 못 놓은 선박은 색인에 넣지 않음"""
+    occ, placed, unplaced = OccupancyIndex(), {}, []
+    for v in vs:
+        got = _place(v, occ, placed, allow_time_shift, clearance, max_delay_min=max_delay_min)
+        if got is None:
+            v.pos, v.delay = None, 0
+            unplaced.append(v)
+            continue
+        v.pos, v.delay = got
+        placed[v.rid] = v
+        occ.upsert(v.rid, v.rect())
+    return occ, placed, unplaced
+
+def _put_in(v: _Vessel, got, occ: OccupancyIndex, placed: dict):
+    v.pos, v.delay = got
+    placed[v.rid] = v
+    occ.upsert(v.rid, v.rect())
+
+def _take_out(v: _Vessel, occ: OccupancyIndex, placed: dict):
+    occ.remove(v.rid)
+    placed.pop(v.rid, None)
+
+def _rescue(v: _Vessel, occ: OccupancyIndex, placed: dict, allow_time_shift: bool, clearance: float) -> bool:
+    """
+    그리디에서 못 놓은 v 구제 → 놓았으면 True
+      1) 더 긴 지연 허용(RESCUE_DELAY_MIN, allow_time_shift일 때)
+      2) 원래 시간에 자기 밴드 쪽을 막는 선박들을 빼고 v 먼저 → 뺀 선박들을 시작 순으로 다시
+         (한 척씩, 그다음 막는 선박 전부 — RESCUE_BLOCKERS척까지) — 모두 놓이면 채택, 아니면 되돌림
+    """
+    kw = {"max_delay_min": RESCUE_DELAY_MIN, "tries": RESCUE_TRIES}
+    if allow_time_shift:
+        got = _place(v, occ, placed, allow_time_shift, clearance, **kw)
+        if got is not None:
+            _put_in(v, got, occ, placed)
+            return True
+    blockers = [placed[rid] for rid in
+                occ.query(v.terminal, v.s0, v.e0, v.lo, v.hi + v.L, clearance=clearance, exclude=v.rid)]
+    blockers = blockers[:RESCUE_BLOCKERS]
+    groups = [[u] for u in blockers] + ([blockers] if len(blockers) > 1 else [])
+    for group in groups:
+        before = [(u.pos, u.delay) for u in group]
+        for u in group:
+            _take_out(u, occ, placed)
+        done = []
+        for w in [v] + sorted(group, key=lambda u: (u.s0, u.rid)):
+            got = _place(w, occ, placed, allow_time_shift, clearance, **kw)
+            if got is None:
+                break
+            _put_in(w, got, occ, placed)
+            done.append(w)
+        if len(done) == len(group) + 1:
+            return True
+        for w in done:
+            _take_out(w, occ, placed)
+        v.pos, v.delay = None, 0
+        for u, b in zip(group, before):
+            _put_in(u, b, occ, placed)
+    return False
+
+def _berth_overlaps(vs) -> list:
+    """같은 (terminal, berth)에서 시간이 겹치는 선박 row_id (배정 후 시간 기준)"""
+    groups = {}
+    for v in vs:
+        groups.setdefault((v.terminal, v.berth), []).append(v)
+    bad = set()
+    for g in groups.values():
+        g.sort(key=lambda v: v.s0 + v.delay)
+        last = None    # 지금까지 가장 늦게 떠나는 선박
+        for v in g:
+            if last is not None and v.s0 + v.delay < last.e0 + last.delay:
+                bad.update((v.rid, last.rid))
+            if last is None or v.e0 + v.delay > last.e0 + last.delay:
+                last = v
+    return sorted(bad)
+
+# ---------------------------------------------------------
+# 배정
+# ---------------------------------------------------------
+def allocate(df: pd.DataFrame, terminal: str | None = None, allow_time_shift: bool = False,
+             budget_sec: float = 0.5, time_weight: float = 2.0,
+             clearance: float = MIN_CLEARANCE_M) -> tuple[pd.DataFrame, dict]:
+    """
+    df(정규화) → (배정된 DataFrame, 보고서)
+      terminal: "SND"/"GAM" (None이면 둘 다)
+      allow_time_shift: 자리가 없거나 같은 선석이 겹치면 입항을 MOVE_GRID_MIN 단위로 미룸(당기지는 않음)
+      time_weight: 지연 1분을 안벽 몇 m 이동과 같게 볼지
+      보고서: moved / shifted / unplaced / berth_overlaps (row_id 목록), valid,
+              displacement_m / delay_min / passes / elapsed_s
+      - f/e는 방향(f > e) 유지, bp/y_m은 f와 같은 만큼 옮김
+      - 선박 가운데는 자기 선석 밴드 안에만 놓음
+      - 자리를 못 찾은 선박(unplaced)은 행을 바꾸지 않고 보고 — 배정 선박은 이들을 피하지 않으므로
+        unplaced가 있으면 그 선박과의 겹침은 남을 수 있음
+      - berth_overlaps: 같은 선석 시간 중첩이 남은 선박(allow_time_shift=False면 입력의 중첩은 그대로)
+      - valid: unplaced와 berth_overlaps가 모두 비었을 때만 True
+        (배정 선박끼리 안벽 겹침/이격 위반 없음 + validate_df 선석 시간 중첩 없음)
+    """
+    t0 = time.perf_counter()
+    out = ensure_row_id(df)
+    if out["row_id"].duplicated().any():
+        raise ValueError("row_id 중복 — 배정할 수 없습니다")
+    terminals = {terminal} if terminal else set(QUAY_LENGTH_M)
+    vs = _vessels(out, terminals)
+    vs.sort(key=lambda v: (v.s0, v.rid))
+
+    # 1) 그리디: 시작 순으로 원래 위치에서 가장 가까운 빈 자리
+    #    못 놓은 선박은 더 긴 지연/자리 바꾸기로 구제 → 그래도 남으면 그 선박들을 앞세우고
+    #    지연 한도를 두 배씩 늘려 다시(RETRY_ROUNDS, 시간 이동 허용일 때만 한도 증가)
+    #    가장 적게 남긴 판(같으면 비용 작은 판)을 씀 — 끝내 못 놓은 선박은 보고만(장애물로 넣지 않음)
+    prio, best = [], None
+    for k in range(RETRY_ROUNDS):
+        first = {v.rid for v in prio}
+        order = prio + [v for v in vs if v.rid not in first]
+        limit = MAX_DELAY_MIN * (2 ** k if allow_time_shift else 1)
+        occ, placed, unplaced = _greedy(order, allow_time_shift, clearance, limit)
+        unplaced = [v for v in unplaced if not _rescue(v, occ, placed, allow_time_shift, clearance)]
+        score = (len(unplaced), sum(v.cost(time_weight) for v in placed.values()))
+        if best is None or score < best[2]:
+            best = ({v.rid: (v.pos, v.delay) for v in vs}, unplaced, score)
+        if not unplaced:
+            break
+        new = [v for v in unplaced if v.rid not in first]
+        if not new and not allow_time_shift:
+            break
+        prio = sorted(prio + new, key=lambda v: (v.s0, v.rid))
+    state, unplaced, _ = best
+    occ, placed = OccupancyIndex(), {}
+    for v in vs:
+        v.pos, v.delay = state[v.rid]
+        if v.pos is not None:
+            _put_in(v, (v.pos, v.delay), occ, placed)
+
+    # 2) 지역 탐색: 많이 옮겨진 선박부터
+    #    - 혼자 다시 놓기
+    #    - 원래 자리를 막는 선박 u와 순서 바꿔 놓기(v 먼저 → u) — 둘의 비용 합이 줄면 채택
+    passes = 0
+    deadline = t0 + budget_sec
+    while time.perf_counter() < deadline:
+        passes += 1
+        improved = False
+        for v in sorted(placed.values(), key=lambda v: -v.cost(time_weight)):
+            if time.perf_counter() >= deadline:
+                break
+            if v.cost(time_weight) <= 1e-9:
+                break
+            if _reinsert([v], occ, placed, allow_time_shift, clearance, time_weight):
+                improved = True
+                continue
+            blockers = occ.query(v.terminal, v.s0 + v.delay, v.e0 + v.delay, v.f0, v.f0 + v.L,
+                                 clearance=clearance, exclude=v.rid)
+            for rid in blockers[:3]:
+                if _reinsert([v, placed[rid]], occ, placed, allow_time_shift, clearance, time_weight):
+                    improved = True
+                    break
+        if not improved:
+            break
+
+    # 3) 결과 반영 (열마다 한 번에, 열 dtype 유지)
+    idx = pd.Series(out.index, index=out["row_id"])
+    mv = [v for v in placed.values() if abs(v.pos - v.f0) > 1e-6 or not v.known]
+    sh = [v for v in placed.values() if v.delay]
+
+    def _put(col, labels, values):
+        vals = pd.Series(values, index=labels, dtype="float64" if col not in ("start", "end") else None)
+        if col in out:
+            vals = vals.astype(out[col].dtype)
+        out.loc[labels, col] = vals
+
+    if mv:
+        labs = idx[[v.rid for v in mv]].to_numpy()
+        lo = np.array([v.pos for v in mv])
+        hi = lo + np.array([v.L for v in mv])
+        flip = np.array([v.flip for v in mv])
+        known = np.array([v.known for v in mv])
+        dy = lo - np.array([v.f0 for v in mv])
+        _put("f", labs, np.where(flip, hi, lo))
+        _put("e", labs, np.where(flip, lo, hi))
+        for c in ("bp", "y_m"):
+            old = pd.to_numeric(out.loc[labs, c], errors="coerce").to_numpy(dtype="float64") if c in out \
+                else np.full(len(mv), np.nan)
+            new = np.where(known, old + dy, np.nan if c == "bp" else (lo + hi) / 2.0)
+            if c == "bp":   # 위치가 없던 선박의 bp는 비워 둠
+                new = np.where(known, new, old)
+            _put(c, labs, new)
+    if sh:
+        labs = idx[[v.rid for v in sh]].to_numpy()
+        d = pd.to_timedelta([v.delay for v in sh], unit="ns")
+        _put("start", labs, pd.to_datetime(out.loc[labs, "start"]).to_numpy() + d)
+        _put("end", labs, pd.to_datetime(out.loc[labs, "end"]).to_numpy() + d)
+
+    moved, shifted = [v.rid for v in mv], [v.rid for v in sh]
+    disp = float(sum(abs(v.pos - v.f0) for v in mv if v.known))
+    delay_min = sum(v.delay for v in sh) / _NS_PER_MIN
+
+    overlaps = _berth_overlaps(list(placed.values()) + unplaced)
+    unplaced = [v.rid for v in unplaced]
+    report = {
+        "vessels": len(vs), "moved": moved, "shifted": shifted, "unplaced": unplaced,
+        "berth_overlaps": overlaps, "valid": not unplaced and not overlaps,
+        "displacement_m": round(disp, 1), "delay_min": round(delay_min, 1),
+        "passes": passes, "elapsed_s": round(time.perf_counter() - t0, 4),
+    }
+    return out, report
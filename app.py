@@ -8,11 +8,15 @@
 # - 조회/불러오기 직후에는 테이블만 보이고(시각화 비노출), "시각화하기"나 "저장"을 누르면 보이도록(show_viz).
 # -----------------------------------------------------------------------------
 
+import os
+import json
+
 import streamlit as st
 import pandas as pd
 
 from crawler import collect_berth_info
-from schema import normalize_df, ensure_row_id, sync_raw_with_norm
+from store import save_snapshot, load_snapshot, load_latest_snapshot, latest_snapshot_meta
+from schema import normalize_df, ensure_row_id, sync_raw_with_norm, edited_row_ids, diff_raw_by_key, diff_rows_by_id, renormalize_rows, memory_report
 from ui.sidebar import build_sidebar
 from ui.validation import show_validation
 from ui.table import show_table
@@ -55,6 +59,7 @@ def _init_all_session_keys():
         "edit_df_crawl": pd.DataFrame(),
         "snapshot_crawl": pd.DataFrame(),
         "undo_df_crawl": None,
+        "undo_loglen_crawl": None,
         "logs_crawl": [],
         # 업로드 세트
         "upload_raw": pd.DataFrame(),
@@ -62,10 +67,14 @@ def _init_all_session_keys():
         "edit_df_upload": pd.DataFrame(),
         "snapshot_upload": pd.DataFrame(),
         "undo_df_upload": None,
+        "undo_loglen_upload": None,
         "logs_upload": [],
         # 전역
         "show_viz": False,
         "active_source": "crawl",  # 기본: 크롤러
+        "crawl_meta": None,        # 현재 크롤러 세트의 스냅샷 메타(저장 시각 등)
+        "crawl_changes": None,     # 직전 조회 대비 변경분(diff_raw_by_key)
+        "crawl_metrics": None,     # 마지막 사이트 수집의 단계별 지표(CrawlMetrics.to_dict)
     }
     for k, v in defaults.items():
         _ensure_ss(k, v)
@@ -74,27 +83,199 @@ def _init_all_session_keys():
 # -----------------------------------------------------------------------------
 # 핸들러: 데이터 획득(크롤러/업로드)
 # -----------------------------------------------------------------------------
-def handle_crawl_fetch(add_dims: bool):
+CRAWL_QUERY = {"time": "3days", "route": "ALL", "berth": "A"}   # 조회하기 기본 조건
+SNAPSHOT_FRESH_SEC = 15 * 60   # 이보다 새 스냅샷(스케줄러 등)이 있으면 조회하기 = DB 읽기
+CRAWL_BUDGET_SEC = 15          # 조회하기 전체 시간 예산 — 넘기면 받은 것(+지난 캐시)만으로 먼저 표시
+SOURCE_LABELS = {"berth_A": "신선대(A)표", "berth_B": "감만(B)표", "bp": "BP(G화면)", "dims": "선박 길이/폭"}
+STATUS_LABELS = {"stale": "지난 조회값", "partial": "일부만", "timeout": "시간 초과", "error": "오류"}
+CRAWL_METRICS_PATH = os.environ.get("CRAWL_METRICS_PATH")   # 지정 시 수집 지표를 JSONL로 누적
+
+
+def _snapshot_age_str(meta: dict) -> str:
+    """스냅샷 나이 표기: '방금' / 'N분 전' / 'N시간 전'"""
+    sec = (pd.Timestamp.now() - pd.Timestamp(meta["taken_at"])).total_seconds()
+    if sec < 60:
+        return "방금"
+    if sec < 3600:
+        return f"{int(sec // 60)}분 전"
+    return f"{sec / 3600:.1f}시간 전"
+
+
+def _fresh_snapshot_meta(add_dims: bool):
+    """
+    조회 조건이 같고 SNAPSHOT_FRESH_SEC 이내인 최신 완료 스냅샷의 메타(없으면 None)
+    - 길이/폭을 요청했는데 스냅샷에 없으면 사용하지 않음
+    """
+    try:
+        meta = latest_snapshot_meta()
+    except Exception:
+        return None
+    if meta is None:
+        return None
+    if (meta["v_time"], meta["route"], meta["berth"]) != (CRAWL_QUERY["time"], CRAWL_QUERY["route"], CRAWL_QUERY["berth"]):
+        return None
+    if (pd.Timestamp.now() - pd.Timestamp(meta["taken_at"])).total_seconds() > SNAPSHOT_FRESH_SEC:
+        return None
+    if add_dims and "Length(m)" not in json.loads(meta["columns"]):
+        return None
+    return meta
+
+
+def handle_crawl_fetch(add_dims: bool, force_refresh: bool = False):
     """
     [크롤러 조회] 버튼 클릭 시 호출됩니다.
-    - 원본 수집 → ensure_row_id → normalize_df → 각 세트(crawl_*)에 저장
+    - 충분히 새 스냅샷(스케줄러가 저장)이 있으면 사이트 대신 DB에서 즉시 읽음
+    - 아니면 원본 수집 → 스냅샷 저장 → ensure_row_id → normalize_df → 각 세트(crawl_*)에 저장
+    - force_refresh=True면 스냅샷/응답 캐시를 건너뛰고 사이트에서 새로 받음
     - 시각화는 닫고(테이블만 보이게) show_viz=False
     """
-    with st.spinner("크롤러로 데이터를 가져오는 중입니다..."):
-        raw = collect_berth_info(add_bp=True, add_dims=add_dims)
-        raw = ensure_row_id(raw)
+    meta = None if force_refresh else _fresh_snapshot_meta(add_dims)
+    from_snapshot = meta is not None   # 저장된 스냅샷을 그대로 보여 주는지(방금 저장한 것은 해당 없음)
+    if from_snapshot:
+        raw = load_snapshot(meta["id"])
+    else:
+        with st.spinner("크롤러로 데이터를 가져오는 중입니다..."):
+            raw, metrics = collect_berth_info(**CRAWL_QUERY, add_bp=True, add_dims=add_dims,
+                                              force_refresh=force_refresh, return_metrics=True,
+                                              budget_sec=CRAWL_BUDGET_SEC)
+        st.session_state["crawl_metrics"] = metrics.to_dict()
+        if CRAWL_METRICS_PATH:
+            try:
+                metrics.to_jsonl(CRAWL_METRICS_PATH)
+            except Exception as e:
+                st.warning(f"수집 지표 기록 실패: {e}")
+        # 예산 초과로 일부만 받은 결과는 스냅샷으로 남기지 않음(다음 조회 때 다시 받음)
+        if not raw.attrs.get("partial"):
+            try:
+                if save_snapshot(raw, v_time=CRAWL_QUERY["time"], route=CRAWL_QUERY["route"], berth=CRAWL_QUERY["berth"]):
+                    meta = latest_snapshot_meta()
+            except Exception as e:
+                st.warning(f"스냅샷 저장 실패(화면 표시는 계속): {e}")
+
+    dims_pending = raw.attrs.get("dims_pending", 0)
+    partial = {k: v for k, v in raw.attrs.get("sources", {}).items() if v != "ok"} if raw.attrs.get("partial") else {}
+    raw = ensure_row_id(raw)
+
+    # 직전 조회와 비교 → 바뀐 행만 다시 정규화(나머지는 기존 정규화 행 재사용)
+    prev_raw = st.session_state["crawl_raw"]
+    changes = diff_raw_by_key(prev_raw, raw) if not prev_raw.empty else None
+    norm = None
+    if changes is not None:
+        dirty = changes["added"] + list(changes["changed"])
+        norm = renormalize_rows(st.session_state["crawl_df"], raw, dirty, raw_key="모선항차", norm_key="voyage")
+    norm = _set_crawl_data(raw, norm)
+    st.session_state["crawl_changes"] = changes
+
+    st.session_state["crawl_meta"] = meta
+    st.session_state["active_source"] = "crawl"
+    st.session_state["show_viz"] = False  # 조회 직후엔 테이블만
+    src = f"스냅샷 #{meta['id']}({_snapshot_age_str(meta)})" if from_snapshot else "사이트"
+    st.success(f"조회 완료[{src}]: 원본 {len(raw)}건 / 정규화 {len(norm)}건")
+    if partial:
+        detail = ", ".join(f"{SOURCE_LABELS.get(k, k)}: {STATUS_LABELS.get(v, v)}" for k, v in partial.items())
+        st.warning(f"{CRAWL_BUDGET_SEC}초 안에 다 받지 못해 일부만 표시합니다({detail}). 잠시 후 다시 조회하면 채워집니다.")
+    elif dims_pending:
+        st.info(f"VesselFinder 마감 초과 {dims_pending}척은 길이/폭 없이 표시합니다(다음 조회 때 다시 시도).")
+
+
+def _set_crawl_data(raw: pd.DataFrame, norm: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    크롤러 원본(row_id 포함)을 정규화해 크롤러 세트(crawl_*) 전체를 교체합니다.
+    - norm을 주면(변경분만 재정규화한 결과) 그대로 사용
+    - 정규화 결과를 반환
+    """
+    if norm is None:
         norm = ensure_row_id(normalize_df(raw))
+    st.session_state["crawl_raw"] = raw.copy()
+    st.session_state["crawl_df"] = norm.copy()
+    st.session_state["edit_df_crawl"] = norm.copy()
+    st.session_state["snapshot_crawl"] = norm.copy()
+    st.session_state["undo_df_crawl"] = None
+    st.session_state["undo_loglen_crawl"] = None
+    st.session_state["logs_crawl"] = []
+    return norm
+
+
+def load_saved_snapshot_once():
+    """
+    세션 시작 시 1회: DB에 저장된 최신 스냅샷을 크롤러 세트로 불러옵니다.
+    - 사이트 재조회 없이 즉시 표시(조회하기를 누르면 새로 받아옴)
+    """
+    if st.session_state.get("snapshot_loaded"):
+        return
+    st.session_state["snapshot_loaded"] = True
+    if not st.session_state["crawl_raw"].empty:
+        return
+    try:
+        raw, meta = load_latest_snapshot()
+    except Exception as e:
+        st.warning(f"저장된 스냅샷을 불러오지 못했습니다: {e}")
+        return
+    if meta is None or raw.empty:
+        return
+    _set_crawl_data(ensure_row_id(raw))
+    st.session_state["crawl_meta"] = meta
+    st.session_state["crawl_changes"] = None
 
-        st.session_state["crawl_raw"] = raw.copy()
-        st.session_state["crawl_df"] = norm.copy()
-        st.session_state["edit_df_crawl"] = norm.copy()
-        st.session_state["snapshot_crawl"] = norm.copy()
-        st.session_state["undo_df_crawl"] = None
-        st.session_state["logs_crawl"] = []
 
-        st.session_state["active_source"] = "crawl"
-        st.session_state["show_viz"] = False  # 조회 직후엔 테이블만
-        st.success(f"조회 완료: 원본 {len(raw)}건 / 정규화 {len(norm)}건")
+def render_crawl_changes():
+    """
+    '지난 조회 이후 변경' 목록(추가/삭제/필드 변경)을 접기 블록으로 보여줍니다.
+    - 첫 조회/비교 불가(컬럼 구성 변경 등)일 때는 표시하지 않음
+    """
+    ch = st.session_state.get("crawl_changes")
+    if not ch:
+        return
+    n_add, n_del, n_chg = len(ch["added"]), len(ch["removed"]), len(ch["changed"])
+    if not (n_add or n_del or n_chg):
+        st.caption("지난 조회 이후 변경 없음")
+        return
+    rows = [("추가", k, "", "", "") for k in ch["added"]]
+    rows += [("삭제", k, "", "", "") for k in ch["removed"]]
+    for k, fields in ch["changed"].items():
+        for col, (old, new) in fields.items():
+            rows.append(("변경", k, col, str(old), str(new)))
+    with st.expander(f"🔄 지난 조회 이후 변경 — 추가 {n_add} · 삭제 {n_del} · 변경 {n_chg}", expanded=False):
+        st.dataframe(pd.DataFrame(rows, columns=["구분", "모선항차", "필드", "이전", "이후"]),
+                     height=240, use_container_width=True)
+
+
+def render_crawl_metrics():
+    """
+    마지막 사이트 수집의 단계별 지표(엔드포인트별 지연/바이트, 파싱·BP 결합·선박 조회 시간)를 접기 블록으로 표시
+    - 스냅샷에서 읽은 경우엔 직전 사이트 수집 지표가 그대로 남음
+    """
+    m = st.session_state.get("crawl_metrics")
+    if not m:
+        return
+    with st.expander(f"⏱ 수집 지표 — 전체 {m['wall_s']:.2f}s ({m['started_at']})", expanded=False):
+        ep = pd.DataFrame.from_dict(m["endpoints"], orient="index")
+        if not ep.empty:
+            st.markdown("**HTTP (엔드포인트별)**")
+            st.dataframe(ep, use_container_width=True)
+        c1, c2 = st.columns(2)
+        with c1:
+            st.markdown("**단계별 시간(초, 스레드 합산)**")
+            st.json(m["stages"])
+        with c2:
+            st.markdown("**건수**")
+            st.json(m["counters"])
+            if m.get("dims_hit_rate") is not None:
+                st.caption(f"선박 길이/폭 캐시 적중률: {m['dims_hit_rate']:.0%}")
+
+
+def render_memory_report():
+    """세션에 올라간 DataFrame들의 메모리(정규화 dtype 규약 적용 전 형식 대비 절감량 포함)"""
+    frames = {k: v for k, v in st.session_state.items() if isinstance(v, pd.DataFrame) and not v.empty}
+    if not frames:
+        return
+    rep = memory_report(frames).sort_values("bytes", ascending=False)
+    mb = 1024 * 1024
+    with st.expander(f"🧮 세션 메모리 — {rep['bytes'].sum() / mb:.1f}MB "
+                     f"(이전 형식 대비 -{rep['saved_bytes'].sum() / mb:.1f}MB)", expanded=False):
+        view = rep.assign(**{c: (rep[c] / mb).round(2) for c in ["bytes", "legacy_bytes", "saved_bytes"]})
+        st.dataframe(view.rename(columns={"bytes": "MB", "legacy_bytes": "이전 형식 MB", "saved_bytes": "절감 MB"}),
+                     hide_index=True, use_container_width=True)
 
 
 def handle_file_load(upload_file):
@@ -121,6 +302,7 @@ def handle_file_load(upload_file):
         st.session_state["edit_df_upload"] = norm.copy()
         st.session_state["snapshot_upload"] = norm.copy()
         st.session_state["undo_df_upload"] = None
+        st.session_state["undo_loglen_upload"] = None
         st.session_state["logs_upload"] = []
 
         st.session_state["show_viz"] = False  # 불러오기 직후엔 테이블만
@@ -140,11 +322,13 @@ def _bind_edit_context(source: str):
         st.session_state["edit_df"] = st.session_state["edit_df_crawl"].copy()
         st.session_state["orig_df_snapshot"] = st.session_state["snapshot_crawl"].copy()
         st.session_state["undo_df"] = st.session_state["undo_df_crawl"]
+        st.session_state["undo_loglen"] = st.session_state["undo_loglen_crawl"]
         st.session_state["edit_logs"] = st.session_state["logs_crawl"]
     else:
         st.session_state["edit_df"] = st.session_state["edit_df_upload"].copy()
         st.session_state["orig_df_snapshot"] = st.session_state["snapshot_upload"].copy()
         st.session_state["undo_df"] = st.session_state["undo_df_upload"]
+        st.session_state["undo_loglen"] = st.session_state["undo_loglen_upload"]
         st.session_state["edit_logs"] = st.session_state["logs_upload"]
 
 
@@ -158,14 +342,31 @@ def _persist_edit_context(source: str):
         st.session_state["edit_df_crawl"] = st.session_state["edit_df"].copy()
         st.session_state["snapshot_crawl"] = st.session_state["orig_df_snapshot"].copy()
         st.session_state["undo_df_crawl"] = st.session_state["undo_df"]
+        st.session_state["undo_loglen_crawl"] = st.session_state.get("undo_loglen")
         st.session_state["logs_crawl"] = st.session_state["edit_logs"]
     else:
         st.session_state["edit_df_upload"] = st.session_state["edit_df"].copy()
         st.session_state["snapshot_upload"] = st.session_state["orig_df_snapshot"].copy()
         st.session_state["undo_df_upload"] = st.session_state["undo_df"]
+        st.session_state["undo_loglen_upload"] = st.session_state.get("undo_loglen")
         st.session_state["logs_upload"] = st.session_state["edit_logs"]
 
 
+def _truncate_logs_for_undo(source: str):
+    """
+    되돌리기 시 로그 정리: 되돌리기 지점의 로그 길이(undo_loglen_*)로 잘라냄
+    - 자동 배정/여러 행 이동은 한 번에 로그 여러 건 → 1건만 빼면 저장 시 편집 행으로 잘못 잡힘
+    - 길이가 없으면(이전 세션 상태) 예전처럼 1건 제거
+    """
+    logs = st.session_state[f"logs_{source}"]
+    n = st.session_state.get(f"undo_loglen_{source}")
+    if n is not None:
+        del logs[n:]
+    elif logs:
+        logs.pop()
+    st.session_state[f"undo_loglen_{source}"] = None
+
+
 # -----------------------------------------------------------------------------
 # 사이드바 액션 처리: 시각화/되돌리기/저장
 # -----------------------------------------------------------------------------
@@ -173,7 +374,7 @@ def handle_sidebar_actions(ctrl: dict):
     """
     사이드바의 '시각화하기/되돌리기/저장' 액션을 처리합니다.
     - 시각화하기: show_viz=True
-    - 되돌리기(1회): 편집 대상 세트의 undo 버퍼 적용 + 로그 1건 제거 + 즉시 리렌더
+    - 되돌리기(1회): 편집 대상 세트의 undo 버퍼 적용 + 그 조작이 남긴 로그 묶음 제거 + 즉시 리렌더
     - 저장: 편집 대상 세트의 edit_df → df로 반영, 원본 raw에도 sync, 스냅샷/로그/undo 정리, show_viz=True, 즉시 리렌더
     """
     # 시각화 열기
@@ -188,8 +389,7 @@ def handle_sidebar_actions(ctrl: dict):
             if buf is not None and not getattr(buf, "empty", True):
                 st.session_state["edit_df_crawl"] = buf.copy()
                 st.session_state["undo_df_crawl"] = None
-                if st.session_state["logs_crawl"]:
-                    st.session_state["logs_crawl"].pop()
+                _truncate_logs_for_undo("crawl")
                 st.info("되돌리기 완료(크롤러 데이터).")
                 st.rerun()
         else:
@@ -197,8 +397,7 @@ def handle_sidebar_actions(ctrl: dict):
             if buf is not None and not getattr(buf, "empty", True):
                 st.session_state["edit_df_upload"] = buf.copy()
                 st.session_state["undo_df_upload"] = None
-                if st.session_state["logs_upload"]:
-                    st.session_state["logs_upload"].pop()
+                _truncate_logs_for_undo("upload")
                 st.info("되돌리기 완료(업로드 데이터).")
                 st.rerun()
 
@@ -208,15 +407,17 @@ def handle_sidebar_actions(ctrl: dict):
         if src == "crawl":
             # 정규화 편집본 → 세트 갱신
             st.session_state["crawl_df"] = st.session_state["edit_df_crawl"].copy()
-            # 원본 동기화
+            # 원본 동기화(편집 로그에 남은 행만)
             if not st.session_state["crawl_raw"].empty and "row_id" in st.session_state["crawl_raw"].columns:
                 st.session_state["crawl_raw"] = sync_raw_with_norm(
-                    st.session_state["crawl_raw"], st.session_state["crawl_df"]
+                    st.session_state["crawl_raw"], st.session_state["crawl_df"],
+                    row_ids=edited_row_ids(st.session_state["logs_crawl"]),
                 )
             # 스냅샷/로그/되돌리기 초기화
             st.session_state["snapshot_crawl"] = st.session_state["crawl_df"].copy()
             st.session_state["logs_crawl"] = []
             st.session_state["undo_df_crawl"] = None
+            st.session_state["undo_loglen_crawl"] = None
             st.session_state["show_viz"] = True
             st.success("저장 완료(크롤러 세트 반영).")
             st.rerun()
@@ -224,11 +425,13 @@ def handle_sidebar_actions(ctrl: dict):
             st.session_state["upload_df"] = st.session_state["edit_df_upload"].copy()
             if not st.session_state["upload_raw"].empty and "row_id" in st.session_state["upload_raw"].columns:
                 st.session_state["upload_raw"] = sync_raw_with_norm(
-                    st.session_state["upload_raw"], st.session_state["upload_df"]
+                    st.session_state["upload_raw"], st.session_state["upload_df"],
+                    row_ids=edited_row_ids(st.session_state["logs_upload"]),
                 )
             st.session_state["snapshot_upload"] = st.session_state["upload_df"].copy()
             st.session_state["logs_upload"] = []
             st.session_state["undo_df_upload"] = None
+            st.session_state["undo_loglen_upload"] = None
             st.session_state["show_viz"] = True
             st.success("저장 완료(업로드 세트 반영).")
             st.rerun()
@@ -259,7 +462,8 @@ def render_visualizations_and_validation(ctrl: dict):
         src = ctrl["active_source"]
         df_for_validation = st.session_state["crawl_df"] if src == "crawl" else st.session_state["upload_df"]
         if not df_for_validation.empty:
-            show_validation("정규화 검증", df_for_validation, visible=True, location=ctrl["val_location"])
+            show_validation("정규화 검증", df_for_validation, visible=True, location=ctrl["val_location"],
+                            cache_key=f"validation_{src}")
 
     # 시각화(위/아래 또는 단일)
     if has_crawl and has_upload:
@@ -296,7 +500,7 @@ def _render_raw_panel(source_key: str, label: str, editable: bool):
     """
     원본 테이블 1패널을 렌더링합니다.
     - editable=True (편집 대상)일 때만 '수정하기/되돌리기/저장(표→그래프)' 버튼 노출
-    - 저장 시: 원본 → 정규화 갱신 → 그래프/편집버퍼/스냅샷 갱신 → 즉시 리렌더
+    - 저장 시: 원본 → 정규화 갱신(바뀐 행만) → 그래프/편집버퍼/스냅샷 갱신 → 즉시 리렌더
     """
     df_raw = st.session_state[f"{source_key}_raw"]
     if df_raw.empty:
@@ -310,6 +514,7 @@ def _render_raw_panel(source_key: str, label: str, editable: bool):
         st.session_state[f"{key_prefix}_buffer"] = df_raw.copy()
     if f"{key_prefix}_snapshot" not in st.session_state:
         st.session_state[f"{key_prefix}_snapshot"] = df_raw.copy()
+        st.session_state[f"{key_prefix}_norm_snapshot"] = st.session_state[f"{source_key}_df"].copy()
 
     if editable:
         cols = st.columns([1, 1, 1])
@@ -318,6 +523,8 @@ def _render_raw_panel(source_key: str, label: str, editable: bool):
                 st.session_state[f"{key_prefix}_mode"] = True
                 st.session_state[f"{key_prefix}_buffer"] = df_raw.copy()
                 st.session_state[f"{key_prefix}_snapshot"] = df_raw.copy()
+                # 스냅샷과 짝이 맞는 정규화본 — 편집 중에 다시 조회해 {source}_df가 바뀌어도 저장은 이걸 기준으로
+                st.session_state[f"{key_prefix}_norm_snapshot"] = st.session_state[f"{source_key}_df"].copy()
                 # 반대편 편집 모드 강제 해제(동시 편집 방지)
                 other = "upload" if source_key == "crawl" else "crawl"
                 st.session_state[f"raw_{other}_mode"] = False
@@ -336,14 +543,22 @@ def _render_raw_panel(source_key: str, label: str, editable: bool):
                 st.info("표 되돌리기 완료.")
 
             if save_btn:
-                # 원본 반영 → 정규화 갱신 → 그래프/편집버퍼 갱신
+                # 원본 반영 → 바뀐 행만 다시 정규화(row_id 기준, 나머지는 수정하기 시점 정규화 행 재사용) → 그래프/편집버퍼 갱신
+                edited = ensure_row_id(edited)
+                changes = diff_rows_by_id(st.session_state[f"{key_prefix}_snapshot"], edited)
+                base_norm = st.session_state.get(f"{key_prefix}_norm_snapshot")
+                if changes is None or base_norm is None:
+                    new_norm = ensure_row_id(normalize_df(edited))
+                else:
+                    dirty = changes["added"] + changes["changed"]
+                    new_norm = renormalize_rows(base_norm, edited, dirty)
                 st.session_state[f"{source_key}_raw"] = edited.copy()
-                new_norm = ensure_row_id(normalize_df(st.session_state[f"{source_key}_raw"]))
                 st.session_state[f"{source_key}_df"] = new_norm.copy()
                 st.session_state[f"edit_df_{source_key}"] = new_norm.copy()
                 st.session_state[f"snapshot_{source_key}"] = new_norm.copy()
                 # 편집/되돌리기/로그 초기화
                 st.session_state[f"undo_df_{source_key}"] = None
+                st.session_state[f"undo_loglen_{source_key}"] = None
                 st.session_state[f"logs_{source_key}"] = []
                 # 저장하면 시각화 열고, 즉시 반영
                 st.session_state["show_viz"] = True
@@ -375,6 +590,9 @@ def render_raw_tables(ctrl: dict):
             _render_raw_panel("upload", "업로드", editable=(ctrl["active_source"] == "upload"))
     elif has_crawl:
         st.subheader("📄 원본 데이터(크롤러)")
+        meta = st.session_state.get("crawl_meta")
+        if meta:
+            st.caption(f"스냅샷 #{meta['id']} ({meta['taken_at']:%Y-%m-%d %H:%M}, {_snapshot_age_str(meta)})")
         _render_raw_panel("crawl", "크롤러", editable=True)
     elif has_upload:
         st.subheader("📄 원본 데이터(업로드)")
@@ -398,11 +616,12 @@ def main():
     """
     ctrl = build_sidebar()
     _init_all_session_keys()
+    load_saved_snapshot_once()
 
     # A) 조회/불러오기
     if ctrl["run_crawl"]:
         try:
-            handle_crawl_fetch(add_dims=ctrl["add_dims"])
+            handle_crawl_fetch(add_dims=ctrl["add_dims"], force_refresh=ctrl["force_refresh"])
         except Exception as e:
             st.error(f"오류: {e}")
 
@@ -414,6 +633,9 @@ def main():
 
     # B) 사이드바 액션 (시각화/되돌리기/저장)
     handle_sidebar_actions(ctrl)
+    render_crawl_changes()
+    render_crawl_metrics()
+    render_memory_report()
 
     # C) 상단 시각화 + 검증
     render_visualizations_and_validation(ctrl)
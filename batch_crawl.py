@@ -0,0 +1,130 @@
+# =========================
+# batch_crawl.py
+# =========================
+# 화면 없이 여러 조회 조건을 한 번에 수집 → 정규화 → 열 기반 파일로 저장 (cron/분석용)
+#   python batch_crawl.py --query 3days:ALL:A --query 1week:ALL:B --out exports/
+#   python batch_crawl.py --query 2week:ALL:ALL --format feather --dims --budget 20
+#  - 조건마다 collect_berth_info → normalize_df → exports/berth_<time>_<route>_<berth>.<ext>
+#  - 형식: parquet/feather(pyarrow 필요) — 없으면 CSV로 저장
+#  - Streamlit/Plotly는 import하지 않음(crawler/schema/store만)
+#  - crawler/schema는 실제 수집(crawl_one)에서 import → --help·parse_query만 쓸 때는 pandas만 로드
+import os
+import sys
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+log = logging.getLogger("batch_crawl")
+
+TIMES = ["oneday", "3days", "1week", "2week"]
+BERTHS = ["A", "B", "ALL"]
+FORMATS = ["auto", "parquet", "feather", "csv"]
+TEXT_COLS = ["vessel", "voyage", "berthing", "quarantine", "note"]
+
+def parse_query(text: str) -> tuple[str, str, str]:
+    """'3days:ALL:A' → ("3days", "ALL", "A") — 뒤 항목은 생략 가능(route=ALL, berth=A)"""
+    parts = (text.split(":") + ["ALL", "A"])[:3]
+    v_time, route, berth = parts[0], parts[1] or "ALL", parts[2].upper() or "A"
+    if v_time not in TIMES or berth not in BERTHS:
+        raise argparse.ArgumentTypeError(f"잘못된 조회 조건: {text} (time∈{TIMES}, berth∈{BERTHS})")
+    return v_time, route, berth
+
+def _has_pyarrow() -> bool:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def resolve_format(fmt: str) -> str:
+    """auto/parquet/feather → pyarrow 없으면 csv"""
+    if fmt == "csv":
+        return "csv"
+    if _has_pyarrow():
+        return "parquet" if fmt == "auto" else fmt
+    if fmt != "auto":
+        log.warning("pyarrow 없음: %s 대신 CSV로 저장", fmt)
+    return "csv"
+
+def typed_for_export(norm: pd.DataFrame, v_time: str, route: str, berth: str) -> pd.DataFrame:
+    """
+    정규화 결과를 파일용 타입으로 고정
+      - dtype 규약(compact_dtypes) 그대로: terminal/stype/plan_status 범주, berth int16, 수치 float32, start/end datetime64
+      - 나머지 문자열 열만 string
+      - 조회 조건(q_time/q_route/q_berth)과 수집 시각(crawled_at) 열 추가
+    """
+    from schema import compact_dtypes
+
+    out = compact_dtypes(norm)
+    for c in TEXT_COLS:
+        if c in out:
+            out[c] = out[c].astype("string")
+    out["q_time"], out["q_route"], out["q_berth"] = v_time, route, berth
+    out["crawled_at"] = pd.Timestamp.now().floor("s")
+    return out
+
+def write_frame(df: pd.DataFrame, path_stem: str, fmt: str) -> str:
+    """df → path_stem.<ext> 저장 후 경로"""
+    path = f"{path_stem}.{fmt}"
+    if fmt == "parquet":
+        df.to_parquet(path, index=False)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_csv(path, index=False, encoding="utf-8-sig")
+    return path
+
+def crawl_one(query, out_dir, fmt, add_dims=False, add_bp=True, budget_sec=None, metrics_path=None) -> str:
+    """조건 1개 수집 → 정규화 → 저장 → 파일 경로"""
+    from crawler import collect_berth_info
+    from schema import normalize_df
+
+    v_time, route, berth = query
+    t0 = time.monotonic()
+    raw, metrics = collect_berth_info(time=v_time, route=route, berth=berth, add_bp=add_bp, add_dims=add_dims,
+                                      force_refresh=True, return_metrics=True, budget_sec=budget_sec)
+    if metrics_path:
+        metrics.to_jsonl(metrics_path)
+    if "알림" in raw.columns:
+        raise RuntimeError(f"{v_time}:{route}:{berth} 데이터 없음")
+    norm = typed_for_export(normalize_df(raw), v_time, route, berth)
+    path = write_frame(norm, os.path.join(out_dir, f"berth_{v_time}_{route}_{berth}"), fmt)
+    log.info("%s:%s:%s rows=%d%s → %s (%.1fs)", v_time, route, berth, len(norm),
+             " (partial)" if raw.attrs.get("partial") else "", path, time.monotonic() - t0)
+    return path
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="BPTC 선석배정 일괄 수집 → parquet/feather/csv")
+    ap.add_argument("--query", action="append", type=parse_query,
+                    help="TIME[:ROUTE[:BERTH]] (여러 번 지정 가능, 기본 3days:ALL:A)")
+    ap.add_argument("--out", default="exports", help="출력 디렉터리")
+    ap.add_argument("--format", default="auto", choices=FORMATS)
+    ap.add_argument("--workers", type=int, default=2, help="동시에 수집할 조건 수")
+    ap.add_argument("--dims", action="store_true", help="VesselFinder 길이/폭 포함")
+    ap.add_argument("--no-bp", action="store_true", help="BP(G화면) 생략")
+    ap.add_argument("--budget", type=float, default=None, help="조건별 시간 예산(초)")
+    ap.add_argument("--metrics", help="수집 지표 JSONL 경로")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    queries = list(dict.fromkeys(args.query or [("3days", "ALL", "A")]))
+    fmt = resolve_format(args.format)
+    os.makedirs(args.out, exist_ok=True)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(args.workers, len(queries)))) as pool:
+        futs = {q: pool.submit(crawl_one, q, args.out, fmt, add_dims=args.dims, add_bp=not args.no_bp,
+                               budget_sec=args.budget, metrics_path=args.metrics) for q in queries}
+        for q, f in futs.items():
+            try:
+                f.result()
+            except Exception:
+                failed += 1
+                log.exception("%s 실패", ":".join(q))
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
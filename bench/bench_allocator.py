@@ -0,0 +1,88 @@
+# =========================
+# bench/bench_allocator.py
+# =========================
+# 자동 배정(allocator.allocate) 속도/품질 측정
+#   python bench/bench_allocator.py                      # 합성 2주치 SND+GAM
+#   python bench/bench_allocator.py --days 28 --shift --budget 0.8
+#  - 합성 계획: 선석마다 입항이 이어지고, 계획 위치(f/e)는 선석 밴드 근처 + 흔들림 → 겹침/이격 위반이 섞임
+#  - 배정 전/후 위반 수(점유 색인 conflicts, validate_df)와 이동량·지연·소요시간 출력
+import os
+import sys
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import OccupancyIndex, validate_df, compact_dtypes, SND_BERTHS, GAM_BERTHS, QUAY_LENGTH_M  # noqa: E402
+from allocator import allocate, berth_band  # noqa: E402
+
+def synth_schedule(days: int = 14, seed: int = 0) -> pd.DataFrame:
+    """days일 창 정규화 DataFrame 합성 (선석별로 앞 선박이 떠난 뒤 입항, 가끔 겹침)"""
+    rnd = random.Random(seed)
+    t0 = datetime(2025, 10, 27, 0, 0)
+    t_end = t0 + timedelta(days=days)
+    out = []
+    for t, berths in (("SND", sorted(SND_BERTHS)), ("GAM", sorted(GAM_BERTHS))):
+        for b in berths:
+            s = t0 + timedelta(minutes=rnd.randrange(0, 600, 10))
+            while s < t_end:
+                e = s + timedelta(hours=rnd.randrange(10, 36))
+                L = float(rnd.randrange(140, 340, 10))
+                b0, b1 = berth_band(t, b)
+                f = (b0 + b1) / 2.0 - L / 2.0 + rnd.uniform(-60, 60)
+                i = len(out)
+                out.append({"terminal": t, "berth": b, "vessel": f"VESSEL {i}", "voyage": f"V{i:04d}",
+                            "start": s, "end": e, "bp": f + L / 2.0, "f": f, "e": f + L, "y_m": f + L / 2.0})
+                s = e + timedelta(minutes=rnd.randrange(-180, 600, 10))   # 음수면 앞 선박과 겹침
+    df = pd.DataFrame(out).sort_values("start", kind="stable").reset_index(drop=True)
+    df.insert(0, "row_id", range(len(df)))
+    return compact_dtypes(df)
+
+def quay_conflicts(df: pd.DataFrame) -> int:
+    """시간이 겹치고 안벽 이격(MIN_CLEARANCE_M) 미만인 쌍 수 + 안벽 밖으로 나간 선박 수"""
+    occ = OccupancyIndex(df)
+    pairs = sum(len(occ.conflicts(rid)) for rid in occ.rects) // 2
+    lo = np.minimum(df["f"], df["e"])
+    hi = np.maximum(df["f"], df["e"])
+    quay = df["terminal"].astype(str).map(QUAY_LENGTH_M).astype(float)
+    return pairs + int(((lo < 0) | (hi > quay)).sum())
+
+def new_conflicts(before: pd.DataFrame, after: pd.DataFrame) -> int:
+    """배정 후 위반 쌍 중 배정 전 계획에는 없던 쌍 수"""
+    def pairs(df):
+        occ = OccupancyIndex(df)
+        return {tuple(sorted((rid, o))) for rid in occ.rects for o in occ.conflicts(rid)}
+    return len(pairs(after) - pairs(before))
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="자동 배정 벤치마크")
+    ap.add_argument("--days", type=int, default=14, help="합성 계획 기간(일, SND+GAM)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--budget", type=float, default=0.5, help="지역 탐색 시간 예산(초)")
+    ap.add_argument("--shift", action="store_true", help="입항 시간 이동 허용")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    df = synth_schedule(args.days, args.seed)
+    probs = validate_df(df)
+    print(f"vessels={len(df)}  quay conflicts={quay_conflicts(df)}  validate problems={len(probs)}")
+
+    best, out, rep = float("inf"), None, None
+    for _ in range(args.repeat):
+        t = time.perf_counter()
+        out, rep = allocate(df, allow_time_shift=args.shift, budget_sec=args.budget)
+        best = min(best, time.perf_counter() - t)
+    probs = validate_df(out)
+    print(f"{'best(s)':>8} {'moved':>6} {'shifted':>8} {'unplaced':>9} {'overlap':>8} {'disp(m)':>9} "
+          f"{'delay(min)':>11} {'passes':>7} {'conflicts':>10} {'new':>4} {'problems':>9} {'valid':>6}")
+    print(f"{best:>8.3f} {len(rep['moved']):>6} {len(rep['shifted']):>8} {len(rep['unplaced']):>9} "
+          f"{len(rep['berth_overlaps']):>8} {rep['displacement_m']:>9.0f} {rep['delay_min']:>11.0f} "
+          f"{rep['passes']:>7} {quay_conflicts(out):>10} {new_conflicts(df, out):>4} {len(probs):>9} "
+          f"{str(rep['valid']):>6}")
+
+if __name__ == "__main__":
+    main()
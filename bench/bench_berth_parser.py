@@ -0,0 +1,87 @@
+# =========================
+# bench/bench_berth_parser.py
+# =========================
+# get_berth_status 파서 백엔드 비교 (bs4 html.parser vs lxml)
+#   python bench/bench_berth_parser.py                   # 합성 2주치 페이지
+#   python bench/bench_berth_parser.py --fixtures DIR    # 저장해 둔 응답(*.html)
+#  - 두 경로의 DataFrame 동일 여부(same)와 시간 측정. 다른 페이지가 있으면 종료 코드 1
+#  - crawler.BERTH_TABLE_PARSER를 "lxml"로 바꾸기 전에 저장된 실제 응답으로 돌려 볼 것
+import os
+import sys
+import glob
+import time
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from crawler import _parse_berth_table_bs4, _parse_berth_table_lxml  # noqa: E402
+
+HEADERS = ["선석", "모선항차", "선사", "선박명", "구분", "입항 예정일시", "작업완료 일시", "출항일시",
+           "접안", "검역", "양하", "적하", "S/H", "항로", "비고"]
+
+def synth_page(n_rows: int = 320, seed: int = 0) -> str:
+    """2주(2week) 창 규모의 텍스트표 페이지 합성 (실제 페이지와 같은 table/th/tr/td 구조)"""
+    rnd = random.Random(seed)
+    t0 = datetime(2025, 10, 27, 0, 0)
+    out = ["<html><head><title>berth</title></head><body>",
+           "<table class='tbl' width='100%'>",
+           "<tr>" + "".join(f"<th>{h}</th>" for h in HEADERS) + "</tr>"]
+    for i in range(n_rows):
+        s = t0 + timedelta(minutes=rnd.randrange(0, 14 * 24 * 60, 10))
+        e = s + timedelta(hours=rnd.randrange(8, 40))
+        cells = [
+            f"({rnd.randint(1, 9)})", f"SHP{i:04d}-{rnd.randint(1, 99):03d}", "HMM",
+            f" VESSEL {i} ", rnd.choice(["모선", "피더"]),
+            s.strftime("%Y/%m/%d %H:%M"), e.strftime("%Y/%m/%d %H:%M"), e.strftime("%Y/%m/%d %H:%M"),
+            rnd.choice(["P", "S", ""]), rnd.choice(["완료", ""]),
+            str(rnd.randint(0, 3000)), str(rnd.randint(0, 3000)), "N", "ASIA", "&nbsp;",
+        ]
+        out.append("<tr>" + "".join(f"<td align='center'><font>{c}</font></td>" for c in cells) + "</tr>")
+    out.append("</table></body></html>")
+    return "\n".join(out)
+
+def load_pages(fixtures: str | None, n_rows: int) -> dict[str, str]:
+    if not fixtures:
+        return {"synthetic-2week": synth_page(n_rows)}
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(fixtures, "**", "*.html"), recursive=True)):
+        with open(path, "rb") as fh:
+            pages[os.path.relpath(path, fixtures)] = fh.read().decode("euc-kr", errors="replace")
+    return pages
+
+def timeit(fn, text: str, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        fn(text)
+        best = min(best, time.perf_counter() - t)
+    return best
+
+def main():
+    ap = argparse.ArgumentParser(description="get_berth_status 파서 백엔드 비교")
+    ap.add_argument("--fixtures", help="저장된 응답(*.html) 디렉터리")
+    ap.add_argument("--rows", type=int, default=320, help="합성 페이지 행 수")
+    ap.add_argument("--repeat", type=int, default=20)
+    args = ap.parse_args()
+
+    pages = load_pages(args.fixtures, args.rows)
+    if not pages:
+        sys.exit(f"{args.fixtures}: *.html 없음")
+
+    print(f"{'page':<40} {'rows':>5} {'same':>5} {'bs4(ms)':>9} {'lxml(ms)':>9} {'speedup':>8}")
+    diff = []
+    for name, text in pages.items():
+        a = _parse_berth_table_bs4(text)
+        b = _parse_berth_table_lxml(text)
+        same = a.equals(b) and list(a.columns) == list(b.columns)
+        if not same:
+            diff.append(name)
+        t_bs4 = timeit(_parse_berth_table_bs4, text, args.repeat)
+        t_lxml = timeit(_parse_berth_table_lxml, text, args.repeat)
+        print(f"{name:<40} {len(a):>5} {str(same):>5} {t_bs4 * 1e3:>9.2f} {t_lxml * 1e3:>9.2f} {t_bs4 / t_lxml:>7.1f}x")
+    if diff:
+        sys.exit(f"bs4/lxml 결과 다름: {', '.join(diff)}")
+
+if __name__ == "__main__":
+    main()
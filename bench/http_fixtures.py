@@ -0,0 +1,201 @@
+# =========================
+# bench/http_fixtures.py
+# =========================
+# 크롤러 HTTP 녹화/재생 (네트워크 없이 벤치마크·회귀 확인)
+#   python bench/http_fixtures.py record fixtures/ --time 2week --berth ALL [--dims]
+#   python bench/http_fixtures.py replay fixtures/ --time 2week --berth ALL --latency 0.3
+#  - record: 실제 응답 본문(bytes) + 상태/헤더/인코딩/소요시간을 요청별 파일로 저장
+#  - replay: 같은 요청이면 저장본을 돌려주는 전송 어댑터(HTTPAdapter) — 지연시간 설정 가능
+#  - 크롤러의 BPTC/VesselFinder 세션에 어댑터를 mount 하므로 crawler 코드는 그대로
+#  - 저장 위치: DIR/<host>/<경로 마지막 조각>/<요청키>.html (+ .json 메타)
+#    → bench_berth_parser.py --fixtures DIR/info.bptc.co.kr/Berth_status_text_servlet_sw_kr
+import os
+import sys
+import json
+import time
+import random
+import hashlib
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import cache     # noqa: E402
+import store     # noqa: E402
+import crawler   # noqa: E402
+
+# ---------------------------------------------------------
+# 요청 → 파일 경로
+# ---------------------------------------------------------
+def fixture_key(request: requests.PreparedRequest) -> str:
+    """메서드 + 전체 URL(쿼리 포함) + 본문으로 요청을 식별"""
+    body = request.body or b""
+    if isinstance(body, str):
+        body = body.encode("utf-8")
+    h = hashlib.sha1()
+    h.update(request.method.encode() + b" " + request.url.encode() + b"\n" + body)
+    return h.hexdigest()[:20]
+
+def fixture_path(root: str, request: requests.PreparedRequest) -> str:
+    """DIR/<host>/<경로 마지막 조각>/<키> (확장자 없이)"""
+    parts = urlsplit(request.url)
+    leaf = (parts.path.rstrip("/").rsplit("/", 1)[-1] or "root").replace(".", "_")
+    return os.path.join(root, parts.netloc, leaf, fixture_key(request))
+
+# ---------------------------------------------------------
+# 어댑터
+# ---------------------------------------------------------
+class RecordingAdapter(HTTPAdapter):
+    """실제로 보내고, 받은 응답을 그대로 파일에 남김"""
+    def __init__(self, root: str, **kw):
+        super().__init__(**kw)
+        self.root = root
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def send(self, request, **kw):
+        t0 = time.perf_counter()
+        res = super().send(request, **kw)
+        elapsed = time.perf_counter() - t0
+        body = res.content     # 본문을 끝까지 읽어 둠
+        path = fixture_path(self.root, request)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".html", "wb") as fh:
+            fh.write(body)
+        meta = {
+            "method": request.method, "url": request.url,
+            "body": request.body if isinstance(request.body, str) else None,
+            "status": res.status_code, "reason": res.reason,
+            "headers": dict(res.headers), "encoding": res.encoding,
+            "elapsed": elapsed, "bytes": len(body),
+        }
+        with open(path + ".json", "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, ensure_ascii=False, indent=1)
+        with self._lock:
+            self.count += 1
+        return res
+
+class ReplayAdapter(HTTPAdapter):
+    """
+    녹화본으로 응답(네트워크 없음)
+      latency: 고정 지연(초). None이면 녹화 당시 소요시간 × scale
+      jitter: 지연에 더할 ±무작위(초)
+      - 녹화본이 없으면 404 빈 응답(self.misses에 URL 기록)
+    """
+    def __init__(self, root: str, latency: float | None = None, scale: float = 1.0, jitter: float = 0.0, **kw):
+        super().__init__(**kw)
+        self.root, self.latency, self.scale, self.jitter = root, latency, scale, jitter
+        self.hits, self.misses = 0, []
+        self._lock = threading.Lock()
+
+    def _response(self, request, status, reason, headers, body, encoding):
+        res = requests.Response()
+        res.status_code, res.reason = status, reason
+        res.headers = CaseInsensitiveDict(headers)
+        res._content = body
+        res.encoding = encoding
+        res.url = request.url
+        res.request = request
+        return res
+
+    def send(self, request, **kw):
+        path = fixture_path(self.root, request)
+        try:
+            with open(path + ".json", encoding="utf-8") as fh:
+                meta = json.load(fh)
+            with open(path + ".html", "rb") as fh:
+                body = fh.read()
+        except FileNotFoundError:
+            with self._lock:
+                self.misses.append(request.url)
+            return self._response(request, 404, "Not Recorded", {}, b"", None)
+
+        delay = self.latency if self.latency is not None else meta.get("elapsed", 0.0) * self.scale
+        delay += random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+        if delay > 0:
+            time.sleep(delay)
+        with self._lock:
+            self.hits += 1
+        # 녹화 당시 헤더는 이미 풀린 본문 기준이므로 전송 관련 헤더는 뺌
+        headers = {k: v for k, v in meta["headers"].items()
+                   if k.lower() not in ("content-encoding", "transfer-encoding", "content-length")}
+        return self._response(request, meta["status"], meta.get("reason", ""), headers, body, meta.get("encoding"))
+
+# ---------------------------------------------------------
+# 크롤러 세션에 장착
+# ---------------------------------------------------------
+@contextmanager
+def use_adapter(adapter: HTTPAdapter, isolate: bool = True):
+    """
+    crawler의 BPTC/VesselFinder 세션에 adapter를 mount (종료 시 원복)
+      isolate: 응답 캐시/선박 DB를 임시 파일로 돌려 실제 앱 데이터와 섞이지 않게
+    """
+    sessions = [crawler._bptc_session, crawler._vf_session]
+    saved = [dict(s.adapters) for s in sessions]
+    saved_cache, saved_db = cache.CACHE_PATH, store.DB_URL
+    tmp = tempfile.TemporaryDirectory() if isolate else None
+    try:
+        for s in sessions:
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+        if tmp is not None:
+            cache.CACHE_PATH = os.path.join(tmp.name, "http_cache.sqlite")
+            store.DB_URL = "sqlite:///" + os.path.join(tmp.name, "berth.sqlite")
+            crawler._dims_cache.clear()
+        yield adapter
+    finally:
+        for s, ad in zip(sessions, saved):
+            s.adapters.clear()
+            s.adapters.update(ad)
+        cache.CACHE_PATH, store.DB_URL = saved_cache, saved_db
+        if tmp is not None:
+            tmp.cleanup()
+
+# ---------------------------------------------------------
+# CLI
+# ---------------------------------------------------------
+def _collect(args, **kw):
+    return crawler.collect_berth_info(time=args.time, route=args.route, berth=args.berth,
+                                      add_bp=True, add_dims=args.dims, force_refresh=True, **kw)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="크롤러 HTTP 녹화/재생")
+    ap.add_argument("mode", choices=["record", "replay"])
+    ap.add_argument("dir", help="녹화본 디렉터리")
+    ap.add_argument("--time", default="2week", choices=["oneday", "3days", "1week", "2week"])
+    ap.add_argument("--route", default="ALL")
+    ap.add_argument("--berth", default="ALL", choices=["A", "B", "ALL"])
+    ap.add_argument("--dims", action="store_true", help="VesselFinder 포함")
+    ap.add_argument("--latency", type=float, default=None, help="replay 고정 지연(초), 생략 시 녹화 시간")
+    ap.add_argument("--scale", type=float, default=1.0, help="녹화 시간 배율")
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    if args.mode == "record":
+        with use_adapter(RecordingAdapter(args.dir), isolate=True) as ad:
+            df = _collect(args)
+        print(f"recorded {ad.count} responses → {args.dir} (rows={len(df)})")
+        return
+
+    # replay: 병렬 vs 순차 비교
+    print(f"{'mode':<12} {'best(s)':>8} {'rows':>6} {'hits':>6} {'misses':>7}")
+    for label, kw in [("parallel", {}), ("sequential", {"parallel": False})]:
+        best, rows, ad = float("inf"), 0, None
+        for _ in range(args.repeat):
+            ad = ReplayAdapter(args.dir, latency=args.latency, scale=args.scale, jitter=args.jitter)
+            with use_adapter(ad, isolate=True):
+                t0 = time.perf_counter()
+                df = _collect(args, **kw)
+                best = min(best, time.perf_counter() - t0)
+                rows = len(df)
+        print(f"{label:<12} {best:>8.3f} {rows:>6} {ad.hits:>6} {len(ad.misses):>7}")
+
+if __name__ == "__main__":
+    main()
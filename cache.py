@@ -0,0 +1,177 @@
+# =========================
+# cache.py
+# =========================
+# BPTC 응답(디코딩된 HTML 텍스트) 로컬 캐시
+#  - SQLite 파일 1개 → 같은 호스트의 여러 앱 프로세스가 공유
+#  - 키: 엔드포인트 + 요청 payload/params (time, route, berth, date ...)
+#  - 엔드포인트별 TTL, 용량/건수 상한 초과 시 오래 안 쓴 항목부터 제거(LRU)
+#  - 적중/미스 카운터(프로세스 내 + 파일 공유 누계)
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+
+# ---------------------------------------------------------
+# 설정
+# ---------------------------------------------------------
+CACHE_PATH = os.environ.get(
+    "BPTC_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "http_cache.sqlite"),
+)
+# 엔드포인트별 TTL(초)
+CACHE_TTL_SEC = {
+    "berth_status": 120,   # Berth_status_text_servlet_sw_kr
+    "berth_g": 300,        # berth_g_sw_kr.jsp (BP)
+}
+DEFAULT_TTL_SEC = 120
+CACHE_MAX_BYTES = 64 * 1024 * 1024
+CACHE_MAX_ENTRIES = 2000
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_proc_stats: dict[str, dict[str, int]] = {}
+
+_DDL = """
+CREATE TABLE IF NOT EXISTS responses (
+    key         TEXT PRIMARY KEY,
+    endpoint    TEXT NOT NULL,
+    params      TEXT NOT NULL,
+    body        TEXT NOT NULL,
+    size        INTEGER NOT NULL,
+    created_at  REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_responses_accessed ON responses(accessed_at);
+CREATE TABLE IF NOT EXISTS stats (
+    endpoint TEXT PRIMARY KEY,
+    hits     INTEGER NOT NULL DEFAULT 0,
+    misses   INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+# ---------------------------------------------------------
+# 내부 유틸
+# ---------------------------------------------------------
+def _conn() -> sqlite3.Connection:
+    """스레드별 커넥션(병렬 수집 스레드에서도 안전)"""
+    con = getattr(_local, "con", None)
+    if con is None or getattr(_local, "path", None) != CACHE_PATH:
+        os.makedirs(os.path.dirname(CACHE_PATH) or ".", exist_ok=True)
+        con = sqlite3.connect(CACHE_PATH, timeout=5, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.executescript(_DDL)
+        _local.con, _local.path = con, CACHE_PATH
+    return con
+
+def make_key(endpoint: str, params: dict) -> str:
+    """payload/params를 정렬 직렬화해 해시 (순서 무관 동일 키)"""
+    raw = json.dumps({"endpoint": endpoint, "params": params}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def _count(endpoint: str, field: str):
+    with _stats_lock:
+        st = _proc_stats.setdefault(endpoint, {"hits": 0, "misses": 0})
+        st[field] += 1
+    try:
+        _conn().execute(
+            f"INSERT INTO stats(endpoint, {field}) VALUES (?, 1) "
+            f"ON CONFLICT(endpoint) DO UPDATE SET {field} = {field} + 1",
+            (endpoint,),
+        )
+    except sqlite3.Error:
+        pass
+
+def _evict(con: sqlite3.Connection):
+    """용량/건수 상한을 넘으면 accessed_at 오래된 순으로 제거"""
+    n, total = con.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+    if n <= CACHE_MAX_ENTRIES and total <= CACHE_MAX_BYTES:
+        return
+    over_n = max(0, n - CACHE_MAX_ENTRIES)
+    over_b = max(0, total - CACHE_MAX_BYTES)
+    drop, freed = [], 0
+    for key, size in con.execute("SELECT key, size FROM responses ORDER BY accessed_at ASC"):
+        if len(drop) >= over_n and freed >= over_b:
+            break
+        drop.append((key,))
+        freed += size
+    con.executemany("DELETE FROM responses WHERE key = ?", drop)
+
+# ---------------------------------------------------------
+# 공개 API
+# ---------------------------------------------------------
+def cache_get(endpoint: str, params: dict, max_age: float | None = None) -> str | None:
+    """
+    캐시된 본문 반환(없거나 만료면 None)
+      max_age: TTL 덮어쓰기(초). None이면 CACHE_TTL_SEC[endpoint]
+    """
+    ttl = CACHE_TTL_SEC.get(endpoint, DEFAULT_TTL_SEC) if max_age is None else max_age
+    key = make_key(endpoint, params)
+    now = time.time()
+    try:
+        con = _conn()
+        row = con.execute("SELECT body, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or now - row[1] > ttl:
+            _count(endpoint, "misses")
+            return None
+        con.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+    except sqlite3.Error:
+        return None
+    _count(endpoint, "hits")
+    return row[0]
+
+def cache_has(endpoint: str, params: dict, max_age: float | None = None) -> bool:
+    """유효한 캐시가 있는지(적중/실패 통계·LRU 시각은 건드리지 않음)"""
+    ttl = CACHE_TTL_SEC.get(endpoint, DEFAULT_TTL_SEC) if max_age is None else max_age
+    try:
+        row = _conn().execute("SELECT created_at FROM responses WHERE key = ?",
+                              (make_key(endpoint, params),)).fetchone()
+    except sqlite3.Error:
+        return False
+    return row is not None and time.time() - row[0] <= ttl
+
+def cache_put(endpoint: str, params: dict, body: str):
+    """본문 저장(같은 키면 덮어씀) 후 상한 초과분 제거"""
+    key = make_key(endpoint, params)
+    now = time.time()
+    try:
+        con = _conn()
+        con.execute(
+            "INSERT OR REPLACE INTO responses(key, endpoint, params, body, size, created_at, accessed_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (key, endpoint, json.dumps(params, sort_keys=True, ensure_ascii=False),
+             body, len(body.encode("utf-8")), now, now),
+        )
+        _evict(con)
+    except sqlite3.Error:
+        pass
+
+def cache_stats() -> dict:
+    """
+    {"process": {endpoint: {hits, misses}}, "shared": {endpoint: {hits, misses}},
+     "entries": n, "bytes": total}
+    """
+    out = {"process": {k: dict(v) for k, v in _proc_stats.items()}, "shared": {}, "entries": 0, "bytes": 0}
+    try:
+        con = _conn()
+        for ep, h, m in con.execute("SELECT endpoint, hits, misses FROM stats"):
+            out["shared"][ep] = {"hits": h, "misses": m}
+        out["entries"], out["bytes"] = con.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+    except sqlite3.Error:
+        pass
+    return out
+
+def cache_clear():
+    """응답/카운터 전부 삭제"""
+    with _stats_lock:
+        _proc_stats.clear()
+    try:
+        con = _conn()
+        con.execute("DELETE FROM responses")
+        con.execute("DELETE FROM stats")
+    except sqlite3.Error:
+        pass
@@ -3,11 +3,40 @@
 # =========================================================
 import time
 import re
+import html
+import asyncio
+import logging
+import threading
+from time import perf_counter, monotonic
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup
 from datetime import datetime
 from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout
+from requests.adapters import HTTPAdapter
+
+import metrics
+from cache import cache_get, cache_put, cache_has
+from schema import _coerce_datetime_series
+
+log = logging.getLogger("crawler")
+
+# ---------------------------------------------------------
+# BPTC 공용 세션 (keep-alive 재사용)
+#   - A/B 텍스트표, G 화면을 같은 세션으로 요청 → TCP/TLS 핸드셰이크 1회
+#   - 병렬 수집 시 스레드들이 함께 쓰므로 풀 크기를 넉넉히
+# ---------------------------------------------------------
+BPTC_POOL_SIZE = 8
+DEFAULT_WORKERS = 3   # A표 · B표 · G화면
+
+def _make_bptc_session() -> requests.Session:
+    sess = requests.Session()
+    adapter = HTTPAdapter(pool_connections=BPTC_POOL_SIZE, pool_maxsize=BPTC_POOL_SIZE)
+    sess.mount("https://", adapter)
+    sess.mount("http://", adapter)
+    return sess
+
+_bptc_session = _make_bptc_session()
 
 # =========================================================
 # 도움 함수 
@@ -33,26 +62,55 @@ def _note_status_from_plan_cd(plan_cd: str) -> tuple[str, str]:
 # ---------------------------------------------------------
 # 1) 신선대·감만 선석배정 텍스트표 (원본 그대로)
 # ---------------------------------------------------------
-def get_berth_status(time="3days", route="ALL", berth="A"):
-    """
-    신선대감만터미널 선석배정 현황 조회
-    """
-    url = "https://info.bptc.co.kr/Berth_status_text_servlet_sw_kr"
-    payload = {
+BERTH_STATUS_URL = "https://info.bptc.co.kr/Berth_status_text_servlet_sw_kr"
+
+def _berth_status_payload(time, route, berth) -> dict:
+    return {
         "v_time": time,
         "ROCD": route,
         "v_oper_cd": "",
         "ORDER": "item1",
         "v_gu": berth,
     }
+
+def _fetch_berth_status_text(time="3days", route="ALL", berth="A", session=None, force_refresh=False,
+                             timeout=20) -> str:
+    """텍스트표 응답 본문(EUC-KR 디코딩) — 캐시 우선, force_refresh면 네트워크 강제"""
+    payload = _berth_status_payload(time, route, berth)
+    m = metrics.current()
+    if not force_refresh:
+        cached = cache_get("berth_status", payload)
+        if cached is not None:
+            if m:
+                m.add_http("berth_status", payload, cached=True)
+            return cached
+
     headers = {
         "Content-Type": "application/x-www-form-urlencoded",
         "Referer": "https://info.bptc.co.kr/content/sw/frame/berth_status_text_frame_sw_kr.jsp?p_id=BETX_SH_KR&snb_num=2&snb_div=service",
     }
-    res = requests.post(url, data=payload, headers=headers, timeout=20)
+    sess = session or _bptc_session
+    t0 = perf_counter()
+    res = sess.post(BERTH_STATUS_URL, data=payload, headers=headers, timeout=timeout)
+    t1 = perf_counter()
     res.encoding = "euc-kr"
+    text = res.text
+    if m:
+        m.add_http("berth_status", payload, cached=False, status=res.status_code,
+                   latency_s=t1 - t0, nbytes=len(res.content), decode_s=perf_counter() - t1)
+    if res.ok:
+        cache_put("berth_status", payload, text)
+    return text
 
-    soup = BeautifulSoup(res.text, "html.parser")
+# "bs4"(기본, 원본 html.parser 경로) | "lxml"(빠름)
+#  - lxml은 저장된 실제 응답으로 bench/bench_berth_parser.py --fixtures 동일성 확인 후 전환
+BERTH_TABLE_PARSER = "bs4"
+
+def _parse_berth_table_bs4(text: str) -> pd.DataFrame:
+    """원본 경로: BeautifulSoup(html.parser)로 첫 table → list-of-lists"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(text, "html.parser")
     table = soup.find("table")
     if not table:
         return pd.DataFrame()
@@ -66,19 +124,144 @@ def get_berth_status(time="3days", route="ALL", berth="A"):
 
     return pd.DataFrame(rows, columns=headers_list)
 
+def _cell_text(el) -> str:
+    """bs4 get_text(strip=True)와 동일: 텍스트 조각별 strip 후 이어붙임"""
+    return "".join(t.strip() for t in el.itertext())
+
+# html.parser와 lxml의 트리가 갈리는 경우 → bs4 경로로
+#  - 닫지 않은 <td>/<th>/<tr>: html.parser는 다음 칸을 안쪽에 중첩(바깥 칸 글자에 뒤 칸이 붙음), lxml은 형제로 닫음
+_CELL_OPEN_RE = re.compile(r"<(td|th|tr)[\s>]", re.I)
+_CELL_CLOSE_RE = re.compile(r"</(td|th|tr)\s*>", re.I)
+
+def _cells_balanced(text: str) -> bool:
+    return len(_CELL_OPEN_RE.findall(text)) == len(_CELL_CLOSE_RE.findall(text))
+
+def _parse_berth_table_lxml(text: str) -> pd.DataFrame:
+    """
+    lxml 경로: 첫 table을 C 파서로 읽고 열 단위로 바로 구성
+      - 헤더/행 선택 규칙은 bs4 경로와 동일(th 전체, 첫 tr 제외, 빈 행 제외)
+      - <script>/<style> 글자는 빼고 읽음(bs4 get_text와 같게)
+      - 모든 행 길이가 헤더와 같으면 열 리스트로 조립, 아니면 원본과 같은 행 리스트 경로
+      - 파싱 실패(XML/인코딩 선언으로 시작하는 문자열 포함)나 칸 태그가 안 닫힌 표는 bs4 경로
+    """
+    import lxml.html   # 선택 백엔드 — 이 경로를 탈 때만 로드
+
+    if not text or not text.strip():
+        return pd.DataFrame()
+    if not _cells_balanced(text):
+        return _parse_berth_table_bs4(text)
+    try:
+        doc = lxml.html.document_fromstring(text)
+    except (lxml.etree.ParserError, ValueError):
+        return _parse_berth_table_bs4(text)
+    table = next(doc.iter("table"), None)
+    if table is None:
+        return pd.DataFrame()
+    lxml.etree.strip_elements(table, "script", "style", with_tail=False)
+
+    headers_list = [_cell_text(th) for th in table.iter("th")]
+    rows = []
+    for tr in list(table.iter("tr"))[1:]:
+        cols = [_cell_text(td) for td in tr.iter("td")]
+        if cols:
+            rows.append(cols)
+
+    n = len(headers_list)
+    if n == 0 or not rows or any(len(r) != n for r in rows):
+        return pd.DataFrame(rows, columns=headers_list)
+    out = pd.DataFrame({i: list(col) for i, col in enumerate(zip(*rows))})
+    out.columns = headers_list
+    return out
+
+def get_berth_status(time="3days", route="ALL", berth="A", session=None, force_refresh=False, parser=None,
+                     timeout=20):
+    """
+    신선대감만터미널 선석배정 현황 조회
+      session: 재사용할 requests.Session (None이면 BPTC 공용 세션)
+      force_refresh: True면 캐시를 건너뛰고 새로 받음(받은 결과는 캐시에 저장)
+      parser: "bs4" | "lxml" (None이면 BERTH_TABLE_PARSER) — 결과 DataFrame은 동일
+      timeout: 요청 타임아웃(초)
+      - 정확히 같은 조회의 캐시가 없으면 더 넓은 기간 조회의 캐시를 잘라서 답함(plan_berth_query)
+    """
+    if not force_refresh and not cache_has("berth_status", _berth_status_payload(time, route, berth)):
+        sliced = plan_berth_query(time, route, berth, parser=parser)
+        if sliced is not None:
+            return sliced
+    text = _fetch_berth_status_text(time=time, route=route, berth=berth,
+                                    session=session, force_refresh=force_refresh, timeout=timeout)
+    return _parse_berth_table(text, parser)
+
+def _parse_berth_table(text: str, parser=None) -> pd.DataFrame:
+    with metrics.stage("parse_berth_table"):
+        if (parser or BERTH_TABLE_PARSER) == "bs4":
+            df = _parse_berth_table_bs4(text)
+        else:
+            df = _parse_berth_table_lxml(text)
+    metrics.count("berth_rows", len(df))
+    return df
+
 # ---------------------------------------------------------
-# 2) G 화면에서 BP(Bitt) 정보 (원본 그대로)
+# 1-1) 조회 계획: 캐시된 더 넓은 조회로 좁은 조회에 답하기
+#   - 기간: oneday ⊂ 3days ⊂ 1week ⊂ 2week (모두 오늘 기준 앞으로 N일, 같은 항로·선석끼리만)
+#     → 넓은 표에서 입항·출항 시각이 모두 마감(오늘 00:00 + N일) 전인 행만 남김
+#     → 마감에 걸친 행(입항은 전, 출항은 후)이나 시각을 못 읽는 행이 하나라도 있으면 잘라 쓰지 않음
+#       (사이트가 입항/출항 중 무엇으로 기간을 거르는지 녹화본으로 확인 전 — 어느 쪽이든 답이 같은 경우만)
+#   - 항로(ROCD)는 덮지 않음: 표의 항로 열 글자가 ROCD 코드와 같다는 근거가 없음(녹화본은 항로명)
+#   - 선석(A/B)은 서로 다른 표라 덮지 않음
 # ---------------------------------------------------------
-def get_all_bp_data(date=None):
+WINDOW_DAYS = {"oneday": 1, "3days": 3, "1week": 7, "2week": 14}
+
+def _covering_queries(time: str, route: str) -> list[tuple[str, str]]:
+    """(time, route)를 덮는 다른 조회들 — 같은 항로의 더 넓은 기간, 좁은 것부터"""
+    days = WINDOW_DAYS.get(time)
+    if days is None:
+        return []
+    return [(t, route) for t, d in sorted(WINDOW_DAYS.items(), key=lambda kv: kv[1]) if d > days]
+
+def _slice_berth_table(df: pd.DataFrame, time: str, src_time: str, today=None):
+    """넓은 기간 결과 → 좁은 기간 결과 (기준 열이 없거나 마감에 걸친/못 읽는 행이 있으면 None)"""
+    if src_time == time:
+        return df.reset_index(drop=True)
+    s_col = next((c for c in _START_COLS if c in df.columns), None)
+    e_col = next((c for c in _END_COLS if c in df.columns), None)
+    if s_col is None or e_col is None:
+        return None
+    start = pd.to_datetime(_coerce_datetime_series(df[s_col]))
+    end = pd.to_datetime(_coerce_datetime_series(df[e_col]))
+    if start.isna().any() or end.isna().any():
+        return None
+    today = pd.Timestamp(today if today is not None else datetime.now()).normalize()
+    cutoff = today + pd.Timedelta(days=WINDOW_DAYS[time])
+    s_in, e_in = start < cutoff, end < cutoff
+    if (s_in != e_in).any():
+        return None
+    return df[s_in].reset_index(drop=True)
+
+def plan_berth_query(time="3days", route="ALL", berth="A", parser=None):
     """
-    한 날짜의 모든 BP(Bitt) + 참고(note) + 상태(plan_status)
-    { (ship_cd, call_no): {"bitt": "...(F: n, E: m)", "note": "...", "plan_status": "..."} }
+    캐시(유효기간 내)에 이 조회를 덮는 더 넓은 조회가 있으면 잘라서 DataFrame, 없으면 None
+      - 네트워크는 타지 않음(없으면 호출한 쪽이 정확한 조회로 받음)
     """
-    if date is None:
-        date = datetime.now().strftime("%Y-%m-%d")
+    for src_time, src_route in _covering_queries(time, route):
+        payload = _berth_status_payload(src_time, src_route, berth)
+        if not cache_has("berth_status", payload):
+            continue
+        text = cache_get("berth_status", payload)
+        if text is None:
+            continue
+        sliced = _slice_berth_table(_parse_berth_table(text, parser), time, src_time)
+        if sliced is not None:
+            metrics.count("planner_hits")
+            return sliced
+    return None
+
+# ---------------------------------------------------------
+# 2) G 화면에서 BP(Bitt) 정보 (원본 그대로)
+# ---------------------------------------------------------
+BERTH_G_URL = "https://info.bptc.co.kr/content/sw/jsp/berth_g_sw_kr.jsp"
 
-    url = "https://info.bptc.co.kr/content/sw/jsp/berth_g_sw_kr.jsp"
-    params = {
+def _berth_g_params(date: str) -> dict:
+    return {
         "p_id": "BEGR_SH_KR",
         "snb_num": "2",
         "pop_ok": "Y",
@@ -86,91 +269,315 @@ def get_all_bp_data(date=None):
         "v_dt": date,
         "sub": "+%C8%AE+%C0%CE+",
     }
+
+def _fetch_berth_g_text(date: str, session=None, force_refresh=False, timeout=20) -> str:
+    """G 화면 응답 본문(EUC-KR 디코딩) — 날짜별로 캐시"""
+    params = _berth_g_params(date)
+    m = metrics.current()
+    if not force_refresh:
+        cached = cache_get("berth_g", params)
+        if cached is not None:
+            if m:
+                m.add_http("berth_g", {"v_dt": date}, cached=True)
+            return cached
+
     headers = {
         "Referer": "https://info.bptc.co.kr/content/sw/frame/berth_g_frame_sw_kr.jsp?p_id=BEGR_SH_KR&snb_num=2&snb_div=service",
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36",
     }
-    res = requests.get(url, params=params, headers=headers, timeout=20)
+    sess = session or _bptc_session
+    t0 = perf_counter()
+    res = sess.get(BERTH_G_URL, params=params, headers=headers, timeout=timeout)
+    t1 = perf_counter()
     res.encoding = "euc-kr"
+    text = res.text
+    if m:
+        m.add_http("berth_g", {"v_dt": date}, cached=False, status=res.status_code,
+                   latency_s=t1 - t0, nbytes=len(res.content), decode_s=perf_counter() - t1)
+    if res.ok:
+        cache_put("berth_g", params, text)
+    return text
 
-    soup = BeautifulSoup(res.text, "html.parser")
-    bp_dict = {}
+# VslMsg('..', ship_cd, .., call_no, .., .., .., plan_cd, .., .., bitt, ..) — 12개 인자
+_VSLMSG_RE = re.compile(
+    r"VslMsg\('([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)'\)"
+)
+# 원문 토큰: 주석/스크립트(건너뜀) | <section>/</section> | <a ...> (따옴표 안의 '>'는 태그 끝이 아님)
+_TAG_ATTRS = r"((?:[^>\"']|\"[^\"]*\"|'[^']*')*)"
+_BP_TOKEN_RE = re.compile(
+    r"<!--.*?-->|<script\b.*?</script\s*>|<(/?)section\b" + _TAG_ATTRS + r">|<a\b" + _TAG_ATTRS + r">",
+    re.I | re.S,
+)
+_LAYER1_ID_RE = re.compile(r"\sid\s*=\s*([\"']?)layer1\1(?=[\s/]|$)", re.I)
+_HREF_RE = re.compile(r"\shref\s*=\s*(?:\"([^\"]*)\"|'([^']*)'|([^\s\"'>]+))", re.I)
 
-    layer1_sections = soup.find_all("section", id="layer1")
-    if not layer1_sections:
-        return bp_dict
-    PLAN_NOTE = {
-        "L": ("LOAD_PLANNING_DONE",      "적하 프래닝까지 완료"),
-        "D": ("DISCHARGE_PLANNING_DONE", "양하 프래닝까지 완료"),
-        "C": ("CRANE_ASSIGNED",          "크래인배정 완료"),
+def _bp_record(g: tuple) -> tuple:
+    """VslMsg 인자 12개 → ((ship_cd, call_no), {"bitt", "note", "plan_status"})"""
+    ship_cd, call_no, plan_cd, bitt = g[1], g[3], g[7], g[10]
+    note, plan_status = _note_status_from_plan_cd(plan_cd)
+    return (ship_cd, call_no), {
+        "bitt": bitt,             # 예: "111 ( F: 1, E: 143)"
+        "note": note,             # 예: "양하 프래닝까지 완료"
+        "plan_status": plan_status
     }
 
-    for layer1 in layer1_sections:
+def iter_bp_records(text: str):
+    """
+    빠른 경로: DOM 없이 원문 태그만 한 번 훑어 section#layer1 안 <a href>의 VslMsg를 읽음
+      yield ((ship_cd, call_no), {"bitt", "note", "plan_status"})
+      - soup 경로와 같은 규칙: href 속성만(onclick/title 등은 무시), 주석/스크립트 안은 무시
+      - layer1 끝은 section 깊이를 세어 찾음(안쪽 section의 </section>에서 멈추지 않음)
+    """
+    depth = 0   # layer1 안에서의 section 깊이(0 = 밖)
+    for m in _BP_TOKEN_RE.finditer(text):
+        closing, sec_attrs, a_attrs = m.groups()
+        if a_attrs is not None:
+            if not depth:
+                continue
+            h = _HREF_RE.search(a_attrs)
+            if not h:
+                continue
+            href = next(g for g in h.groups() if g is not None)
+            # 원문이므로 속성값 엔티티(&amp; 등)는 직접 풀어줌(soup 경로와 동일하게)
+            v = _VSLMSG_RE.search(html.unescape(href) if "&" in href else href)
+            if v:
+                yield _bp_record(v.groups())
+        elif sec_attrs is None:
+            continue                       # 주석/스크립트
+        elif closing:
+            depth = max(0, depth - 1)
+        elif depth or _LAYER1_ID_RE.search(sec_attrs):
+            depth += 1
+
+def _parse_bp_soup(text: str) -> dict:
+    """느린 경로(원본): soup에서 section#layer1 안의 <a href> 마다 VslMsg 파싱"""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(text, "html.parser")
+    bp_dict = {}
+    for layer1 in soup.find_all("section", id="layer1"):
         for a_tag in layer1.find_all("a"):
-            href = a_tag.get("href", "")
-            m = re.search(
-                r"VslMsg\('([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)','([^']*)'\)",
-                href,
-            )
+            m = _VSLMSG_RE.search(a_tag.get("href", ""))
             if not m:
                 continue
-            ship_cd = m.group(2)
-            call_no = m.group(4)
-            plan_cd  = m.group(8)
-            bitt    = m.group(11)
-            note, plan_status = _note_status_from_plan_cd(plan_cd)
-
-            bp_dict[(ship_cd, call_no)] = {
-                "bitt": bitt,             # 예: "111 ( F: 1, E: 143)"
-                "note": note,             # 예: "양하 프래닝까지 완료"
-                "plan_status": plan_status
-            }
+            key, info = _bp_record(m.groups())
+            bp_dict[key] = info
+    return bp_dict
+
+def get_all_bp_data(date=None, session=None, force_refresh=False, timeout=20):
+    """
+    한 날짜의 모든 BP(Bitt) + 참고(note) + 상태(plan_status)
+    { (ship_cd, call_no): {"bitt": "...(F: n, E: m)", "note": "...", "plan_status": "..."} }
+      - 원문 정규식 스캔(iter_bp_records)으로 먼저 읽고, 하나도 없을 때만 soup 경로
+    """
+    if date is None:
+        date = datetime.now().strftime("%Y-%m-%d")
+
+    text = _fetch_berth_g_text(date, session=session, force_refresh=force_refresh, timeout=timeout)
+    return _parse_bp_text(text)
+
+def _parse_bp_text(text: str) -> dict:
+    with metrics.stage("parse_bp"):
+        bp_dict = dict(iter_bp_records(text))
+        if not bp_dict:
+            bp_dict = _parse_bp_soup(text)
+    metrics.count("bp_records", len(bp_dict))
     return bp_dict
 
+# ---------------------------------------------------------
+# 마감(예산) 도움 함수 — 시간 안에 못 받은 소스는 지난 응답 캐시(만료 무시)로 대체
+# ---------------------------------------------------------
+REQUEST_TIMEOUT_SEC = 20
+
+def _left(deadline):
+    """남은 시간(초) — deadline(monotonic 기준)이 None이면 None(무제한)"""
+    return None if deadline is None else max(0.0, deadline - monotonic())
+
+def _request_timeout(deadline) -> float:
+    """요청 1건 타임아웃: 기본 REQUEST_TIMEOUT_SEC, 마감이 더 가까우면 남은 시간(최소 1초)"""
+    left = _left(deadline)
+    return REQUEST_TIMEOUT_SEC if left is None else max(1.0, min(REQUEST_TIMEOUT_SEC, left))
+
+def stale_berth_status(time="3days", route="ALL", berth="A"):
+    """지난 조회의 텍스트표(만료 무관) → DataFrame | None"""
+    text = cache_get("berth_status", _berth_status_payload(time, route, berth), max_age=float("inf"))
+    return None if text is None else _parse_berth_table(text)
+
+def stale_bp_data(date: str):
+    """지난 조회의 G 화면 BP(만료 무관) → dict | None"""
+    text = cache_get("berth_g", _berth_g_params(date), max_age=float("inf"))
+    return None if text is None else _parse_bp_text(text)
+
+def _wait_or_stale(fut, deadline, stale):
+    """
+    fut 결과를 마감까지 기다림 → (값, 상태)
+      상태: "ok" | "stale"(stale()로 대체) | "timeout" | "error" (대체도 없으면 값 None)
+      - deadline이 None이면 기존처럼 끝까지 기다리고 예외도 그대로 올림
+    """
+    if deadline is None:
+        return fut.result(), "ok"
+    try:
+        return fut.result(timeout=_left(deadline)), "ok"
+    except FuturesTimeout:
+        status = "timeout"
+    except Exception:
+        status = "error"
+    fallback = stale()
+    return (fallback, "stale") if fallback is not None else (None, status)
+
+_BP_RE = re.compile(r"(\d+)\s*\(\s*F:\s*(\d+)\s*,\s*E:\s*(\d+)\)")
+_VOYAGE_PARTS_RE = r"^([^-]*)-([^-]*)"     # '모선항차' → (ship_cd, call_no) = 첫/둘째 '-' 조각
+
 def parse_bp(bp_str):
     """
     예: '110 ( F: 1, E: 142)' -> (110, 1, 142)
     """
     if not bp_str or pd.isna(bp_str):
         return (None, None, None)
-    m = re.search(r"(\d+)\s*\(\s*F:\s*(\d+)\s*,\s*E:\s*(\d+)\)", bp_str)
+    m = _BP_RE.search(bp_str)
     if m:
         return (int(m.group(1)), int(m.group(2)), int(m.group(3)))
     return (None, None, None)
 
-def add_bp_to_dataframe(df, date=None):
+def _int_or_none_column(s: pd.Series):
+    """
+    문자열 숫자 Series → 행별 int/None 리스트를 대입했을 때와 같은 dtype
+      (전부 값: int64, 일부 결측: float64, 전부 결측: object(None))
+    """
+    has = s.notna()
+    if len(s) and has.all():
+        return s.astype("int64").to_numpy()
+    if not has.any():
+        return [None] * len(s)
+    return s.astype(float).to_numpy()
+
+def _bp_map_frame(bp_map: dict) -> pd.DataFrame:
+    """{(ship_cd, call_no): info} → DataFrame 1회 변환 (info가 문자열이던 과거 형식도 호환)"""
+    recs = []
+    for (ship_cd, call_no), info in bp_map.items():
+        if isinstance(info, dict):
+            recs.append((ship_cd, call_no, info.get("bitt"), info.get("note", ""), info.get("plan_status", "")))
+        else:
+            recs.append((ship_cd, call_no, info, "", ""))
+    return pd.DataFrame(recs, columns=["ship_cd", "call_no", "bitt", "note", "plan_status"])
+
+# ---------------------------------------------------------
+# 2-1) 여러 날짜의 G 화면 (1week/2week 창 전체에 BP 채우기)
+# ---------------------------------------------------------
+BP_WORKERS = 4        # 날짜별 G 화면 동시 요청 수
+BP_MAX_DAYS = 15      # 한 번에 조회할 최대 날짜 수(2week + 하루)
+_START_COLS = ["입항 예정일시", "입항예정일시"]
+_END_COLS = ["출항일시", "출항 일시"]
+
+def bp_dates_for(df: pd.DataFrame, max_days: int = BP_MAX_DAYS, today=None) -> list[str]:
+    """
+    선석표가 걸쳐 있는 날짜들(YYYY-MM-DD, 오름차순)
+      - 행마다 입항 예정일 ~ 출항일(없으면 입항일만)을 합집합
+      - 오늘(today, 기본 현재) 이후 날짜만 남긴 뒤 앞에서부터 max_days개
+        (이미 들어와 있던 선박의 지난 날짜 때문에 창 끝이 잘리지 않게)
+      - 오늘 이후 날짜가 없으면(지난 창 조회) 가장 최근 max_days개
+      - 잘려 나간 날짜가 있으면 경고 로그
+    """
+    s_col = next((c for c in _START_COLS if c in df.columns), None)
+    if s_col is None or df.empty:
+        return []
+    e_col = next((c for c in _END_COLS if c in df.columns), None)
+
+    starts = pd.to_datetime(_coerce_datetime_series(df[s_col])).dt.normalize()
+    ends = pd.to_datetime(_coerce_datetime_series(df[e_col])).dt.normalize() if e_col else starts
+    ends = ends.where(ends.notna() & (ends >= starts), starts)
+    ends = ends.clip(upper=starts + pd.Timedelta(days=max_days))   # 비정상 장기 구간 방어
+
+    days = set()
+    for s, e in zip(starts, ends):
+        if pd.isna(s):
+            continue
+        days.update(pd.date_range(s, e, freq="D"))
+    today = pd.Timestamp(today if today is not None else datetime.now()).normalize()
+    days = sorted(days)
+    ahead = [d for d in days if d >= today]
+    picked = ahead[:max_days] if ahead else days[-max_days:]
+    if len(picked) < len(days):
+        log.warning("BP 조회 날짜 %d일 중 %d일만 조회 (%s ~ %s, 제외: %s)", len(days), len(picked),
+                    picked[0].strftime("%Y-%m-%d"), picked[-1].strftime("%Y-%m-%d"),
+                    ", ".join(d.strftime("%Y-%m-%d") for d in days if d not in picked))
+    return [d.strftime("%Y-%m-%d") for d in picked]
+
+def get_bp_data_for_dates(dates, session=None, max_workers=BP_WORKERS, force_refresh=False, known=None,
+                          deadline=None, status=None):
+    """
+    여러 날짜의 G 화면을 제한된 풀로 동시에 받아 하나로 병합(뒤 날짜가 우선)
+      - 날짜별 응답은 캐시에 따로 저장 → 창을 늘리면 새 날짜만 네트워크
+      known: {date: bp_dict} 이미 받은 날짜(병렬 수집에서 미리 받은 오늘 등)
+      deadline: monotonic 기준 마감. 그때까지 못 받은 날짜는 지난 캐시(없으면 제외)
+      status: 주면 {date: "ok"|"stale"|"timeout"|"error"}를 채움
+    """
+    known = dict(known or {})
+    todo = [d for d in dates if d not in known]
+    if todo and deadline is not None:
+        pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(todo))))
+        try:
+            futs = {d: metrics.submit(pool, get_all_bp_data, d, session=session, force_refresh=force_refresh,
+                                      timeout=_request_timeout(deadline)) for d in todo}
+            for d, f in futs.items():
+                bp, st = _wait_or_stale(f, deadline, lambda d=d: stale_bp_data(d))
+                if status is not None:
+                    status[d] = st
+                if bp is not None:
+                    known[d] = bp
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+    elif todo:
+        if max_workers > 1 and len(todo) > 1:
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(todo))) as pool:
+                futs = [metrics.submit(pool, get_all_bp_data, d, session=session, force_refresh=force_refresh)
+                        for d in todo]
+                known.update(zip(todo, (f.result() for f in futs)))
+        else:
+            for d in todo:
+                known[d] = get_all_bp_data(d, session=session, force_refresh=force_refresh)
+
+    merged = {}
+    for d in sorted(known):
+        merged.update(known[d])
+    return merged
+
+def add_bp_to_dataframe(df, date=None, bp_map=None, force_refresh=False, known_bp=None):
+    """
+    date: 지정하면 그 날짜 G 화면만 사용(기존 동작)
+    bp_map: 미리 병합해 둔 BP 사전. None이고 date도 없으면 표가 걸친 날짜 전체를 동시 조회
+    known_bp: {date: bp_dict} 이미 받아둔 날짜별 결과(재요청하지 않음)
+      (마감 있는 수집은 collect_berth_info가 get_bp_data_for_dates(deadline=...)로 bp_map을 만들어 넘김)
+      - 열 단위 처리: 모선항차 분리(str.extract) → BP 표와 (ship_cd, call_no) merge → bitt 파싱(str.extract)
+    """
     if "모선항차" not in df.columns:
         return df
 
-    bp_map = get_all_bp_data(date)
-    bp_list, f_list, e_list, note_list, status_list = [], [], [], [], []
-
-    for _, row in df.iterrows():
-        mocen = str(row["모선항차"]) if pd.notna(row["모선항차"]) else ""
-        parts = mocen.split("-")
-        if len(parts) >= 2:
-            ship_cd, call_no = parts[0], parts[1]
-            info = bp_map.get((ship_cd, call_no))
-            if isinstance(info, dict):
-                bp_str = info.get("bitt")
-                note   = info.get("note", "")
-                status = info.get("plan_status", "")
-            else:
-                # 과거 문자열만 반환하던 케이스와 호환
-                bp_str = info
-                note, status = "", ""
-            bp, f, e = parse_bp(bp_str)
+    if bp_map is None:
+        if date is not None:
+            bp_map = get_all_bp_data(date, force_refresh=force_refresh)
         else:
-            bp, f, e, note, status = (None, None, None, "", "")
-
-        bp_list.append(bp); f_list.append(f); e_list.append(e)
-        note_list.append(note); status_list.append(status)
+            dates = bp_dates_for(df) or [datetime.now().strftime("%Y-%m-%d")]
+            bp_map = get_bp_data_for_dates(dates, force_refresh=force_refresh, known=known_bp)
 
-    df["bp"], df["f"], df["e"] = bp_list, f_list, e_list
-    df["note"] = note_list
-    df["plan_status"] = status_list
+    with metrics.stage("bp_join"):
+        _join_bp(df, bp_map)
     return df
 
+def _join_bp(df, bp_map):
+    """add_bp_to_dataframe의 열 단위 결합부(df에 bp/f/e/note/plan_status 대입)"""
+    voy = df["모선항차"]
+    keys = voy.where(voy.notna(), "").astype(str).str.extract(_VOYAGE_PARTS_RE)
+    keys.columns = ["ship_cd", "call_no"]
+
+    joined = keys.merge(_bp_map_frame(bp_map), on=["ship_cd", "call_no"], how="left", indicator=True)
+    found = (joined["_merge"] == "both").to_numpy()
+
+    nums = joined["bitt"].where(found).str.extract(_BP_RE)
+    df["bp"], df["f"], df["e"] = (_int_or_none_column(nums[i]) for i in range(3))
+    df["note"] = joined["note"].where(found, "").tolist()
+    df["plan_status"] = joined["plan_status"].where(found, "").tolist()
+
 # ---------------------------------------------------------
 # 3) VesselFinder 길이/폭 (네가 주신 원본 그대로)
 #    ※ default로는 호출 안 함 (느려질 수 있으니 옵션화)
@@ -182,67 +589,317 @@ _vf_session.headers.update({
     "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
     "Referer": "https://www.vesselfinder.com/",
 })
-_dims_cache = {}
+_dims_cache = {}   # 프로세스 내 (값 있는 항목만) — 없음/실패는 DB에서 TTL로 관리
 
-def get_vessel_dimensions(name: str, debug=False):
-    key = name.strip().lower()
-    if key in _dims_cache:
-        return _dims_cache[key]
+def _fetch_vessel_dimensions(name: str, timeout: float = 15):
+    """VesselFinder 검색 1회 → (L, B) / 못 찾거나 실패 시 (None, None)"""
+    mt = metrics.current()
+    t0 = perf_counter()
     try:
         search_url = f"https://www.vesselfinder.com/vessels?name={quote_plus(name)}"
-        r = _vf_session.get(search_url, timeout=15)
+        r = _vf_session.get(search_url, timeout=timeout)
+        t1 = perf_counter()
+        text = r.text
+        if mt:
+            mt.add_http("vesselfinder", {"name": name}, cached=False, status=r.status_code,
+                        latency_s=t1 - t0, nbytes=len(r.content), decode_s=perf_counter() - t1)
         r.raise_for_status()
-        soup = BeautifulSoup(r.text, "html.parser")
-        L = B = None
-        for cell in soup.find_all("td", class_="v6"):
-            t = cell.get_text(strip=True)
-            m = re.search(r"(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)", t)
-            if m:
-                L = float(m.group(1)); B = float(m.group(2)); break
-        _dims_cache[key] = (L, B)
-        return (L, B)
+        with metrics.stage("parse_vesselfinder"):
+            from bs4 import BeautifulSoup
+            soup = BeautifulSoup(text, "html.parser")
+            for cell in soup.find_all("td", class_="v6"):
+                t = cell.get_text(strip=True)
+                m = re.search(r"(\d+(?:\.\d+)?)\s*/\s*(\d+(?:\.\d+)?)", t)
+                if m:
+                    return (float(m.group(1)), float(m.group(2)))
+    except (requests.ConnectionError, requests.Timeout):
+        if mt:   # 응답 없이 끊긴/시간 초과 요청도 지연으로 남김
+            mt.add_http("vesselfinder", {"name": name}, cached=False, latency_s=perf_counter() - t0)
+    except Exception:
+        pass
+    return (None, None)
+
+def _remember_dims(found: dict):
+    """{name: (L, B)} → 메모리(값 있는 것만) + 선박 마스터 DB(없음 포함)"""
+    from store import upsert_vessels, vessel_key
+
+    for name, (L, B) in found.items():
+        if L is not None or B is not None:
+            _dims_cache[vessel_key(name)] = (L, B)
+    try:
+        upsert_vessels([{"name": n, "length_m": L, "beam_m": B} for n, (L, B) in found.items()])
     except Exception:
-        _dims_cache[key] = (None, None)
+        pass
+
+def get_vessel_dimensions(name: str, debug=False, use_store=True):
+    """
+    메모리 → 선박 마스터 DB → VesselFinder 순으로 조회
+      - 네트워크를 탄 경우에만 0.4초 대기(사이트 예의)
+      - 못 찾음/실패는 DB에 기록되고 VESSEL_NEG_TTL_SEC 지나면 다시 조회
+    """
+    from store import lookup_vessels, vessel_key
+
+    key = vessel_key(name)
+    if not key:
         return (None, None)
+    if key in _dims_cache:
+        return _dims_cache[key]
+    if use_store:
+        try:
+            hit = lookup_vessels([name]).get(key)
+        except Exception:
+            hit = None
+        if hit is not None:
+            if hit != (None, None):
+                _dims_cache[key] = hit
+            return hit
+    try:
+        dims = _fetch_vessel_dimensions(name)
+        _remember_dims({name: dims})
+        return dims
     finally:
         time.sleep(0.4)
 
-def enrich_with_length_beam(df: pd.DataFrame, ship_name_column="선박명", debug=False):
+# ---------------------------------------------------------
+# 3-1) 비동기 조회 (토큰 버킷 속도 제한 + 요청별 타임아웃 + 전체 마감)
+# ---------------------------------------------------------
+VF_RATE_PER_SEC = 2.5       # 초당 요청 수(평균)
+VF_BURST = 2                # 순간 허용 요청 수
+VF_CONCURRENCY = 4          # 동시에 떠 있는 요청 수
+VF_REQUEST_TIMEOUT = 10     # 요청 1건 타임아웃(초)
+VF_DEADLINE_SEC = 30        # 전체 마감(초) — 넘긴 선박은 빈 값으로 반환
+
+class _TokenBucket:
+    """초당 rate개씩 채워지고 최대 burst개까지 쌓이는 토큰 버킷"""
+    def __init__(self, rate: float, burst: int):
+        self.rate, self.capacity = float(rate), max(1, int(burst))
+        self.tokens = float(self.capacity)
+        self.stamp = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+async def _resolve_dims_async(names, rate=VF_RATE_PER_SEC, burst=VF_BURST, concurrency=VF_CONCURRENCY,
+                              request_timeout=VF_REQUEST_TIMEOUT, deadline=VF_DEADLINE_SEC) -> dict:
+    """
+    이름들을 동시에 조회 → {name: (L, B)}
+      - 마감(deadline)까지 끝난 것만 담음(타임아웃/마감 초과는 빠짐 → 다음에 재조회)
+    """
+    if not names:
+        return {}
+    bucket = _TokenBucket(rate, burst)
+    sem = asyncio.Semaphore(concurrency)
+    loop = asyncio.get_running_loop()
+    # 전용 풀: 마감 시 남은 스레드를 기다리지 않고 빠져나오기 위함(기본 executor는 종료 때 대기)
+    pool = ThreadPoolExecutor(max_workers=concurrency)
+
+    async def one(name):
+        async with sem:
+            await bucket.acquire()
+            dims = await asyncio.wait_for(
+                loop.run_in_executor(pool, metrics.bind(_fetch_vessel_dimensions), name, request_timeout),
+                timeout=request_timeout + 1,
+            )
+            return name, dims
+
+    tasks = [asyncio.create_task(one(n)) for n in names]
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=deadline)
+        for t in pending:
+            t.cancel()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+    out = {}
+    for t in done:
+        if not t.cancelled() and t.exception() is None:
+            name, dims = t.result()
+            out[name] = dims
+    return out
+
+def _run_async(coro):
+    """실행 중인 이벤트 루프가 있으면 별도 스레드에서 asyncio.run"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    box = {}
+    th = threading.Thread(target=metrics.bind(lambda: box.setdefault("v", asyncio.run(coro))))
+    th.start(); th.join()
+    return box.get("v")
+
+def enrich_with_length_beam(df: pd.DataFrame, ship_name_column="선박명", debug=False,
+                            mode="sync", deadline=VF_DEADLINE_SEC):
+    """
+    선박명 컬럼에 Length(m)/Beam(m) 추가
+      - 이름 중복 제거 → 메모리/DB 일괄 조회(쿼리 1번) → 남은 이름만 VesselFinder
+      mode: "sync"(한 척씩, 0.4초 간격) | "async"(속도 제한 하 동시 조회, deadline 초 안에 끝난 것만)
+      - async에서 마감을 넘긴 선박은 빈 값 → out.attrs["dims_pending"]에 개수
+    """
+    from store import lookup_vessels, vessel_key   # SQLAlchemy는 길이/폭을 실제로 붙일 때만 로드
+
     out = df.copy()
     if ship_name_column not in out.columns:
         out["Length(m)"] = None
         out["Beam(m)"] = None
         return out
-    Ls, Bs = [], []
-    for idx, name in enumerate(out[ship_name_column].astype(str).fillna(""), 1):
-        L, B = get_vessel_dimensions(name, debug=(debug and idx == 1))
-        Ls.append(L); Bs.append(B)
-    out["Length(m)"] = Ls
-    out["Beam(m)"]   = Bs
+    names = out[ship_name_column].astype(str).fillna("")
+    uniq = list(dict.fromkeys(n for n in names if vessel_key(n)))
+
+    with metrics.stage("dims"):
+        dims = {n: _dims_cache[vessel_key(n)] for n in uniq if vessel_key(n) in _dims_cache}
+        n_mem = len(dims)
+        rest = [n for n in uniq if n not in dims]
+        if rest:
+            try:
+                stored = lookup_vessels(rest)
+            except Exception:
+                stored = {}
+            for n in rest:
+                if vessel_key(n) in stored:
+                    dims[n] = stored[vessel_key(n)]
+        todo = [n for n in uniq if n not in dims]
+        metrics.count("dims_names", len(uniq))
+        metrics.count("dims_mem_hits", n_mem)
+        metrics.count("dims_store_hits", len(dims) - n_mem)
+        metrics.count("dims_network", len(todo))
+        if mode == "async" and todo:
+            found = _run_async(_resolve_dims_async(todo, deadline=deadline)) or {}
+            _remember_dims(found)
+            dims.update(found)
+            out.attrs["dims_pending"] = len(todo) - len(found)
+            metrics.count("dims_pending", len(todo) - len(found))
+        else:
+            for n in todo:
+                dims[n] = get_vessel_dimensions(n, debug=debug, use_store=False)
+
+    out["Length(m)"] = [dims.get(n, (None, None))[0] for n in names]
+    out["Beam(m)"]   = [dims.get(n, (None, None))[1] for n in names]
     return out
 
 # ---------------------------------------------------------
 # 4) 통합 수집 (A/B/ALL, BP 추가, VF 추가는 옵션)
 # ---------------------------------------------------------
-def collect_berth_info(time="3days", route="ALL", berth="A", add_bp=True, add_dims=False, debug=False):
+def collect_berth_info(time="3days", route="ALL", berth="A", add_bp=True, add_dims=False, debug=False,
+                       parallel=True, max_workers=DEFAULT_WORKERS, force_refresh=False, dims_mode="async",
+                       return_metrics=False, budget_sec=None):
     """
     time: "oneday" | "3days" | "1week" | "2week"
     berth: "A" | "B" | "ALL"
+    parallel: True면 A표 · B표 · 오늘 G화면(BP)을 공용 세션으로 동시에 요청
+              (전체 지연 ≈ 가장 느린 요청 1건), 표가 걸친 나머지 날짜의 G화면은 이어서 동시 조회
+    max_workers: 병렬 수집 스레드 수 (1이면 순차와 동일)
+    force_refresh: 응답 캐시를 건너뛰고 사이트에서 새로 받음
+    dims_mode: VesselFinder 보강 방식 "async"(동시·마감 있음) | "sync"(원본 순차)
+    return_metrics: True면 (df, CrawlMetrics) — 단계별 시간/바이트/행 수/캐시 적중
+    budget_sec: 전체 시간 예산(초). 넘기면 끝난 것만으로 반환
+      - 못 받은 표/G화면은 지난 응답 캐시(만료 무시)로 대체, 그것도 없으면 빠짐(BP 빈 칸 등)
+      - 선박 길이/폭은 남은 시간 안에서만 async 조회(나머지 날짜 BP와 동시에)
+      - df.attrs["partial"]: 하나라도 "ok"가 아니면 True
+        df.attrs["sources"]: {"berth_A"|"berth_B"|"bp"|"dims": "ok"|"stale"|"partial"|"timeout"|"error"}
     """
-    if berth == "ALL":
-        df_a = get_berth_status(time=time, route=route, berth="A")
-        df_b = get_berth_status(time=time, route=route, berth="B")
-        df = pd.concat([df_a, df_b], ignore_index=True)
+    m = metrics.CrawlMetrics(time=time, route=route, berth=berth, add_bp=add_bp, add_dims=add_dims,
+                             parallel=parallel, max_workers=max_workers, force_refresh=force_refresh,
+                             budget_sec=budget_sec)
+    deadline = None if budget_sec is None else monotonic() + budget_sec
+    with m.activate():
+        df = _collect_berth_info(time, route, berth, add_bp, add_dims, debug,
+                                 parallel, max_workers, force_refresh, dims_mode, deadline)
+    m.counters["rows"] = len(df)
+    return (df, m) if return_metrics else df
+
+def _overall_status(statuses) -> str:
+    """소스 여러 개(날짜별 BP 등)의 상태 → 하나로"""
+    statuses = list(statuses)
+    if all(s == "ok" for s in statuses):
+        return "ok"
+    if all(s in ("ok", "stale") for s in statuses):
+        return "stale"
+    if any(s in ("ok", "stale") for s in statuses):
+        return "partial"
+    return statuses[0] if statuses else "ok"
+
+def _collect_berth_info(time, route, berth, add_bp, add_dims, debug, parallel, max_workers, force_refresh,
+                        dims_mode, deadline=None):
+    gus = ["A", "B"] if berth == "ALL" else [berth]
+    today = datetime.now().strftime("%Y-%m-%d")
+    sources, bp_status = {}, {}
+
+    known_bp = None
+    if deadline is not None or (parallel and max_workers > 1):
+        # 마감이 있으면 순차 요청도 풀에서 돌려 기다림을 마감으로 끊음
+        pool = ThreadPoolExecutor(max_workers=max_workers if parallel else 1)
+        try:
+            futs = {g: metrics.submit(pool, get_berth_status, time=time, route=route, berth=g,
+                                      force_refresh=force_refresh, timeout=_request_timeout(deadline))
+                    for g in gus}
+            # 오늘 G 화면은 표와 동시에 받아 둠(나머지 날짜는 표를 본 뒤 추가 조회)
+            bp_fut = (metrics.submit(pool, get_all_bp_data, today, force_refresh=force_refresh,
+                                     timeout=_request_timeout(deadline)) if add_bp else None)
+            frames = []
+            for g, f in futs.items():
+                part, sources[f"berth_{g}"] = _wait_or_stale(
+                    f, deadline, lambda g=g: stale_berth_status(time, route, g))
+                if part is not None:
+                    frames.append(part)
+            if bp_fut is not None:
+                bp, bp_status[today] = _wait_or_stale(bp_fut, deadline, lambda: stale_bp_data(today))
+                known_bp = {today: bp} if bp is not None else {}
+        finally:
+            pool.shutdown(wait=deadline is None, cancel_futures=True)
     else:
-        df = get_berth_status(time=time, route=route, berth=berth)
+        frames = [get_berth_status(time=time, route=route, berth=g, force_refresh=force_refresh) for g in gus]
+
+    if not frames:
+        df = pd.DataFrame()
+    else:
+        df = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
 
     if df.empty:
-        return pd.DataFrame({"알림": ["데이터를 가져올 수 없습니다."]})
+        out = pd.DataFrame({"알림": ["데이터를 가져올 수 없습니다."]})
+        if deadline is not None:
+            out.attrs.update(partial=True, sources=sources)
+        return out
 
-    if add_dims:
-        df = enrich_with_length_beam(df, ship_name_column="선박명", debug=debug)
+    if deadline is None:
+        if add_dims:
+            df = enrich_with_length_beam(df, ship_name_column="선박명", debug=debug, mode=dims_mode)
+        if add_bp:
+            df = add_bp_to_dataframe(df, force_refresh=force_refresh, known_bp=known_bp)
+        return df
 
-    if add_bp:
-        df = add_bp_to_dataframe(df)
+    # 마감 있음: 나머지 날짜 BP는 뒤에서 받으면서 그동안 선박 길이/폭 조회
+    bg = ThreadPoolExecutor(max_workers=1)
+    try:
+        bp_job = None
+        if add_bp:
+            dates = bp_dates_for(df) or [today]
+            bp_job = metrics.submit(bg, get_bp_data_for_dates, dates, force_refresh=force_refresh,
+                                    known=known_bp, deadline=deadline, status=bp_status)
+        if add_dims:
+            left = _left(deadline)
+            if left > 0:
+                df = enrich_with_length_beam(df, ship_name_column="선박명", debug=debug,
+                                             mode="async", deadline=min(VF_DEADLINE_SEC, left))
+                sources["dims"] = "partial" if df.attrs.get("dims_pending") else "ok"
+            else:
+                df = df.copy()
+                df["Length(m)"], df["Beam(m)"] = None, None
+                sources["dims"] = "timeout"
+        if bp_job is not None:
+            df = add_bp_to_dataframe(df, bp_map=bp_job.result())
+            sources["bp"] = _overall_status(bp_status.values())
+    finally:
+        bg.shutdown(wait=False)
 
+    df.attrs["sources"] = sources
+    df.attrs["partial"] = any(v != "ok" for v in sources.values())
     return df
@@ -0,0 +1,121 @@
+# =========================
+# metrics.py
+# =========================
+# 크롤링 단계별 계측 (시간/바이트/행 수/캐시 적중)
+#  - collect_berth_info(return_metrics=True) → (df, CrawlMetrics)
+#  - 수집 함수들은 current()로 진행 중인 지표 객체를 찾아 기록(없으면 아무것도 안 함)
+#  - 병렬 수집 스레드로는 submit(pool, fn, ...) / bind(fn)으로 컨텍스트를 넘김
+#  - to_jsonl(path)로 1회 수집 = JSON 1줄 저장(오프라인 분석용)
+import json
+import time
+import threading
+import functools
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+
+_current = contextvars.ContextVar("crawl_metrics", default=None)
+
+def current():
+    """진행 중인 CrawlMetrics (없으면 None)"""
+    return _current.get()
+
+def bind(fn):
+    """현재 컨텍스트(지표 객체)를 달고 다른 스레드에서 실행될 호출 가능 객체"""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+def submit(pool, fn, *args, **kw):
+    """pool.submit + 현재 컨텍스트 전달"""
+    return pool.submit(bind(fn), *args, **kw)
+
+@contextmanager
+def stage(name: str):
+    """with stage("parse"): ... → 진행 중인 지표에 소요 시간 누적"""
+    m = _current.get()
+    t0 = time.perf_counter()
+    try:
+        yield m
+    finally:
+        if m is not None:
+            m.add_time(name, time.perf_counter() - t0)
+
+def count(name: str, n: int = 1):
+    m = _current.get()
+    if m is not None:
+        m.count(name, n)
+
+class CrawlMetrics:
+    """
+    1회 수집의 지표 (스레드 안전)
+      http:     요청별 {endpoint, params, cached, status, latency_s, bytes, decode_s}
+      stages:   단계별 누적 시간(초) — 병렬 스레드의 시간은 합산됨
+      counters: 행 수, 선박 조회 적중 등
+      wall_s:   전체 벽시계 시간
+    """
+    def __init__(self, **query):
+        self.query = query
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.http, self.stages, self.counters = [], {}, {}
+        self.wall_s = None
+        self._t0 = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def activate(self):
+        """이 블록 안의 수집 함수들이 self에 기록"""
+        token = _current.set(self)
+        try:
+            yield self
+        finally:
+            _current.reset(token)
+            self.wall_s = time.perf_counter() - self._t0
+
+    def add_http(self, endpoint: str, params: dict, cached: bool, status=None,
+                 latency_s=0.0, nbytes=0, decode_s=0.0):
+        with self._lock:
+            self.http.append({
+                "endpoint": endpoint, "params": params, "cached": cached, "status": status,
+                "latency_s": round(latency_s, 4), "bytes": nbytes, "decode_s": round(decode_s, 4),
+            })
+
+    def add_time(self, name: str, sec: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + sec
+
+    def count(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self) -> dict:
+        """엔드포인트별 요청 수/캐시 적중/지연 합·최대/바이트 + 선박 조회 적중률"""
+        by_ep = {}
+        for h in self.http:
+            e = by_ep.setdefault(h["endpoint"], {"requests": 0, "cached": 0, "latency_s": 0.0,
+                                                 "max_latency_s": 0.0, "bytes": 0, "decode_s": 0.0})
+            e["requests"] += 1
+            e["cached"] += int(h["cached"])
+            e["latency_s"] += h["latency_s"]
+            e["max_latency_s"] = max(e["max_latency_s"], h["latency_s"])
+            e["bytes"] += h["bytes"]
+            e["decode_s"] += h["decode_s"]
+        for e in by_ep.values():
+            for k in ("latency_s", "max_latency_s", "decode_s"):
+                e[k] = round(e[k], 4)
+        c = self.counters
+        names = c.get("dims_names", 0)
+        hits = c.get("dims_mem_hits", 0) + c.get("dims_store_hits", 0)
+        return {
+            "wall_s": self.wall_s,
+            "endpoints": by_ep,
+            "stages": {k: round(v, 4) for k, v in self.stages.items()},
+            "counters": dict(c),
+            "dims_hit_rate": (hits / names) if names else None,
+        }
+
+    def to_dict(self) -> dict:
+        return {"started_at": self.started_at, "query": self.query, **self.summary(), "http": list(self.http)}
+
+    def to_jsonl(self, path: str):
+        """JSON 1줄 추가 기록"""
+        with open(path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(self.to_dict(), ensure_ascii=False, default=str) + "\n")
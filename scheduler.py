@@ -0,0 +1,66 @@
+# =========================
+# scheduler.py
+# =========================
+# 백그라운드 크롤링 스케줄러 (Streamlit 없이 단독 실행)
+#   python -m scheduler                       # 10분 ± 1분 간격으로 계속
+#   python -m scheduler --interval 300 --jitter 30 --time 1week --berth ALL
+#   python -m scheduler --once                # 1회 실행(cron용)
+#   python -m scheduler --metrics crawl_metrics.jsonl   # 회차별 단계 지표를 JSONL로 누적
+#  - 매 회차 collect_berth_info(캐시 무시) → store.save_snapshot
+#  - 앱은 최신 완료 스냅샷을 바로 읽음 → 사이트에는 폴러 1개만 요청
+import time
+import random
+import logging
+import argparse
+
+from crawler import collect_berth_info
+from store import save_snapshot
+
+log = logging.getLogger("scheduler")
+
+DEFAULT_INTERVAL_SEC = 600
+DEFAULT_JITTER_SEC = 60
+
+def crawl_once(v_time="3days", route="ALL", berth="A", add_dims=False, metrics_path=None) -> int | None:
+    """1회 수집 후 스냅샷 저장 → snapshot_id (데이터 없으면 None)"""
+    t0 = time.monotonic()
+    raw, metrics = collect_berth_info(time=v_time, route=route, berth=berth,
+                                      add_bp=True, add_dims=add_dims, force_refresh=True, return_metrics=True)
+    if metrics_path:
+        metrics.to_jsonl(metrics_path)
+    sid = save_snapshot(raw, v_time=v_time, route=route, berth=berth)
+    log.info("snapshot=%s rows=%d %.1fs", sid, len(raw), time.monotonic() - t0)
+    return sid
+
+def run_forever(interval=DEFAULT_INTERVAL_SEC, jitter=DEFAULT_JITTER_SEC, **query):
+    """interval ± jitter 초마다 crawl_once (실패해도 다음 회차 계속)"""
+    while True:
+        try:
+            crawl_once(**query)
+        except Exception:
+            log.exception("crawl failed")
+        delay = max(1.0, interval + random.uniform(-jitter, jitter))
+        log.info("next crawl in %.0fs", delay)
+        time.sleep(delay)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="BPTC 선석배정 주기 수집")
+    ap.add_argument("--interval", type=float, default=DEFAULT_INTERVAL_SEC, help="수집 간격(초)")
+    ap.add_argument("--jitter", type=float, default=DEFAULT_JITTER_SEC, help="간격 흔들기(± 초)")
+    ap.add_argument("--time", dest="v_time", default="3days", choices=["oneday", "3days", "1week", "2week"])
+    ap.add_argument("--route", default="ALL")
+    ap.add_argument("--berth", default="A", choices=["A", "B", "ALL"])
+    ap.add_argument("--dims", action="store_true", help="VesselFinder 길이/폭 포함")
+    ap.add_argument("--once", action="store_true", help="1회만 실행")
+    ap.add_argument("--metrics", help="수집 지표 JSONL 경로")
+    args = ap.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
+    query = dict(v_time=args.v_time, route=args.route, berth=args.berth, add_dims=args.dims, metrics_path=args.metrics)
+    if args.once:
+        crawl_once(**query)
+    else:
+        run_forever(interval=args.interval, jitter=args.jitter, **query)
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,9 @@ SND_BERTHS = set(range(1, 6))    # 신선대 1~5
 GAM_BERTHS = set(range(6, 10))   # 감만 6~9
 Y_GRID_M = 30                    # 세로(선석 내 m) 스냅 단위
 MIN_CLEARANCE_M = 30             # 선박 간 최소 이격(m)
-TIME_GRID_MIN = 10               # 가로(시간) 스냅 단위(분)
+TIME_GRID_MIN = 10               # 가로(시간) 보조 눈금 단위(분)
+MOVE_GRID_MIN = 5                # 이동 시 시간 스냅 단위(분) — 키보드 한 칸
+QUAY_LENGTH_M = {"SND": 1500, "GAM": 1400}   # 터미널별 안벽 길이(m) — 그래프 세로축 끝
 
 # ---------------------------------------------------------
 # 한글 원본 → 표준 컬럼 매핑 (요청한 컬럼만 사용)
@@ -102,6 +104,143 @@ def _coerce_datetime(x):
     except Exception:
         return pd.NaT
 
+# ---------------------------------------------------------
+# 열 단위 날짜 파싱 (_coerce_datetime과 같은 결과)
+#   - 숫자 열: 엑셀 직렬값 범위만 한 번에 변환
+#   - 문자열: 고유값만 골라(memo) .str로 결측 토큰/구분자/한글 단위 정리
+#     → 사이트 형식(DATETIME_FORMATS)으로 한 번에 to_datetime → 못 읽은 것만 원래 스칼라 경로
+#   - 그 외(Timestamp/datetime 등)는 값별로 _coerce_datetime(memo)
+# ---------------------------------------------------------
+_NULL_TOKENS = ["", "-", "—", "N/A", "NA", "null", "None"]
+DATETIME_FORMATS = ["%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]
+
+def _parse_datetime_strings(uniq: pd.Series) -> list:
+    """고유 문자열 Series → Timestamp/NaT 리스트 (_coerce_datetime 문자열 분기와 동일)"""
+    st = uniq.str.strip()
+    null = st.isin(_NULL_TOKENS)
+    # '.', '/', 한글 단위 → '-' (스칼라 경로의 두 re.sub를 한 번에)
+    norm = (st.str.replace(r"[./년월일시분초]", "-", regex=True)
+              .str.replace(r"\s+", " ", regex=True)
+              .str.strip("- ").str.strip())
+    parsed = pd.Series(pd.NaT, index=uniq.index, dtype="datetime64[ns]")
+    todo = ~null
+    for fmt in DATETIME_FORMATS:
+        if not todo.any():
+            break
+        hit = pd.to_datetime(norm[todo], format=fmt, errors="coerce")
+        parsed[hit.index] = parsed[hit.index].fillna(hit)
+        todo &= parsed.isna()
+    out = parsed.tolist()
+    for i in np.flatnonzero(todo.to_numpy()):
+        ts = pd.to_datetime(norm.iat[i], errors="coerce", utc=False)
+        out[i] = ts if not pd.isna(ts) else pd.NaT
+    return out
+
+def _coerce_datetime_series(s: pd.Series) -> pd.Series:
+    """s.apply(_coerce_datetime)과 같은 결과를 열 단위로"""
+    if len(s) == 0:
+        return s.apply(_coerce_datetime)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        return s.copy()
+    if pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+        x = pd.Series(s.to_numpy(dtype="float64", na_value=np.nan), index=s.index)
+        ok = (x >= 20000) & (x <= 80000)
+        out = pd.Series(pd.NaT, index=s.index, dtype="datetime64[ns]")
+        if ok.any():
+            out[ok] = pd.to_datetime(x[ok], origin="1899-12-30", unit="D")
+        return out
+
+    vals = s.to_numpy(dtype=object)
+    if pd.api.types.infer_dtype(vals, skipna=False) == "string":
+        is_str = np.ones(len(vals), dtype=bool)
+    else:
+        is_str = np.fromiter((isinstance(v, str) for v in vals), dtype=bool, count=len(vals))
+    parsed, codes = [], None
+    if is_str.any():
+        codes, uniq = pd.factorize(vals[is_str])
+        parsed = _parse_datetime_strings(pd.Series(uniq, dtype=object))
+    memo, other = {}, []
+    for i in np.flatnonzero(~is_str):
+        v = vals[i]
+        key = (type(v), v) if v is not None and not (isinstance(v, float) and np.isnan(v)) else None
+        if key not in memo:
+            memo[key] = _coerce_datetime(v)
+        other.append(memo[key])
+
+    # 전부 tz 없는 Timestamp/NaT면 datetime64 배열로 조립, 아니면 apply와 같은 추론 경로
+    naive = all(v is pd.NaT or (isinstance(v, pd.Timestamp) and v.tzinfo is None)
+                for v in [*parsed, *memo.values()])
+    if naive:
+        out = np.full(len(vals), np.datetime64("NaT"), dtype="datetime64[ns]")
+        if codes is not None:
+            table = pd.DatetimeIndex(parsed + [pd.NaT]).astype("datetime64[ns]").to_numpy()
+            out[is_str] = table[codes]
+        if other:
+            out[~is_str] = pd.DatetimeIndex(other).astype("datetime64[ns]").to_numpy()
+        return pd.Series(out, index=s.index)
+    results = np.empty(len(vals), dtype=object)
+    if codes is not None:
+        results[is_str] = np.array(parsed + [pd.NaT], dtype=object)[codes]
+    results[~is_str] = other
+    return pd.Series(list(results), index=s.index)
+
+# ---------------------------------------------------------
+# 정규화 결과 dtype 규약 (세션에 여러 벌 복사되므로 작게)
+#   - terminal: 고정 범주(SND/GAM/""), stype/plan_status: 범주
+#   - berth: int16, 위치·치수(m): float32
+#   - start/end: datetime64[ns] 하나로
+# ---------------------------------------------------------
+TERMINAL_DTYPE = pd.CategoricalDtype(["SND", "GAM", ""])
+CATEGORY_COLS = ["stype", "plan_status"]
+METER_COLS = ["bp", "f", "e", "y_m", "Length(m)", "Beam(m)"]
+BERTH_DTYPE = "int16"
+METER_DTYPE = "float32"
+DATETIME_DTYPE = "datetime64[ns]"
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """정규화 프레임에 dtype 규약 적용(원본은 그대로, 있는 열만)"""
+    out = df.copy(deep=False)
+    if "terminal" in out:
+        out["terminal"] = out["terminal"].astype(TERMINAL_DTYPE)
+    for c in CATEGORY_COLS:
+        if c in out and not isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = out[c].astype("category")
+    if "berth" in out:
+        out["berth"] = pd.to_numeric(out["berth"], errors="coerce").fillna(0).astype(BERTH_DTYPE)
+    for c in METER_COLS:
+        if c in out:
+            out[c] = pd.to_numeric(out[c], errors="coerce").astype(METER_DTYPE)
+    for c in ["start", "end"]:
+        if c in out:
+            out[c] = pd.to_datetime(out[c], errors="coerce").astype(DATETIME_DTYPE)
+    return out
+
+def _legacy_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """비교용: 규약 이전 형식(범주→object, 작은 정수/실수→64비트)"""
+    out = df.copy(deep=False)
+    for c in out.columns:
+        if isinstance(out[c].dtype, pd.CategoricalDtype):
+            out[c] = out[c].astype(object)
+        elif out[c].dtype == BERTH_DTYPE:
+            out[c] = out[c].astype("int64")
+        elif out[c].dtype == METER_DTYPE:
+            out[c] = out[c].astype("float64")
+    return out
+
+def memory_report(frames: dict) -> pd.DataFrame:
+    """
+    {이름: DataFrame} → 이름별 행 수 / 현재 바이트 / 이전 형식 바이트 / 절감 바이트
+      (deep=True: 문자열 실제 크기 포함)
+    """
+    rows = []
+    for name, df in frames.items():
+        if not isinstance(df, pd.DataFrame):
+            continue
+        now = int(df.memory_usage(deep=True).sum())
+        legacy = int(_legacy_dtypes(df).memory_usage(deep=True).sum())
+        rows.append((name, len(df), now, legacy, legacy - now))
+    return pd.DataFrame(rows, columns=["name", "rows", "bytes", "legacy_bytes", "saved_bytes"])
+
 # ---------------------------------------------------------
 # 정규화
 # ---------------------------------------------------------
@@ -111,9 +250,9 @@ def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
       - 컬럼명 표준화(KOR_MAP)
       - berth 정수화, terminal 추론
       - 문자열 기본 처리(vessel/voyage/stype 등)
-      - start/end 관대 파싱(_coerce_datetime)
+      - start/end 관대 파싱(_coerce_datetime과 같은 규칙, 열 단위 _coerce_datetime_series)
       - bp/f/e 숫자화, y_m=bp
-      - STD_ORDER만 노출
+      - STD_ORDER만 노출, 마지막에 dtype 규약(compact_dtypes) 적용
     """
     out = df.copy()
 
@@ -145,12 +284,12 @@ def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
 
     # 5) 시간 파싱 (시리즈 안전)
     if "start" in out:
-        out["start"] = out["start"].apply(_coerce_datetime)
+        out["start"] = _coerce_datetime_series(out["start"])
     else:
         out["start"] = pd.Series(pd.NaT, index=out.index)
 
     if "end" in out:
-        out["end"] = out["end"].apply(_coerce_datetime)
+        out["end"] = _coerce_datetime_series(out["end"])
     else:
         out["end"] = pd.Series(pd.NaT, index=out.index)
 
@@ -169,7 +308,7 @@ def normalize_df(df: pd.DataFrame) -> pd.DataFrame:
     # 크롤러 보강치수 보존
     extras = [c for c in ["Length(m)", "Beam(m)", "note", "plan_status"] if c in out.columns]
     out = out[std + extras]
-    return out
+    return compact_dtypes(out)
 
 # ---------------------------------------------------------
 # 검증
@@ -190,66 +329,505 @@ def validate_df(df: pd.DataFrame) -> list[tuple]:
       - 동일 (terminal, berth) 내 동시에 머무는 선박 간 y_m 이격 >= MIN_CLEARANCE_M
     """
     problems: list[tuple] = []
-
-    # 행 단위 검사
-    for i, r in df.iterrows():
-        t = r.get("terminal")
-        b = int(r.get("berth", 0))
-        s = r.get("start")
-        e = r.get("end")
-
-        if t not in {"SND", "GAM"}:
-            problems.append((i, "terminal", "터미널 값 오류(SND/GAM)"))
-        if t == "SND" and b not in SND_BERTHS:
-            problems.append((i, "berth", "신선대 선석 범위(1~5) 위반"))
-        if t == "GAM" and b not in GAM_BERTHS:
-            problems.append((i, "berth", "감만 선석 범위(6~9) 위반"))
-        if pd.isna(s) or pd.isna(e) or s >= e:
-            problems.append((i, "time", "시작/종료 시간 오류"))
+    problems += _row_problems(df)
 
     # 그룹(terminal, berth)별 시간/간격 검사
-    for (t, b), g in df.groupby(["terminal", "berth"]):
-        g = g.sort_values("start").reset_index(drop=True)
-        # 시간 중첩
-        if (g["start"].shift(-1) < g["end"]).any():
-            problems.append(("overlap", f"{t}-{b}", "동일 선석 시간 중첩"))
-
-        # 같은 시간에 머무는 선박 간 y_m 간격 검사
-        n = len(g)
-        for i in range(n):
-            for j in range(i + 1, n):
-                if _overlap(g.loc[i, "start"], g.loc[i, "end"], g.loc[j, "start"], g.loc[j, "end"]):
-                    d = abs(float(g.loc[i, "y_m"]) - float(g.loc[j, "y_m"]))
-                    if d < MIN_CLEARANCE_M:
-                        problems.append(
-                            ("clearance", f"{t}-{b}", f"동시 계류 간 최소 이격 {MIN_CLEARANCE_M}m 위반 (Δ={d:.1f}m)")
-                        )
+    for (t, b), g in _berth_groups(df):
+        problems += _group_problems(t, b, g)
+    return problems
+
+def _berth_groups(df: pd.DataFrame) -> list:
+    """
+    (terminal, berth) 그룹을 터미널 문자열 → 선석 순으로
+      - terminal이 범주형(TERMINAL_DTYPE)이면 groupby가 범주 순(SND, GAM)으로 돌므로,
+        문자열 열일 때와 같은 순서(GAM, SND)로 맞춰 결과 순서를 고정
+    """
+    groups = df.groupby(["terminal", "berth"], observed=True, sort=False)
+    return sorted(groups, key=lambda kg: (str(kg[0][0]), kg[0][1]))
+
+def _group_problems(t, b, g: pd.DataFrame, occ=None) -> list[tuple]:
+    """
+    한 (terminal, berth) 그룹의 시간 중첩 / 동시 계류 이격 검사
+      occ: 행 라벨을 row_id로 쓴 선석별 y_m 점 색인(ValidationCache) — 있으면 이격은 색인 질의로
+    """
+    problems = []
+    cols = [c for c in ["start", "end", "y_m"] if c in g.columns]
+    g = g[cols].sort_values("start")
+    labels = g.index
+    g = g.reset_index(drop=True)
+    # 시간 중첩
+    if (g["start"].shift(-1) < g["end"]).any():
+        problems.append(("overlap", f"{t}-{b}", "동일 선석 시간 중첩"))
+
+    # 같은 시간에 머무는 선박 간 y_m 간격 검사
+    viol = _clearance_violations(g) if occ is None else _indexed_clearance_violations(occ, (t, b), labels)
+    for d in viol:
+        problems.append(
+            ("clearance", f"{t}-{b}", f"동시 계류 간 최소 이격 {MIN_CLEARANCE_M}m 위반 (Δ={d:.1f}m)")
+        )
     return problems
 
+def _row_problems(df: pd.DataFrame) -> list[tuple]:
+    """행 단위 검사(터미널/선석 범위/시간) — 열 단위 마스크, 문제 있는 행만 순서대로 풀어냄"""
+    n = len(df)
+    t = df["terminal"] if "terminal" in df else pd.Series([None] * n, index=df.index, dtype=object)
+    b = df["berth"].astype("int64") if "berth" in df else pd.Series(0, index=df.index)
+    s = df["start"] if "start" in df else pd.Series(pd.NaT, index=df.index)
+    e = df["end"] if "end" in df else pd.Series(pd.NaT, index=df.index)
+
+    snd, gam = (t == "SND").to_numpy(), (t == "GAM").to_numpy()
+    checks = [
+        (~(snd | gam), "terminal", "터미널 값 오류(SND/GAM)"),
+        (snd & ~b.isin(SND_BERTHS).to_numpy(), "berth", "신선대 선석 범위(1~5) 위반"),
+        (gam & ~b.isin(GAM_BERTHS).to_numpy(), "berth", "감만 선석 범위(6~9) 위반"),
+        ((s.isna() | e.isna()).to_numpy() | (s >= e).to_numpy(), "time", "시작/종료 시간 오류"),
+    ]
+    bad = np.zeros(n, dtype=bool)
+    for m, _, _ in checks:
+        bad |= m
+    labels = df.index
+    out = []
+    for pos in np.flatnonzero(bad):
+        for m, kind, msg in checks:
+            if m[pos]:
+                out.append((labels[pos], kind, msg))
+    return out
+
+def _clearance_violations(g: pd.DataFrame) -> list[float]:
+    """
+    start 기준 정렬된 한 선석의 행들 → 시간이 겹치는 (i<j) 쌍 중 |y_m 차| < MIN_CLEARANCE_M 인 차이값(i, j 순)
+      - 스윕: i마다 start_j < end_i 인 j는 정렬 순서상 i+1 .. k-1 (k = searchsorted(end_i))
+      - 나머지 조건(end_j > start_i, 결측 제외)은 후보 쌍에 한 번에 적용
+    """
+    n = len(g)
+    if n < 2:
+        return []
+    st = g["start"].to_numpy(dtype="datetime64[ns]").view("int64")
+    en = g["end"].to_numpy(dtype="datetime64[ns]").view("int64")
+    ok_s = ~g["start"].isna().to_numpy()
+    ok_e = ~g["end"].isna().to_numpy()
+    y = g["y_m"].to_numpy(dtype="float64")
+
+    # 정렬 시 결측 start는 뒤로 → 앞쪽 m개만 스윕
+    m = int(ok_s.sum())
+    if not ok_s[:m].all():
+        return []  # 정렬 전제가 깨진 경우(여기 오지 않음)
+    i_valid = ok_s[:m] & ok_e[:m]
+    k = np.searchsorted(st[:m], en[:m], side="left")
+    cnt = np.where(i_valid, np.maximum(k - np.arange(m) - 1, 0), 0)
+    total = int(cnt.sum())
+    if total == 0:
+        return []
+    ii = np.repeat(np.arange(m), cnt)
+    jj = ii + 1 + (np.arange(total) - np.repeat(np.cumsum(cnt) - cnt, cnt))
+    keep = ok_e[jj] & (en[jj] > st[ii])
+    d = np.abs(y[ii[keep]] - y[jj[keep]])
+    return [float(x) for x in d[d < MIN_CLEARANCE_M]]
+
+def _indexed_clearance_violations(occ, key, labels) -> list[float]:
+    """
+    _clearance_violations와 같은 결과(같은 (i, j) 순서)를 점유 색인 질의로
+      labels: start 순으로 정렬한 그룹 행 라벨 — i마다 시간이 겹치고 y_m 간격 < MIN_CLEARANCE_M 인 뒤쪽 j
+    """
+    pos = {lab: i for i, lab in enumerate(labels)}
+    out = []
+    for i, lab in enumerate(labels):
+        rect = occ.rects.get(lab)
+        if rect is None:      # 시간/y_m 결측 → 검사 제외(스윕과 같음)
+            continue
+        _, s, e, y, _ = rect
+        hits = occ.query(key, pd.Timestamp(s), pd.Timestamp(e), y, y, clearance=MIN_CLEARANCE_M, exclude=lab)
+        js = sorted(j for j in (pos.get(r, -1) for r in hits) if j > i)
+        out += [abs(y - occ.rects[labels[j]][3]) for j in js]
+    return out
+
 # ---------------------------------------------------------
-# 스냅(시간 5분 / 세로 30m)
+# 검증 캐시: (terminal, berth) 그룹별 결과를 들고 있다가 바뀐 행의 그룹만 다시 검사
 # ---------------------------------------------------------
-def snap_time_5min(ts: pd.Timestamp) -> pd.Timestamp:
-    if pd.isna(ts):
-        return ts
-    base = ts.replace(second=0, microsecond=0)
-    minutes = base.hour * 60 + base.minute
-    snapped = round(minutes / 5) * 5   # ← 5분 그리드
-    h, m = divmod(snapped, 60)
-    day_offset, h = divmod(h, 24)
-    return (base.normalize()
-            + pd.to_timedelta(day_offset, "D")
-            + pd.to_timedelta(h, "H")
-            + pd.to_timedelta(m, "m"))
+VALIDATION_COLS = ["terminal", "berth", "start", "end", "y_m"]
 
+def _group_key(t, b):
+    """groupby 키와 같은 (terminal, berth) — 결측이면 None(그룹에서 빠짐)"""
+    return None if pd.isna(t) or pd.isna(b) else (t, b)
 
-def snap_y_30m(y_m: float) -> float:
-    """세로 m 좌표를 30m 그리드로 스냅"""
+class ValidationCache:
+    """
+    validate_df 결과를 행/그룹 단위로 보관
+      - update(df): 검사 열(VALIDATION_COLS)의 행 해시로 바뀐 행을 찾고,
+        그 행이 떠난/들어간 (terminal, berth) 그룹만 다시 검사 → validate_df(df)와 같은 목록·순서
+      - 동시 계류 이격은 선석별 y_m 점 색인(OccupancyIndex, 행 라벨 = row_id)에 질의 — 바뀐 행만 색인 갱신
+      - 인덱스가 달라졌거나 새 그룹이 생기거나 많이 바뀌면 전체 재계산
+    """
+    REBUILD_RATIO = 0.25   # 바뀐 행이 이 비율을 넘으면 전체 재계산
+
+    def __init__(self):
+        self.index = None
+        self.hashes = None
+        self.keys = {}        # 행 라벨 → 그룹 키
+        self.occ = OccupancyIndex(by=("terminal", "berth"), points=True)   # 이격 검사용 점 색인
+        self.rows = {}        # 행 라벨 → 행 단위 문제
+        self.groups = {}      # 그룹 키 → 그룹 문제
+        self.order = []       # 그룹 순서(_berth_groups 순)
+        self.stats = {"full": 0, "incremental": 0, "groups_rechecked": 0}
+        self._flat = None
+
+    @staticmethod
+    def _hashes(df: pd.DataFrame) -> np.ndarray:
+        cols = [c for c in VALIDATION_COLS if c in df.columns]
+        return pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+
+    def _set_rows(self, df: pd.DataFrame, labels):
+        for lab in labels:
+            self.rows.pop(lab, None)
+        for lab, kind, msg in _row_problems(df):
+            self.rows.setdefault(lab, []).append((lab, kind, msg))
+
+    def rebuild(self, df: pd.DataFrame, hashes=None) -> list[tuple]:
+        self.index = df.index.copy()
+        self.hashes = self._hashes(df) if hashes is None else hashes
+        self.keys = dict(zip(df.index, map(_group_key, df["terminal"], df["berth"])))
+        self.rows = {}
+        self._set_rows(df, [])
+        self.groups, self.order = {}, []
+        self.occ.rebuild(df[[c for c in VALIDATION_COLS if c in df.columns]].assign(row_id=df.index))
+        occ = self._occ()
+        for (t, b), g in _berth_groups(df):
+            self.groups[(t, b)] = _group_problems(t, b, g, occ)
+            self.order.append((t, b))
+        self.stats["full"] += 1
+        self._flat = None
+        return self.problems()
+
+    def update(self, df: pd.DataFrame) -> list[tuple]:
+        """df의 검증 결과(바뀐 그룹만 재검사)"""
+        if self.index is None or not df.index.equals(self.index) or df.index.has_duplicates:
+            return self.rebuild(df)
+        h = self._hashes(df)
+        pos = np.flatnonzero(h != self.hashes)
+        if len(pos) == 0:
+            return self.problems()
+        if len(pos) > max(1, len(df) * self.REBUILD_RATIO):
+            return self.rebuild(df, h)
+
+        labels = df.index[pos]
+        changed = df.loc[labels]
+        new_keys = dict(zip(labels, map(_group_key, changed["terminal"], changed["berth"])))
+        affected = {self.keys.get(lab) for lab in labels} | set(new_keys.values())
+        affected.discard(None)
+        if any(k not in self.groups for k in affected):
+            return self.rebuild(df, h)   # 새 그룹 → groupby 순서를 다시 잡음
+
+        self._set_rows(changed, labels)
+        self.keys.update(new_keys)
+        occ = self._occ()
+        if occ is not None:
+            for lab, r in zip(labels, changed.to_dict("records")):
+                occ.upsert(lab, r)
+        for t, b in affected:
+            g = df[(df["terminal"] == t).to_numpy() & (df["berth"] == b).to_numpy()]
+            self.groups[(t, b)] = _group_problems(t, b, g, occ) if len(g) else []
+        self.hashes = h
+        self.stats["incremental"] += 1
+        self.stats["groups_rechecked"] += len(affected)
+        self._flat = None
+        return self.problems()
+
+    def _occ(self):
+        """이격 검사에 쓸 색인 — 행 라벨로 못 가리면(중복) None → 스윕(_clearance_violations)"""
+        return self.occ if self.occ.index is not None else None
+
+    def problems(self) -> list[tuple]:
+        """행 문제(인덱스 순) + 그룹 문제(_berth_groups 순) — validate_df와 같은 순서"""
+        if self._flat is None:
+            flat = [p for lab in self.index if lab in self.rows for p in self.rows[lab]]
+            for k in self.order:
+                flat += self.groups.get(k, [])
+            self._flat = flat
+        return list(self._flat)
+
+# ---------------------------------------------------------
+# 점유 색인: 터미널별 (start, end) × (y0, y1) 사각형 — "t에 안벽 구간 X를 누가 쓰나" (시간 칸 분할)
+# ---------------------------------------------------------
+OCCUPANCY_COLS = ["row_id", "terminal", "start", "end", "f", "e", "y_m"]
+OCCUPANCY_BUCKET_MIN = 6 * 60    # 시간 칸 폭(분) — 체류(보통 10~40시간)가 몇 칸에 걸치도록
+
+def _occupancy_rect(r, by=("terminal",), points: bool = False) -> tuple | None:
+    """
+    행 → (key, start_ns, end_ns, y0, y1) — 키/시간이 없으면 None
+      by: 키 열(기본 terminal, 1개면 값 그대로 / 여러 개면 튜플)
+      points=False: f/e 구간, 없으면 y_m 한 점(그것도 없으면 0) — 빈 키("")도 제외
+      points=True: y_m 한 점만(없으면 None) — 검증(동시 계류 이격)용, 빈 터미널("")도 validate_df처럼 한 그룹
+    """
+    ks = tuple(r.get(c) for c in by)
+    if any(pd.isna(k) or (k == "" and not points) for k in ks):
+        return None
+    s, e = r.get("start"), r.get("end")
+    if pd.isna(s) or pd.isna(e):
+        return None
+    key = ks[0] if len(ks) == 1 else ks
+    f, en = pd.to_numeric(r.get("f"), errors="coerce"), pd.to_numeric(r.get("e"), errors="coerce")
+    if not points and pd.notna(f) and pd.notna(en):
+        y0, y1 = min(float(f), float(en)), max(float(f), float(en))
+    else:
+        y = pd.to_numeric(r.get("y_m"), errors="coerce")
+        if points and pd.isna(y):
+            return None
+        y0 = y1 = float(y) if pd.notna(y) else 0.0
+    return key, pd.Timestamp(s).value, pd.Timestamp(e).value, y0, y1
+
+class OccupancyIndex:
+    """
+    키(기본 터미널)별 점유 색인 — 시간 칸(OCCUPANCY_BUCKET_MIN) 분할 구조
+      - 각 행은 자기 [start, end)가 걸친 시간 칸마다 등록 → 질의는 창이 걸친 칸의 행만 모아 정확히 거름
+      - 비용: 넣기/빼기 O(걸친 칸 수), 질의 O(창이 걸친 칸 수 + 그 칸들에 등록된 행 수)
+        (전체 행 수와 무관 — 한 척이 아주 길게 머물러도 그 선박의 칸만 늘어남)
+      - query: 시점/시간창/사각형(+이격) 질의, conflicts: 한 행과 겹치는 행
+      - update(df): 점유 열의 행 해시로 바뀐 행만 빼고 넣음(많이 바뀌면 재구성)
+      - update_rows(df, labels): 이동한 행만 바로 반영(_apply_move)
+      by=("terminal", "berth"), points=True: 선석 그룹별 y_m 점 색인(ValidationCache 이격 검사)
+    """
+    REBUILD_RATIO = 0.25   # 바뀐 행이 이 비율을 넘으면 재구성
+
+    def __init__(self, df: pd.DataFrame | None = None, by=("terminal",), points: bool = False,
+                 bucket_min: int = OCCUPANCY_BUCKET_MIN):
+        self.by, self.points = tuple(by), points
+        self.width = int(bucket_min) * _NS_PER_MIN
+        self.cols = list(dict.fromkeys(OCCUPANCY_COLS + list(self.by)))
+        self.index = None
+        self.hashes = None
+        self.rids = {}        # 행 라벨 → row_id
+        self.rects = {}       # row_id → (key, start_ns, end_ns, y0, y1)
+        self.buckets = {}     # key → {시간 칸 번호: {row_id, ...}}
+        self.stats = {"full": 0, "incremental": 0, "rows_updated": 0}
+        if df is not None:
+            self.rebuild(df)
+
+    def _hashes(self, df: pd.DataFrame) -> np.ndarray:
+        cols = [c for c in self.cols if c in df.columns]
+        return pd.util.hash_pandas_object(df[cols], index=False).to_numpy()
+
+    def _span(self, s: int, e: int) -> range:
+        """[s, e)가 걸친 시간 칸 번호(길이 0이면 s의 칸)"""
+        w = self.width
+        return range(s // w, max(s, e - 1) // w + 1)
+
+    def _add(self, row_id, rect):
+        self.rects[row_id] = rect
+        bk = self.buckets.setdefault(rect[0], {})
+        for i in self._span(rect[1], rect[2]):
+            bk.setdefault(i, set()).add(row_id)
+
+    # ----- 행 단위 갱신 -----
+    def remove(self, row_id):
+        rect = self.rects.pop(row_id, None)
+        if rect is None:
+            return
+        bk = self.buckets[rect[0]]
+        for i in self._span(rect[1], rect[2]):
+            cell = bk.get(i)
+            if cell is not None:
+                cell.discard(row_id)
+                if not cell:
+                    del bk[i]
+
+    def upsert(self, row_id, row) -> bool:
+        """row_id의 점유를 row(dict/Series) 기준으로 교체 → 색인에 들어갔는지"""
+        self.remove(row_id)
+        rect = _occupancy_rect(row, self.by, self.points)
+        if rect is None:
+            return False
+        self._add(row_id, rect)
+        return True
+
+    def rebuild(self, df: pd.DataFrame, hashes=None):
+        self.index = df.index.copy()
+        self.hashes = self._hashes(df) if hashes is None else hashes
+        self.rids, self.rects, self.buckets = {}, {}, {}
+        if "row_id" not in df.columns or df["row_id"].duplicated().any():
+            self.index = None   # row_id로 행을 못 가리면 색인 없음(다음 update 때 다시 시도)
+            return self
+        for lab, r in zip(df.index, df.to_dict("records")):
+            rid = r["row_id"]
+            self.rids[lab] = rid
+            rect = _occupancy_rect(r, self.by, self.points)
+            if rect is not None:
+                self._add(rid, rect)
+        self.stats["full"] += 1
+        return self
+
+    def _upsert_labels(self, df: pd.DataFrame, labels):
+        for lab in labels:
+            r = df.loc[lab].to_dict()
+            old = self.rids.get(lab)
+            if old is not None and old != r["row_id"]:
+                self.remove(old)
+            self.rids[lab] = r["row_id"]
+            self.upsert(r["row_id"], r)
+        self.stats["rows_updated"] += len(labels)
+
+    def update(self, df: pd.DataFrame):
+        """df와 맞춤(바뀐 행만 다시 넣음)"""
+        if self.index is None or not df.index.equals(self.index) or df.index.has_duplicates:
+            return self.rebuild(df)
+        h = self._hashes(df)
+        pos = np.flatnonzero(h != self.hashes)
+        if len(pos) == 0:
+            return self
+        if len(pos) > max(1, len(df) * self.REBUILD_RATIO) or df["row_id"].iloc[pos].duplicated().any():
+            return self.rebuild(df, h)
+        self._upsert_labels(df, df.index[pos])
+        self.hashes = h
+        self.stats["incremental"] += 1
+        return self
+
+    def update_rows(self, df: pd.DataFrame, labels):
+        """df에서 labels 행만 바뀐 것을 알 때(해시 전체 계산 없이)"""
+        if self.index is None or not df.index.equals(self.index):
+            return self.rebuild(df)
+        labels = list(labels)
+        if labels:
+            self.hashes[self.index.get_indexer(labels)] = self._hashes(df.loc[labels])
+            self._upsert_labels(df, labels)
+        return self
+
+    # ----- 질의 -----
+    def query(self, terminal, t0, t1=None, y0=None, y1=None, clearance: float = 0.0, exclude=None) -> list:
+        """
+        키(terminal)에서 시간 [t0, t1)에 머물고(t1 없으면 시점 t0) 안벽 [y0, y1]에 걸치는 row_id (start 순)
+          - y0 없으면 시간만, y1 없으면 y0 한 점
+          - clearance > 0: 안벽 간격이 clearance 미만이면 걸침으로 봄
+        """
+        bk = self.buckets.get(terminal)
+        if not bk:
+            return []
+        a = pd.Timestamp(t0).value
+        b = a if t1 is None else pd.Timestamp(t1).value
+        span = self._span(a, b)
+        cells = (bk[i] for i in span if i in bk) if len(span) <= len(bk) else \
+            (c for i, c in bk.items() if span.start <= i < span.stop)
+        if y0 is not None:
+            y1 = y0 if y1 is None else y1
+            y0, y1 = min(y0, y1), max(y0, y1)
+        out = []
+        for rid in set().union(*cells):
+            if rid == exclude:
+                continue
+            _, s, e, r0, r1 = self.rects[rid]
+            if e <= a or (t1 is not None and s >= b) or (t1 is None and s > a):
+                continue
+            if y0 is not None:
+                gap = max(y0 - r1, r0 - y1)
+                if (gap >= clearance) if clearance > 0 else (gap > 0):
+                    continue
+            out.append(rid)
+        out.sort(key=lambda rid: (self.rects[rid][1], rid))
+        return out
+
+    def conflicts(self, row_id, clearance: float = MIN_CLEARANCE_M) -> list:
+        """row_id와 시간이 겹치고 안벽 간격이 clearance 미만인 row_id"""
+        rect = self.rects.get(row_id)
+        if rect is None:
+            return []
+        t, s, e, y0, y1 = rect
+        return self.query(t, pd.Timestamp(s), pd.Timestamp(e), y0, y1, clearance=clearance, exclude=row_id)
+
+# ---------------------------------------------------------
+# 스냅(시간 MOVE_GRID_MIN분 / 세로 Y_GRID_M m)
+# ---------------------------------------------------------
+_NS_PER_MIN = 60 * 10**9
+_NS_PER_DAY = 24 * 60 * _NS_PER_MIN
+
+def snap_time(x, grid_min: int = MOVE_GRID_MIN):
+    """
+    시각을 당일 00:00 기준 grid_min분 그리드로 스냅(초 이하는 버림, 반올림은 짝수 쪽)
+      x: Timestamp | Series | ndarray | DatetimeIndex — 같은 모양으로 반환, 결측은 그대로
+    """
+    if isinstance(x, pd.Series):
+        return pd.Series(snap_time(x.to_numpy(dtype="datetime64[ns]"), grid_min), index=x.index, name=x.name)
+    if isinstance(x, pd.DatetimeIndex):
+        return pd.DatetimeIndex(snap_time(x.to_numpy(dtype="datetime64[ns]"), grid_min), name=x.name)
+    if not isinstance(x, np.ndarray):
+        if pd.isna(x):
+            return x
+        return pd.Timestamp(snap_time(np.array([pd.Timestamp(x).to_datetime64()], dtype="datetime64[ns]"), grid_min)[0])
+
+    ns = x.astype("datetime64[ns]").view("int64")
+    nat = np.isnat(x.astype("datetime64[ns]"))
+    day = ns // _NS_PER_DAY * _NS_PER_DAY
+    minutes = (ns - day) // _NS_PER_MIN
+    snapped = day + (np.round(minutes / grid_min) * grid_min).astype("int64") * _NS_PER_MIN
+    return np.where(nat, ns, snapped).view("datetime64[ns]")
+
+def snap_y(y, grid_m: float = Y_GRID_M):
+    """
+    세로 m 좌표를 grid_m 그리드로 스냅(반올림은 짝수 쪽)
+      y: 숫자 | Series | ndarray — 스칼라가 숫자가 아니면 0.0, 배열은 결측 유지
+    """
+    if isinstance(y, pd.Series):
+        return pd.Series(snap_y(pd.to_numeric(y, errors="coerce").to_numpy(dtype="float64"), grid_m),
+                         index=y.index, name=y.name)
+    if isinstance(y, np.ndarray):
+        return np.round(y.astype("float64") / grid_m) * grid_m
     try:
-        y_m = float(y_m)
+        y = float(y)
     except Exception:
         return 0.0
-    return round(y_m / Y_GRID_M) * Y_GRID_M
+    return round(y / grid_m) * grid_m
+
+def snap_time_5min(ts: pd.Timestamp) -> pd.Timestamp:
+    """snap_time(ts, 5) — 기존 호출부 호환"""
+    return snap_time(ts, 5)
+
+def snap_y_30m(y_m: float) -> float:
+    """세로 m 좌표를 30m 그리드로 스냅"""
+    return snap_y(y_m, Y_GRID_M)
+
+# ---------------------------------------------------------
+# 일괄 이동: 여러 행을 한 번에 시간/세로로 옮기고 스냅
+# ---------------------------------------------------------
+def shift(df: pd.DataFrame, row_ids, dmin: float = 0, dy: float = 0.0,
+          time_grid_min: int = MOVE_GRID_MIN, y_grid_m: float = Y_GRID_M) -> tuple[pd.DataFrame, pd.Index]:
+    """
+    row_id가 row_ids인 행들을 dmin분 / dy m 이동 → (새 DataFrame, 실제로 바뀐 행의 인덱스)
+      - 시간: start/end 둘 다 있는 행만, 각각 (값 + dmin) 후 time_grid_min 스냅
+      - 세로: f/e 둘 다 유한하고 길이(e-f)가 0이 아닌 행만, 중심(mid + dy)을 y_grid_m 스냅 후 길이 유지
+      - 값이 그대로인 행은 바뀐 행에서 빠짐, 열 dtype은 유지
+    """
+    out = df.copy()
+    sel = out["row_id"].isin(pd.Index(np.atleast_1d(row_ids))).to_numpy()
+    if not sel.any() or (not dmin and not dy):
+        return out, out.index[:0]
+    idx = out.index[sel]
+    changed = np.zeros(len(idx), dtype=bool)
+
+    if dmin and "start" in out and "end" in out:
+        s0 = pd.to_datetime(out.loc[idx, "start"]).to_numpy(dtype="datetime64[ns]")
+        e0 = pd.to_datetime(out.loc[idx, "end"]).to_numpy(dtype="datetime64[ns]")
+        ok = ~(np.isnat(s0) | np.isnat(e0))
+        delta = np.timedelta64(int(round(dmin * _NS_PER_MIN)), "ns")
+        s1 = np.where(ok, snap_time(s0 + delta, time_grid_min), s0)
+        e1 = np.where(ok, snap_time(e0 + delta, time_grid_min), e0)
+        moved = ok & ((s1 != s0) | (e1 != e0))
+        if moved.any():
+            out.loc[idx, "start"] = pd.Series(s1, index=idx).astype(out["start"].dtype)
+            out.loc[idx, "end"] = pd.Series(e1, index=idx).astype(out["end"].dtype)
+            changed |= moved
+
+    if dy and "f" in out and "e" in out:
+        f0 = pd.to_numeric(out.loc[idx, "f"], errors="coerce").to_numpy(dtype="float64")
+        e0 = pd.to_numeric(out.loc[idx, "e"], errors="coerce").to_numpy(dtype="float64")
+        L = e0 - f0
+        ok = np.isfinite(f0) & np.isfinite(e0) & np.isfinite(L) & (np.abs(L) > 0)
+        mid = snap_y((f0 + e0) / 2.0 + float(dy), y_grid_m)
+        f1 = np.where(ok, mid - np.abs(L) / 2.0, f0)
+        e1 = np.where(ok, mid + np.abs(L) / 2.0, e0)
+        moved = ok & ((np.abs(f1 - f0) >= 1e-6) | (np.abs(e1 - e0) >= 1e-6))
+        if moved.any():
+            out.loc[idx, "f"] = pd.Series(f1, index=idx).astype(out["f"].dtype)
+            out.loc[idx, "e"] = pd.Series(e1, index=idx).astype(out["e"].dtype)
+            changed |= moved
+
+    return out, idx[changed]
 
 # ===== (추가) row_id 보장 =====
 def ensure_row_id(df: pd.DataFrame) -> pd.DataFrame:
@@ -262,7 +840,14 @@ def ensure_row_id(df: pd.DataFrame) -> pd.DataFrame:
 # ===== (추가) 정규화 ↔ 원본 동기화 =====
 #  - normalize_df와 동일 순서라고 가정하지 않고, row_id 기준으로 반영
 #  - KOR_MAP 역매핑을 사용해 가능한 컬럼만 원본에 반영
-def sync_raw_with_norm(raw_df: pd.DataFrame, norm_df: pd.DataFrame) -> pd.DataFrame:
+#  - row_ids를 주면 그 행만 반영(편집 로그의 row_id → edited_row_ids)
+SYNC_STD_COLS = ["start","end","voyage","vessel","stype","berth","bp","f","e","berthing","quarantine"]
+
+def edited_row_ids(logs) -> set:
+    """편집 로그(list[dict]) → 바뀐 row_id 집합"""
+    return {r.get("row_id") for r in (logs or []) if r.get("row_id") is not None}
+
+def sync_raw_with_norm(raw_df: pd.DataFrame, norm_df: pd.DataFrame, row_ids=None) -> pd.DataFrame:
     if raw_df is None or norm_df is None:
         return raw_df
     if "row_id" not in raw_df.columns or "row_id" not in norm_df.columns:
@@ -270,25 +855,155 @@ def sync_raw_with_norm(raw_df: pd.DataFrame, norm_df: pd.DataFrame) -> pd.DataFr
         return raw_df.copy()
 
     out = raw_df.copy()
+    src = norm_df if row_ids is None else norm_df[norm_df["row_id"].isin(list(row_ids))]
+    src = src.drop_duplicates("row_id", keep="last").set_index("row_id")
+    mask = out["row_id"].isin(src.index).to_numpy()
+    if src.empty or not mask.any():
+        return out
+    rids = out.loc[mask, "row_id"]
+
     # 역매핑: 표준컬럼 -> 가능한 한글 컬럼 후보(여럿일 수 있음)
     inv = {}
     for k, v in KOR_MAP.items():
         inv.setdefault(v, []).append(k)
 
-    # 표준 → 원본 반영 후보
-    std_cols = ["start","end","voyage","vessel","stype","berth","bp","f","e","berthing","quarantine"]
-    g = norm_df.set_index("row_id")
-    for rid, row in g.iterrows():
-        if rid not in out["row_id"].values:
+    # 표준 컬럼마다: 원본 컬럼 후보들 중 존재하는 첫 번째에 row_id로 맞춰 한 번에 씀
+    for std_col in SYNC_STD_COLS:
+        if std_col not in src.columns:
             continue
-        mask = out["row_id"] == rid
-        for std_col in std_cols:
-            if std_col not in row.index:
-                continue
-            val = row.get(std_col)
-            # 원본 컬럼 후보들 중 존재하는 첫 번째에 씀
-            for kor_col in inv.get(std_col, []):
-                if kor_col in out.columns:
-                    out.loc[mask, kor_col] = val
-                    break
-    return out
\ No newline at end of file
+        kor_col = next((k for k in inv.get(std_col, []) if k in out.columns), None)
+        if kor_col is None:
+            continue
+        vals = src[std_col].reindex(rids)
+        cast = _lossless_cast(vals, out[kor_col].dtype)
+        if cast is not None:
+            out.loc[mask, kor_col] = cast.to_numpy()
+        else:
+            # 원본 dtype에 못 담으면 행 단위 대입처럼 공통 dtype으로 올림(예: int → float, 숫자 → object)
+            col = out[kor_col].astype(object)
+            col.loc[mask] = vals.astype(object).to_numpy()
+            out[kor_col] = col.infer_objects()
+    return out
+
+
+def _lossless_cast(vals: pd.Series, dtype):
+    """vals를 dtype으로 바꿔도 값이 그대로면 바꾼 Series, 아니면 None"""
+    if vals.dtype == dtype:
+        return vals
+    try:
+        cast = vals.astype(dtype)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return cast if _same_cell(cast, vals).all() else None
+
+# ===== (추가) 크롤 간 변경분(change feed) =====
+#  - 이전/새 원본을 키(기본: 모선항차)로 맞춰 추가/삭제/필드 변경만 추림
+#  - 정규화는 바뀐 행만 다시 하고 나머지는 이전 정규화 행을 그대로 재사용
+def _same_cell(a: pd.Series, b: pd.Series) -> np.ndarray:
+    """원소별 동일 여부(결측끼리는 같음으로 봄)"""
+    a, b = a.astype(object), b.astype(object)
+    return ((a == b) | (a.isna() & b.isna())).to_numpy()
+
+
+def diff_raw_by_key(prev_raw: pd.DataFrame, new_raw: pd.DataFrame, key: str = "모선항차"):
+    """
+    두 원본 사이 변경분
+      {"added": [key...], "removed": [key...], "changed": {key: {col: (old, new)}}}
+      - row_id 등 앱 내부 컬럼은 비교 제외
+      - 키 컬럼이 없거나, 키 중복, 컬럼 구성이 다르면 None (→ 전체 재정규화)
+    """
+    if prev_raw is None or new_raw is None or key not in prev_raw.columns or key not in new_raw.columns:
+        return None
+    cols = [c for c in new_raw.columns if c != "row_id"]
+    if set(cols) != {c for c in prev_raw.columns if c != "row_id"}:
+        return None
+    a = prev_raw[cols].assign(_k=prev_raw[key].astype(str).str.strip())
+    b = new_raw[cols].assign(_k=new_raw[key].astype(str).str.strip())
+    if a["_k"].duplicated().any() or b["_k"].duplicated().any():
+        return None
+    a, b = a.set_index("_k"), b.set_index("_k")
+
+    common = b.index.intersection(a.index)
+    changed = {}
+    if len(common):
+        a_c, b_c = a.loc[common], b.loc[common]
+        diff_cols = {c: ~_same_cell(a_c[c], b_c[c]) for c in cols}
+        any_diff = np.logical_or.reduce(list(diff_cols.values()))
+        for pos in np.flatnonzero(any_diff):
+            k = common[pos]
+            changed[k] = {c: (a_c[c].iat[pos], b_c[c].iat[pos]) for c in cols if diff_cols[c][pos]}
+    return {
+        "added": [k for k in b.index if k not in a.index],
+        "removed": [k for k in a.index if k not in b.index],
+        "changed": changed,
+    }
+
+
+def diff_rows_by_id(prev_raw: pd.DataFrame, new_raw: pd.DataFrame, key: str = "row_id"):
+    """
+    표 편집 전/후 원본을 row_id로 맞춰 비교 (행 해시 비교 — 셀 단위 변경 내용은 안 만듦)
+      {"added": [id...], "removed": [id...], "changed": [id...]}
+      - row_id가 없거나 중복, 컬럼 구성이 다르거나 해시 불가 값이 있으면 None (→ 전체 재정규화)
+    """
+    if prev_raw is None or new_raw is None or key not in prev_raw.columns or key not in new_raw.columns:
+        return None
+    cols = [c for c in new_raw.columns if c != key]
+    if set(cols) != {c for c in prev_raw.columns if c != key}:
+        return None
+    if prev_raw[key].duplicated().any() or new_raw[key].duplicated().any() or new_raw[key].isna().any():
+        return None
+    try:
+        ha = pd.Series(pd.util.hash_pandas_object(prev_raw[cols], index=False).to_numpy(), index=prev_raw[key])
+        hb = pd.Series(pd.util.hash_pandas_object(new_raw[cols], index=False).to_numpy(), index=new_raw[key])
+    except TypeError:
+        return None
+    common = hb.index.intersection(ha.index)
+    diff = ha.loc[common].to_numpy() != hb.loc[common].to_numpy()
+    return {
+        "added": hb.index.difference(ha.index).tolist(),
+        "removed": ha.index.difference(hb.index).tolist(),
+        "changed": common[diff].tolist(),
+    }
+
+
+def renormalize_rows(norm_prev: pd.DataFrame, raw_new: pd.DataFrame, dirty_keys,
+                     raw_key: str = "row_id", norm_key: str = "row_id") -> pd.DataFrame:
+    """
+    바뀐 행만 정규화해 이전 정규화 결과에 이어 붙임 (결과는 ensure_row_id(normalize_df(raw_new))와 같은 모양)
+      - raw_new[raw_key] ↔ norm_prev[norm_key]를 문자열(strip) 기준으로 매칭(둘 다 정수면 값 그대로)
+      - dirty_keys에 있거나 이전 결과에 없는 행 → normalize_df
+      - 나머지 → 이전 정규화 행 재사용, row_id는 raw_new 것으로 교체
+      - 매칭 불가(키 중복 등)면 전체 정규화
+    """
+    def full():
+        return ensure_row_id(normalize_df(raw_new))
+
+    if norm_prev is None or norm_prev.empty or raw_key not in raw_new.columns or norm_key not in norm_prev.columns:
+        return full()
+    rk, nk = raw_new[raw_key], norm_prev[norm_key]
+    as_int = pd.api.types.is_integer_dtype(rk) and pd.api.types.is_integer_dtype(nk)   # row_id끼리면 그대로 비교
+    if not as_int:
+        rk, nk = rk.astype(str).str.strip(), nk.astype(str).str.strip()
+    if rk.duplicated().any() or nk.duplicated().any():
+        return full()
+
+    dirty = set(dirty_keys) if as_int else {str(k).strip() for k in dirty_keys}
+    reuse = (rk.isin(nk) & ~rk.isin(dirty)).to_numpy()
+    row_ids = raw_new["row_id"].to_numpy() if "row_id" in raw_new.columns else np.arange(len(raw_new))
+
+    fresh = normalize_df(raw_new.loc[~reuse])
+    prev = norm_prev.drop(columns=["row_id"], errors="ignore")
+    if list(prev.columns) != list(fresh.columns):
+        return full()
+    reused = prev.set_axis(nk.to_numpy()).loc[rk[reuse].to_numpy()]
+
+    pieces = []
+    if len(fresh):
+        pieces.append(fresh.set_axis(np.flatnonzero(~reuse)))
+    if len(reused):
+        pieces.append(reused.set_axis(np.flatnonzero(reuse)))
+    if not pieces:
+        return full()
+    out = compact_dtypes(pd.concat(pieces).sort_index())   # 범주가 다른 조각을 합치면 object로 풀림
+    out.insert(0, "row_id", row_ids[out.index.to_numpy()])
+    return out.reset_index(drop=True)
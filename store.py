@@ -0,0 +1,322 @@
+# =========================
+# store.py
+# =========================
+# 크롤링 결과 SQLite 저장소 (README의 "사내 DB")
+#  - collect_berth_info 결과 1회 = 스냅샷 1건(타임스탬프 + 조회조건)
+#  - 행 본문은 내용 해시(row_hash) 기준 1번만 저장(row_bodies) — 안 바뀐 행은 크롤마다 다시 쓰지 않음
+#  - 스냅샷 ↔ 행 연결은 (snapshot_id, pos) → (voyage, row_hash) → 스냅샷마다 저장 당시 본문 그대로 복원
+#    (같은 모선항차가 한 크롤에 두 번 나와도 두 행 모두 남음)
+#  - voyages: 모선항차별 최신 상태 + (terminal, berth, start) 인덱스
+#  - 선박 제원 마스터(vessels): VesselFinder 길이/폭 영구 캐시 + CSV 일괄 등록
+import os
+import json
+import hashlib
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import (
+    create_engine, MetaData, Table, Column, Integer, Float, String, Text, DateTime, Index,
+    select, inspect, text,
+)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from schema import _infer_terminal_from_berth, _coerce_datetime
+
+# ---------------------------------------------------------
+# 설정
+# ---------------------------------------------------------
+DB_URL = os.environ.get(
+    "BERTH_DB_URL",
+    "sqlite:///" + os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "berth.sqlite"),
+)
+VOYAGE_COL = "모선항차"
+VESSEL_NEG_TTL_SEC = 6 * 3600    # 못 찾은/실패한 선박은 이 시간 뒤 다시 조회
+_SQL_CHUNK = 500                 # 문 1개당 바인드 변수 상한 여유(IN (...), 여러 행 VALUES)
+
+metadata = MetaData()
+
+crawl_snapshots = Table(
+    "crawl_snapshots", metadata,
+    Column("id", Integer, primary_key=True, autoincrement=True),
+    Column("taken_at", DateTime, nullable=False),
+    Column("v_time", String(16)),
+    Column("route", String(16)),
+    Column("berth", String(8)),
+    Column("n_rows", Integer, nullable=False),
+    Column("columns", Text, nullable=False),    # 원본 컬럼 순서(JSON)
+)
+
+voyages = Table(
+    "voyages", metadata,
+    Column("voyage", String(64), primary_key=True),
+    Column("terminal", String(8)),
+    Column("berth", Integer),
+    Column("start", DateTime),
+    Column("row_hash", String(40), nullable=False),
+    Column("row_json", Text, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+    Index("ix_voyages_terminal_berth_start", "terminal", "berth", "start"),
+)
+
+row_bodies = Table(
+    "row_bodies", metadata,
+    Column("row_hash", String(40), primary_key=True),
+    Column("row_json", Text, nullable=False),
+)
+
+snapshot_rows = Table(
+    "snapshot_rows", metadata,
+    Column("snapshot_id", Integer, primary_key=True),
+    Column("pos", Integer, primary_key=True),
+    Column("voyage", String(64), nullable=False),
+    Column("row_hash", String(40)),     # NULL = 예전 형식(본문은 voyages 최신본)
+)
+
+vessels = Table(
+    "vessels", metadata,
+    Column("name_key", String(128), primary_key=True),   # name.strip().lower()
+    Column("name", String(128), nullable=False),
+    Column("length_m", Float),                             # NULL = 못 찾음(negative)
+    Column("beam_m", Float),
+    Column("source", String(16), nullable=False),          # "vesselfinder" | "import"
+    Column("updated_at", DateTime, nullable=False),
+)
+
+_engines = {}
+
+def get_engine(url: str | None = None):
+    """URL별 엔진 1개(테이블 자동 생성)"""
+    url = url or DB_URL
+    eng = _engines.get(url)
+    if eng is None:
+        if url.startswith("sqlite:///"):
+            os.makedirs(os.path.dirname(url[len("sqlite:///"):]) or ".", exist_ok=True)
+        eng = create_engine(url, future=True)
+        metadata.create_all(eng)
+        _migrate(eng)
+        _engines[url] = eng
+    return eng
+
+def _migrate(eng):
+    """예전 DB: snapshot_rows에 row_hash 열 추가(기존 행은 NULL → voyages 최신본으로 읽음)"""
+    if "row_hash" not in {c["name"] for c in inspect(eng).get_columns("snapshot_rows")}:
+        with eng.begin() as con:
+            con.execute(text("ALTER TABLE snapshot_rows ADD COLUMN row_hash VARCHAR(40)"))
+
+# ---------------------------------------------------------
+# 내부 유틸
+# ---------------------------------------------------------
+def _jsonable(v):
+    if v is None:
+        return None
+    if isinstance(v, float) and pd.isna(v):
+        return None
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    if hasattr(v, "item"):          # numpy 스칼라
+        return v.item()
+    return v
+
+def _row_key(rec: dict) -> str:
+    """모선항차 우선, 없으면 선박명+입항예정일시"""
+    v = str(rec.get(VOYAGE_COL) or "").strip()
+    if v:
+        return v
+    return f"{rec.get('선박명', '')}|{rec.get('입항 예정일시', rec.get('입항예정일시', ''))}"
+
+def _index_fields(rec: dict) -> tuple:
+    """인덱스 컬럼(terminal, berth, start) 산출 — 정규화와 같은 규칙"""
+    berth_raw = "".join(ch for ch in str(rec.get("선석", "")) if ch.isdigit())
+    berth = int(berth_raw) if berth_raw else 0
+    start = _coerce_datetime(rec.get("입항 예정일시", rec.get("입항예정일시")))
+    start = None if pd.isna(start) else start.to_pydatetime()
+    return _infer_terminal_from_berth(berth), berth, start
+
+# ---------------------------------------------------------
+# 저장
+# ---------------------------------------------------------
+def save_snapshot(raw: pd.DataFrame, v_time=None, route=None, berth=None,
+                  taken_at: datetime | None = None, url: str | None = None) -> int | None:
+    """
+    크롤링 원본을 스냅샷으로 저장하고 snapshot_id 반환
+      - 모선항차 컬럼이 없으면(알림 프레임 등) 저장하지 않고 None
+      - row_id 같은 앱 내부 컬럼은 저장하지 않음
+      - 행마다 (순서, 모선항차 키, 본문 해시)를 기록 — 키가 겹치는 행도 버리지 않음
+      - 본문은 해시 기준 한 번만 쓰고, voyages(키별 최신 상태)는 바뀐 것만 갱신 — 둘 다 _SQL_CHUNK 단위
+    """
+    if raw is None or raw.empty or VOYAGE_COL not in raw.columns:
+        return None
+
+    cols = [c for c in raw.columns if c != "row_id"]
+    now = taken_at or datetime.now()
+    latest, bodies, links = {}, {}, []
+    for rec in raw[cols].to_dict("records"):
+        rec = {k: _jsonable(v) for k, v in rec.items()}
+        key = _row_key(rec)
+        body = json.dumps(rec, ensure_ascii=False, sort_keys=True)
+        h = hashlib.sha1(body.encode("utf-8")).hexdigest()
+        terminal, b, start = _index_fields(rec)
+        latest[key] = {   # 같은 키가 또 나오면 뒤 행이 최신 상태
+            "voyage": key, "terminal": terminal, "berth": b, "start": start,
+            "row_hash": h, "row_json": body, "updated_at": now,
+        }
+        bodies[h] = {"row_hash": h, "row_json": body}
+        links.append((key, h))
+
+    eng = get_engine(url)
+    with eng.begin() as con:
+        vals = list(bodies.values())
+        for i in range(0, len(vals), _SQL_CHUNK // 2):
+            con.execute(sqlite_insert(row_bodies).values(vals[i:i + _SQL_CHUNK // 2]).on_conflict_do_nothing())
+        vals = list(latest.values())
+        for i in range(0, len(vals), _SQL_CHUNK // 8):
+            stmt = sqlite_insert(voyages).values(vals[i:i + _SQL_CHUNK // 8])
+            con.execute(stmt.on_conflict_do_update(
+                index_elements=[voyages.c.voyage],
+                set_={c: stmt.excluded[c] for c in ("terminal", "berth", "start", "row_hash", "row_json", "updated_at")},
+                where=voyages.c.row_hash != stmt.excluded.row_hash,   # 바뀐 행만 갱신
+            ))
+        sid = con.execute(
+            crawl_snapshots.insert().values(
+                taken_at=now, v_time=v_time, route=route, berth=berth,
+                n_rows=len(links), columns=json.dumps(cols, ensure_ascii=False),
+            )
+        ).inserted_primary_key[0]
+        if links:
+            con.execute(snapshot_rows.insert(), [
+                {"snapshot_id": sid, "pos": i, "voyage": k, "row_hash": h} for i, (k, h) in enumerate(links)
+            ])
+    return sid
+
+# ---------------------------------------------------------
+# 조회
+# ---------------------------------------------------------
+def latest_snapshot_meta(url: str | None = None) -> dict | None:
+    """가장 최근 스냅샷의 메타(id, taken_at, v_time, route, berth, n_rows)"""
+    eng = get_engine(url)
+    with eng.connect() as con:
+        row = con.execute(
+            select(crawl_snapshots).order_by(crawl_snapshots.c.id.desc()).limit(1)
+        ).mappings().first()
+    return dict(row) if row else None
+
+def load_snapshot(snapshot_id: int, url: str | None = None) -> pd.DataFrame:
+    """
+    스냅샷 1건을 원본(크롤러 컬럼) DataFrame으로 복원
+      - 행 본문은 그 스냅샷을 저장할 때의 것(row_bodies)
+      - 예전 형식 행(row_hash NULL)만 voyage별 최신본
+    """
+    eng = get_engine(url)
+    with eng.connect() as con:
+        cols_json = con.execute(
+            select(crawl_snapshots.c.columns).where(crawl_snapshots.c.id == snapshot_id)
+        ).scalar()
+        if cols_json is None:
+            return pd.DataFrame()
+        bodies = con.execute(
+            select(row_bodies.c.row_json, voyages.c.row_json)
+            .select_from(snapshot_rows)
+            .outerjoin(row_bodies, row_bodies.c.row_hash == snapshot_rows.c.row_hash)
+            .outerjoin(voyages, voyages.c.voyage == snapshot_rows.c.voyage)
+            .where(snapshot_rows.c.snapshot_id == snapshot_id)
+            .order_by(snapshot_rows.c.pos)
+        ).all()
+    recs = [json.loads(own if own is not None else cur) for own, cur in bodies if (own or cur) is not None]
+    return pd.DataFrame(recs, columns=json.loads(cols_json))
+
+def load_latest_snapshot(url: str | None = None) -> tuple[pd.DataFrame, dict | None]:
+    """(원본 DataFrame, 메타) — 저장된 스냅샷이 없으면 (빈 DF, None)"""
+    meta = latest_snapshot_meta(url)
+    if meta is None:
+        return pd.DataFrame(), None
+    return load_snapshot(meta["id"], url), meta
+
+# ---------------------------------------------------------
+# 선박 제원 마스터 (길이/폭)
+# ---------------------------------------------------------
+def vessel_key(name) -> str:
+    return str(name).strip().lower()
+
+def lookup_vessels(names, neg_ttl_sec: float = VESSEL_NEG_TTL_SEC, url: str | None = None) -> dict:
+    """
+    이름 목록을 한 번에 조회 → {name_key: (L, B)}
+      - 값이 있는 항목은 항상 반환
+      - (None, None) 항목은 neg_ttl_sec 이내에 기록된 것만 반환(지나면 미스 → 재조회 대상)
+    """
+    keys = sorted({vessel_key(n) for n in names if str(n).strip()})
+    if not keys:
+        return {}
+    cutoff = datetime.now() - pd.Timedelta(seconds=neg_ttl_sec)
+    out = {}
+    eng = get_engine(url)
+    with eng.connect() as con:
+        for i in range(0, len(keys), _SQL_CHUNK):
+            rows = con.execute(
+                select(vessels.c.name_key, vessels.c.length_m, vessels.c.beam_m, vessels.c.updated_at)
+                .where(vessels.c.name_key.in_(keys[i:i + _SQL_CHUNK]))
+            )
+            for k, L, B, ts in rows:
+                if L is None and B is None and ts < cutoff:
+                    continue
+                out[k] = (L, B)
+    return out
+
+def upsert_vessels(records, source: str = "vesselfinder", url: str | None = None) -> int:
+    """records: [{"name", "length_m", "beam_m"}] → 이름 기준 upsert, 반영 건수 반환"""
+    now = datetime.now()
+    rows = {}
+    for r in records:
+        name = str(r.get("name", "")).strip()
+        if not name:
+            continue
+        L, B = r.get("length_m"), r.get("beam_m")
+        rows[vessel_key(name)] = {
+            "name_key": vessel_key(name), "name": name,
+            "length_m": None if L is None or pd.isna(L) else float(L),
+            "beam_m": None if B is None or pd.isna(B) else float(B),
+            "source": source, "updated_at": now,
+        }
+    if not rows:
+        return 0
+    eng = get_engine(url)
+    with eng.begin() as con:
+        vals = list(rows.values())
+        for i in range(0, len(vals), _SQL_CHUNK // 8):
+            stmt = sqlite_insert(vessels).values(vals[i:i + _SQL_CHUNK // 8])
+            con.execute(stmt.on_conflict_do_update(
+                index_elements=[vessels.c.name_key],
+                set_={c: stmt.excluded[c] for c in ("name", "length_m", "beam_m", "source", "updated_at")},
+            ))
+    return len(rows)
+
+def import_vessels_csv(path: str, url: str | None = None) -> int:
+    """
+    알려진 선박 제원 CSV 일괄 등록
+      컬럼: 선박명|name|vessel, Length(m)|length|length_m, Beam(m)|beam|beam_m
+    """
+    df = pd.read_csv(path)
+
+    def pick(*cands):
+        return next((c for c in cands if c in df.columns), None)
+
+    c_name = pick("선박명", "name", "vessel")
+    c_len = pick("Length(m)", "length", "length_m")
+    c_beam = pick("Beam(m)", "beam", "beam_m")
+    if c_name is None or c_len is None:
+        raise ValueError(f"{path}: 선박명/길이 컬럼을 찾을 수 없습니다.")
+    recs = [
+        {"name": r[c_name], "length_m": pd.to_numeric(r[c_len], errors="coerce"),
+         "beam_m": pd.to_numeric(r[c_beam], errors="coerce") if c_beam else None}
+        for r in df.to_dict("records")
+    ]
+    return upsert_vessels(recs, source="import", url=url)
+
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="선석 DB 관리")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    p_imp = sub.add_parser("import-vessels", help="선박 제원 CSV 일괄 등록")
+    p_imp.add_argument("csv")
+    args = ap.parse_args()
+    if args.cmd == "import-vessels":
+        print(f"{import_vessels_csv(args.csv)}척 등록")
@@ -0,0 +1,79 @@
+# =========================
+# tests/test_allocator.py
+# =========================
+# 자동 배정: 풀 수 있는 계획이면 validate_df 규칙을 다 만족하는 결과(valid)여야 함
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import OccupancyIndex, validate_df, compact_dtypes, MIN_CLEARANCE_M, SND_BERTHS, GAM_BERTHS  # noqa: E402
+from allocator import allocate, berth_band  # noqa: E402
+
+T0 = datetime(2025, 10, 27, 0, 0)
+
+def _frame(rows) -> pd.DataFrame:
+    df = pd.DataFrame(rows).sort_values("start", kind="stable").reset_index(drop=True)
+    df.insert(0, "row_id", range(len(df)))
+    df["bp"] = (df["f"] + df["e"]) / 2.0
+    df["y_m"] = df["bp"]
+    return compact_dtypes(df)
+
+def _vessel(i, t, b, s_h, dur_h, L, dy=0.0):
+    b0, b1 = berth_band(t, b)
+    f = (b0 + b1) / 2.0 - L / 2.0 + dy
+    return {"terminal": t, "berth": b, "vessel": f"VESSEL {i}", "voyage": f"V{i:04d}",
+            "start": T0 + timedelta(hours=s_h), "end": T0 + timedelta(hours=s_h + dur_h), "f": f, "e": f + L}
+
+def _schedule(days: int, seed: int, overlap: bool) -> pd.DataFrame:
+    """선석별로 이어지는 입항 + 계획 위치 흔들림(이웃 선석과 이격 위반) — overlap=False면 같은 선석 시간 중첩 없음"""
+    rnd = random.Random(seed)
+    rows = []
+    for t, berths in (("SND", sorted(SND_BERTHS)), ("GAM", sorted(GAM_BERTHS))):
+        for b in berths:
+            s = rnd.randrange(0, 10)
+            while s < days * 24:
+                dur = rnd.randrange(10, 30)
+                rows.append(_vessel(len(rows), t, b, s, dur, float(rnd.randrange(140, 260, 10)), rnd.uniform(-60, 60)))
+                s += dur + (rnd.randrange(-3, 8) if overlap else rnd.randrange(1, 8))
+    return _frame(rows)
+
+def _quay_conflicts(df: pd.DataFrame) -> int:
+    occ = OccupancyIndex(df)
+    return sum(len(occ.conflicts(rid, MIN_CLEARANCE_M)) for rid in occ.rects) // 2
+
+def _assert_valid(df: pd.DataFrame, out: pd.DataFrame, rep: dict):
+    assert rep["valid"], rep
+    assert rep["unplaced"] == [] and rep["berth_overlaps"] == []
+    assert validate_df(out) == []
+    assert _quay_conflicts(out) == 0
+    assert len(out) == len(df) and list(out["row_id"]) == list(df["row_id"])
+    for t, b, f, e in zip(out["terminal"], out["berth"], out["f"], out["e"]):
+        b0, b1 = berth_band(t, b)
+        assert b0 <= (f + e) / 2.0 <= b1      # 가운데는 자기 선석 밴드 안
+
+def test_position_only_feasible_schedule_is_valid():
+    df = _schedule(days=5, seed=1, overlap=False)
+    assert _quay_conflicts(df) > 0                  # 입력엔 이격 위반이 있음
+    out, rep = allocate(df, allow_time_shift=False, budget_sec=0.2)
+    _assert_valid(df, out, rep)
+    assert rep["shifted"] == []
+    assert (out["start"] == df["start"]).all()
+
+def test_time_shift_clears_berth_overlaps():
+    df = _schedule(days=5, seed=2, overlap=True)
+    out, rep = allocate(df, allow_time_shift=True, budget_sec=0.2)
+    _assert_valid(df, out, rep)
+    assert (out["start"] >= df["start"]).all()      # 당기지는 않음
+
+def test_unplaced_vessel_is_reported_and_left_untouched():
+    # 같은 선석에 같은 시간 300m 두 척(시간 이동 없음) → 밴드 안에 둘 다는 못 놓음, 못 놓은 행은 그대로
+    df = _frame([_vessel(0, "SND", 2, 0, 20, 300.0), _vessel(1, "SND", 2, 1, 20, 300.0)])
+    out, rep = allocate(df, allow_time_shift=False, budget_sec=0.1)
+    assert not rep["valid"]
+    assert len(rep["unplaced"]) == 1
+    rid = rep["unplaced"][0]
+    pd.testing.assert_frame_equal(out[out["row_id"] == rid], df[df["row_id"] == rid])
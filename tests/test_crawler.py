@@ -0,0 +1,109 @@
+# =========================
+# tests/test_crawler.py
+# =========================
+# 조회 계획: 넓은 기간 캐시를 잘라 낸 결과 = 좁은 기간을 직접 받은 결과
+#  - 사이트 응답은 bench/http_fixtures 형식의 녹화본(ReplayAdapter)으로 재생
+#  - 사이트가 기간을 입항/출항/구간 겹침 중 무엇으로 거르든 같아야 함
+#  - BPTC_FIXTURES=<실제 녹화 디렉터리>가 있으면 그 녹화본으로도 확인
+import os
+import sys
+import json
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import crawler  # noqa: E402
+from bench.http_fixtures import ReplayAdapter, fixture_path, use_adapter  # noqa: E402
+
+HEADERS = ["선석", "모선항차", "선사", "선박명", "접안", "입항 예정일시", "작업완료 일시", "출항일시", "항로"]
+TODAY = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+# 사이트가 기간(오늘 00:00 ~ 마감)을 거를 수 있는 방식들
+SITE_RULES = {
+    "start": lambda s, e, cut: s < cut,
+    "end": lambda s, e, cut: e < cut,
+    "overlap": lambda s, e, cut: s < cut and e > TODAY,
+}
+
+def _row(i, start_h, stay_h):
+    s = TODAY + timedelta(hours=start_h)
+    e = s + timedelta(hours=stay_h)
+    f = lambda t: t.strftime("%Y/%m/%d %H:%M")   # noqa: E731
+    return [f"({i % 5 + 1})", f"SHP{i:04d}-001", "HMM", f"VESSEL {i}", "좌현", f(s), f(e), f(e), "ASIA"], s, e
+
+def _page(rows) -> bytes:
+    head = "".join(f"<th>{h}</th>" for h in HEADERS)
+    body = "".join("<tr>" + "".join(f"<td>{c}</td>" for c in r) + "</tr>" for r in rows)
+    return f"<html><body><table><tr>{head}</tr>{body}</table></body></html>".encode("euc-kr")
+
+def _record(root, v_time, body: bytes, berth="A", route="ALL"):
+    req = requests.Request("POST", crawler.BERTH_STATUS_URL,
+                           data=crawler._berth_status_payload(v_time, route, berth)).prepare()
+    path = fixture_path(root, req)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".html", "wb") as fh:
+        fh.write(body)
+    with open(path + ".json", "w", encoding="utf-8") as fh:
+        json.dump({"status": 200, "reason": "OK", "headers": {}, "encoding": "euc-kr", "elapsed": 0.0}, fh)
+
+def _site(root, rows, rule):
+    """2week 표 + 좁은 기간 표들을 rule대로 걸러 녹화"""
+    for v_time, days in crawler.WINDOW_DAYS.items():
+        cut = TODAY + timedelta(days=days)
+        _record(root, v_time, _page([r for r, s, e in rows if SITE_RULES[rule](s, e, cut)]))
+
+def _sliced_and_direct(root, v_time):
+    ad = ReplayAdapter(root, latency=0.0)
+    with use_adapter(ad, isolate=True):
+        crawler.get_berth_status("2week", force_refresh=True)
+        before = ad.hits
+        sliced = crawler.get_berth_status(v_time)
+        planned = ad.hits == before          # 네트워크 없이 캐시를 잘라 답했는지
+        direct = crawler.get_berth_status(v_time, force_refresh=True)
+    assert not ad.misses
+    return sliced, direct, planned
+
+@pytest.mark.parametrize("rule", sorted(SITE_RULES))
+def test_slice_matches_direct_fetch(tmp_path, rule):
+    # 마감에 걸치는 선박 없음(창 안에서 끝나거나 마감 뒤에 시작) → 잘라서 답함
+    rows = [_row(i, h, 10) for i, h in enumerate([2, 30, 60, 100, 170, 200, 250, 320])]
+    _site(tmp_path, rows, rule)
+    for v_time in ["oneday", "3days", "1week"]:
+        sliced, direct, planned = _sliced_and_direct(str(tmp_path), v_time)
+        assert planned
+        pd.testing.assert_frame_equal(sliced, direct)
+
+@pytest.mark.parametrize("rule", sorted(SITE_RULES))
+def test_straddling_vessel_falls_back_to_direct_fetch(tmp_path, rule):
+    # 3days 마감(72h)에 걸친 선박: 입항은 창 안, 출항은 창 밖 → 사이트 규칙에 따라 답이 갈리므로 직접 조회
+    rows = [_row(0, 5, 10), _row(1, 65, 20), _row(2, 100, 10)]
+    _site(tmp_path, rows, rule)
+    sliced, direct, planned = _sliced_and_direct(str(tmp_path), "3days")
+    assert not planned
+    pd.testing.assert_frame_equal(sliced, direct)
+
+def test_route_is_not_sliced_from_all():
+    assert all(r == "GAM" for _, r in crawler._covering_queries("3days", "GAM"))
+    assert crawler._covering_queries("2week", "ALL") == []
+
+def test_unreadable_times_are_not_sliced():
+    df = pd.DataFrame([_row(0, 5, 10)[0], _row(1, 30, 10)[0]], columns=HEADERS)
+    df.loc[1, "출항일시"] = "미정"
+    assert crawler._slice_berth_table(df, "3days", "2week") is None
+
+@pytest.mark.skipif(not os.environ.get("BPTC_FIXTURES"), reason="실제 녹화본 없음(BPTC_FIXTURES)")
+@pytest.mark.parametrize("v_time", ["oneday", "3days", "1week"])
+def test_slice_matches_recorded_fixture(v_time):
+    root = os.environ["BPTC_FIXTURES"]
+    ad = ReplayAdapter(root, latency=0.0)
+    with use_adapter(ad, isolate=True):
+        wide = crawler.get_berth_status("2week", force_refresh=True)
+        direct = crawler.get_berth_status(v_time, force_refresh=True)
+    if ad.misses:
+        pytest.skip(f"{v_time}/2week 녹화본 없음")
+    sliced = crawler._slice_berth_table(wide, v_time, "2week")
+    if sliced is not None:
+        pd.testing.assert_frame_equal(sliced, direct)
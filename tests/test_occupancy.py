@@ -0,0 +1,75 @@
+# =========================
+# tests/test_occupancy.py
+# =========================
+# 점유 색인(시간 칸 분할) 질의 = 전수 검사, ValidationCache(색인 질의) = validate_df
+import os
+import sys
+import random
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from schema import OccupancyIndex, ValidationCache, validate_df, compact_dtypes  # noqa: E402
+
+T0 = pd.Timestamp(datetime(2025, 10, 27))
+
+def _frame(n: int, seed: int) -> pd.DataFrame:
+    rnd = random.Random(seed)
+    rows = []
+    for i in range(n):
+        t = rnd.choice(["SND", "GAM"])
+        s = T0 + timedelta(minutes=rnd.randrange(0, 10 * 24 * 60, 10))
+        f = float(rnd.randrange(0, 1100))
+        rows.append({"row_id": i, "terminal": t, "berth": rnd.choice([1, 2, 3]) if t == "SND" else rnd.choice([6, 7]),
+                     "start": s, "end": s + timedelta(hours=rnd.randrange(1, 60)),
+                     "f": f, "e": f + rnd.randrange(120, 340), "y_m": float(rnd.randrange(0, 1400))})
+    return compact_dtypes(pd.DataFrame(rows))
+
+def _brute(occ, key, a, b, y0=None, y1=None, clearance=0.0):
+    a, b = a.value, b.value
+    out = []
+    for rid, (k, s, e, r0, r1) in occ.rects.items():
+        if k != key or not (s < b and e > a):
+            continue
+        if y0 is not None:
+            gap = max(y0 - r1, r0 - y1)
+            if (gap >= clearance) if clearance > 0 else (gap > 0):
+                continue
+        out.append(rid)
+    return sorted(out, key=lambda r: (occ.rects[r][1], r))
+
+def test_query_matches_brute_force_through_updates():
+    df = _frame(300, seed=0)
+    occ = OccupancyIndex(df)
+    rnd = random.Random(1)
+    for _ in range(200):
+        lab = rnd.choice(list(df.index))
+        df.loc[lab, "end"] = df.loc[lab, "start"] + timedelta(hours=rnd.randrange(1, 500))   # 아주 긴 체류도 섞음
+        df.loc[lab, "f"] = float(rnd.randrange(0, 1100))
+        occ.update_rows(df, [lab])
+        a = T0 + timedelta(minutes=rnd.randrange(0, 12 * 24 * 60))
+        b = a + timedelta(hours=rnd.choice([1, 24, 400]))
+        y = rnd.uniform(0, 1400)
+        for key in ("SND", "GAM"):
+            assert occ.query(key, a, b) == _brute(occ, key, a, b)
+            assert occ.query(key, a, b, y, y + 200, clearance=30) == _brute(occ, key, a, b, y, y + 200, 30)
+    fresh = OccupancyIndex(df)
+    assert fresh.rects == occ.rects and fresh.buckets == occ.buckets
+
+def test_validation_cache_matches_validate_df():
+    df = _frame(200, seed=2)
+    df.loc[df.index[3], "y_m"] = np.nan
+    df.loc[df.index[10:40], "terminal"] = ""          # 터미널 미상도 validate_df는 한 그룹으로 검사
+    cache = ValidationCache()
+    assert cache.update(df) == validate_df(df)
+    rnd = random.Random(3)
+    for _ in range(40):
+        df = df.copy()
+        lab = rnd.choice(list(df.index))
+        df.loc[lab, "y_m"] = float(rnd.randrange(0, 1400))
+        df.loc[lab, "start"] = df.loc[lab, "start"] + timedelta(hours=rnd.randrange(-10, 10))
+        assert cache.update(df) == validate_df(df)
+    assert cache.stats["incremental"] > 0
+    assert any(p[0] == "clearance" for p in validate_df(df))
@@ -0,0 +1,139 @@
+# =========================
+# tests/test_schema.py
+# =========================
+# 회귀: 열 단위로 바꾼 정규화/검증/동기화 = 기준 커밋(BASELINE)의 원래 구현
+#  - normalize_df: 값은 같고 dtype만 규약(compact_dtypes)대로 → _legacy_dtypes로 되돌려 비교
+#  - validate_df / ValidationCache(부분 재검사): 문제 목록이 순서까지 같음
+#  - sync_raw_with_norm(전체/편집 행만): 값이 같음(원본 열 dtype 유지는 의도된 차이라 dtype은 안 봄)
+import os
+import sys
+import random
+import types
+import subprocess
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import schema  # noqa: E402
+
+BASELINE = "4473cc2"
+
+@pytest.fixture(scope="module")
+def base():
+    """기준 커밋의 schema.py를 별도 모듈로 (git 이력이 없으면 건너뜀)"""
+    try:
+        src = subprocess.check_output(["git", "show", f"{BASELINE}:schema.py"], cwd=ROOT, stderr=subprocess.DEVNULL)
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip(f"기준 커밋 {BASELINE} 없음")
+    mod = types.ModuleType("schema_baseline")
+    exec(compile(src, "schema_baseline.py", "exec"), mod.__dict__)
+    return mod
+
+T0 = datetime(2025, 10, 27)
+
+def _raw(n: int = 240, seed: int = 0) -> pd.DataFrame:
+    """
+    크롤러/엑셀 업로드 원본 흉내
+      - 선석: "(3)" 꼴 + 범위 밖/빈 값, 같은 선석에 시간·위치가 겹치는 선박 다수
+      - 시각: '/', '.', 한글 단위, 빈 값/대시, 엑셀 직렬값, Timestamp가 섞인 열
+      - bp/f/e: 숫자 문자열 + 빈 값
+    """
+    rnd = random.Random(seed)
+    fmts = ["%Y/%m/%d %H:%M", "%Y.%m.%d %H:%M", "%Y년 %m월 %d일 %H시 %M분", "%Y-%m-%d %H:%M"]
+    rows = []
+    for i in range(n):
+        b = rnd.choice([1, 2, 3, 4, 5, 6, 7, 8, 9] * 3 + [0, 12])
+        s = T0 + timedelta(minutes=rnd.randrange(0, 4 * 24 * 60, 10))
+        e = s + timedelta(hours=rnd.randrange(-2, 40))     # 음수: 시작/종료 시간 오류
+        bp = rnd.randrange(0, 45) * 30 + rnd.choice([0, 0, 7.5, 15])
+        kind = rnd.random()
+        if kind < 0.05:
+            start = rnd.choice(["", "-", "N/A", None])
+        elif kind < 0.1:
+            start = pd.Timestamp(s)
+        elif kind < 0.13:
+            start = (pd.Timestamp(s) - pd.Timestamp("1899-12-30")) / pd.Timedelta(days=1)
+        else:
+            start = s.strftime(rnd.choice(fmts))
+        rows.append({
+            "선석": f"({b})" if b else "",
+            "모선항차": f"SHP{i:04d}-{rnd.randrange(100):03d}",
+            "선사": rnd.choice(["HMM", "MSC", "ONE"]),
+            "선박명": f" VESSEL {i} ",
+            "접안": rnd.choice(["좌현", "우현", ""]),
+            "입항 예정일시": start,
+            "출항일시": e.strftime(rnd.choice(fmts)) if rnd.random() > 0.03 else "",
+            "구분": rnd.choice(["수출", "수입", ""]),
+            "검역": rnd.choice(["완료", ""]),
+            "bp": str(bp) if rnd.random() > 0.1 else "",
+            "f": str(bp - 120) if rnd.random() > 0.1 else "",
+            "e": str(bp + 150),
+            "항로": "ASIA",
+        })
+    return schema.ensure_row_id(pd.DataFrame(rows))
+
+def _edited(norm: pd.DataFrame, seed: int = 1):
+    """정규화 프레임에서 일부 행을 드래그/키보드 편집한 것처럼 (편집된 row_id 함께)"""
+    rnd = random.Random(seed)
+    out = norm.copy()
+    rids = rnd.sample(list(out["row_id"]), 25)
+    for rid in rids:
+        m = out["row_id"] == rid
+        dmin = timedelta(minutes=rnd.randrange(-120, 120, 5))
+        out.loc[m, "start"] = out.loc[m, "start"] + dmin
+        out.loc[m, "end"] = out.loc[m, "end"] + dmin
+        out.loc[m, "bp"] = out.loc[m, "bp"] + rnd.choice([-30.0, 30.0])
+    return out, set(rids)
+
+def _assert_same_values(a: pd.DataFrame, b: pd.DataFrame):
+    pd.testing.assert_frame_equal(a.astype(object).where(a.notna(), None),
+                                  b.astype(object).where(b.notna(), None), check_dtype=False)
+
+def test_normalize_matches_baseline(base):
+    raw = _raw()
+    new, old = schema.normalize_df(raw), base.normalize_df(raw)
+    assert new["terminal"].dtype == schema.TERMINAL_DTYPE and new["berth"].dtype == schema.BERTH_DTYPE
+    old = old.assign(start=pd.to_datetime(old["start"]), end=pd.to_datetime(old["end"]))
+    pd.testing.assert_frame_equal(schema._legacy_dtypes(new), old)
+
+def test_validate_matches_baseline(base):
+    for seed in range(5):
+        raw = _raw(seed=seed)
+        old = base.validate_df(base.normalize_df(raw))
+        assert any(p[0] == "clearance" for p in old) and any(p[0] == "overlap" for p in old)
+        norm = schema.normalize_df(raw)
+        assert schema.validate_df(norm) == old
+        assert schema.validate_df(schema._legacy_dtypes(norm)) == old
+        assert schema.ValidationCache().update(norm) == old
+
+def test_validation_cache_after_edits_matches_baseline(base):
+    norm = schema.ensure_row_id(schema.normalize_df(_raw(seed=3)))
+    cache = schema.ValidationCache()
+    cache.update(norm)
+    edited, _ = _edited(norm, seed=4)
+    edited["y_m"] = edited["bp"].fillna(0).astype(schema.METER_DTYPE)
+    assert cache.update(edited) == base.validate_df(schema._legacy_dtypes(edited))
+    assert cache.stats["incremental"] > 0
+
+def test_sync_raw_matches_baseline(base):
+    raw = _raw(seed=5)
+    edited, rids = _edited(schema.ensure_row_id(schema.normalize_df(raw)), seed=6)
+    old = base.sync_raw_with_norm(raw, schema._legacy_dtypes(edited))
+    _assert_same_values(schema.sync_raw_with_norm(raw, edited), old)
+    # 편집 행만: 그 행은 기준 구현과 같고 나머지 행은 원본 그대로
+    part = schema.sync_raw_with_norm(raw, edited, row_ids=rids)
+    hit = raw["row_id"].isin(rids)
+    _assert_same_values(part[hit], old[hit])
+    _assert_same_values(part[~hit], raw[~hit])
+
+def test_sync_keeps_raw_dtypes():
+    raw = _raw(seed=7).assign(bp=lambda d: pd.to_numeric(d["bp"], errors="coerce").fillna(0).astype("int64"))
+    edited, rids = _edited(schema.ensure_row_id(schema.normalize_df(raw)), seed=8)
+    out = schema.sync_raw_with_norm(raw, edited, row_ids=rids)
+    assert out["bp"].dtype == np.int64
+    changed = out["row_id"].isin(rids)
+    assert (out.loc[changed, "bp"].to_numpy() == edited.set_index("row_id").loc[out.loc[changed, "row_id"], "bp"].to_numpy()).all()
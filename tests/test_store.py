@@ -0,0 +1,38 @@
+# =========================
+# tests/test_store.py
+# =========================
+# 스냅샷 저장/복원: 키 중복 행도 버리지 않고, 과거 스냅샷은 저장 당시 본문으로 복원
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from store import save_snapshot, load_snapshot  # noqa: E402
+
+def _raw(berths) -> pd.DataFrame:
+    return pd.DataFrame({
+        "모선항차": ["A-1", "B-1", "A-1"], "선박명": ["X", "Y", "X"], "선석": berths,
+        "입항 예정일시": ["2026/10/17 10:00"] * 3, "row_id": [0, 1, 2],
+    })
+
+def test_duplicate_voyage_rows_round_trip(tmp_path):
+    url = f"sqlite:///{tmp_path / 'berth.sqlite'}"
+    raw = _raw(["(1)", "(2)", "(3)"])     # 같은 모선항차가 선석을 바꿔 두 번
+    sid = save_snapshot(raw, url=url)
+    pd.testing.assert_frame_equal(load_snapshot(sid, url=url), raw.drop(columns="row_id"))
+
+def test_old_snapshot_keeps_its_own_bodies(tmp_path):
+    url = f"sqlite:///{tmp_path / 'berth.sqlite'}"
+    old, new = _raw(["(1)", "(2)", "(3)"]), _raw(["(1)", "(4)", "(3)"])
+    s1 = save_snapshot(old, url=url)
+    s2 = save_snapshot(new, url=url)
+    pd.testing.assert_frame_equal(load_snapshot(s1, url=url), old.drop(columns="row_id"))
+    pd.testing.assert_frame_equal(load_snapshot(s2, url=url), new.drop(columns="row_id"))
+
+def test_large_crawl_is_chunked(tmp_path):
+    url = f"sqlite:///{tmp_path / 'berth.sqlite'}"
+    raw = pd.DataFrame({"모선항차": [f"V{i:05d}" for i in range(3000)], "선박명": "S",
+                        "선석": "(1)", "입항 예정일시": "2026/10/17 10:00"})
+    sid = save_snapshot(raw, url=url)
+    pd.testing.assert_frame_equal(load_snapshot(sid, url=url), raw)
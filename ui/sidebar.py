@@ -2,6 +2,7 @@
 # ui/sidebar.py
 # =========================
 import streamlit as st
+from cache import cache_stats
 
 def _init_state():
     if "show_direct" not in st.session_state:
@@ -25,11 +26,17 @@ def build_sidebar():
         # ---------------------------------------------------------
         st.subheader("A) 크롤러 조회/시각화")
         add_dims = st.toggle("VesselFinder 길이/폭 포함 (느릴 수 있음)", value=False)
+        force_refresh = st.toggle("캐시 무시(강제 새로고침)", value=False,
+                                  help="끄면 최근 응답을 로컬 캐시에서 재사용합니다.")
         col = st.columns(2)
         with col[0]:
             run_crawl = st.button("조회하기 🚢", use_container_width=True)
         with col[1]:
             run_viz_crawl = st.button("시각화 하기 📊", use_container_width=True)
+        cs = cache_stats()
+        hits = sum(v["hits"] for v in cs["shared"].values())
+        misses = sum(v["misses"] for v in cs["shared"].values())
+        st.caption(f"응답 캐시: 적중 {hits} / 미스 {misses} · {cs['entries']}건 ({cs['bytes'] / 1024:.0f}KB)")
 
         # ---------------------------------------------------------
         # (B) 토글 버튼: '직접 파일 넣기' 섹션 열기/닫기
@@ -105,6 +112,7 @@ def build_sidebar():
     # 컨트롤 값 반환
     return {
         "add_dims": add_dims,
+        "force_refresh": force_refresh,
         "run_crawl": run_crawl,
         "run_viz_crawl": run_viz_crawl,
         "origin_file": origin_file,
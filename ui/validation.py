@@ -3,16 +3,24 @@
 # =========================
 import streamlit as st
 import pandas as pd
-from schema import validate_df
+from schema import validate_df, ValidationCache
 
 # ---------------------------------------------------------
 # 유효성 표시
 #  - visible=False 이면 아무것도 렌더하지 않음(데이터는 반환)
 #  - location="본문(접기)" → 본문 expander에 상세
 #  - location="사이드바(요약)" → 사이드바에 개수와 일부만
+#  - cache_key를 주면 세션에 ValidationCache를 두고 바뀐 선석 그룹만 다시 검사
 # ---------------------------------------------------------
-def show_validation(name: str, df: pd.DataFrame, visible: bool = True, location: str = "본문(접기)"):
-    probs = validate_df(df)
+def show_validation(name: str, df: pd.DataFrame, visible: bool = True, location: str = "본문(접기)",
+                    cache_key: str | None = None):
+    if cache_key is None:
+        probs = validate_df(df)
+    else:
+        cache = st.session_state.get(cache_key)
+        if cache is None:
+            cache = st.session_state[cache_key] = ValidationCache()
+        probs = cache.update(df)
 
     if not visible:
         return probs
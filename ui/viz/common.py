@@ -4,7 +4,7 @@
 import pandas as pd
 import plotly.graph_objects as go
 from zoneinfo import ZoneInfo
-from schema import TIME_GRID_MIN, Y_GRID_M
+from schema import TIME_GRID_MIN, MOVE_GRID_MIN, Y_GRID_M, QUAY_LENGTH_M
 import re  # ← 추가
 
 KST = ZoneInfo("Asia/Seoul")
@@ -29,7 +29,7 @@ def period_str_kr(start: pd.Timestamp, end: pd.Timestamp) -> str:
     return f"{start:%Y년 %m월 %d일} ~ {end:%m월 %d일}"
 
 def _ymax_for_terminal(terminal: str) -> int:
-    return 1500 if terminal == "SND" else 1400
+    return QUAY_LENGTH_M["SND"] if terminal == "SND" else QUAY_LENGTH_M["GAM"]
 
 def _to_float(x, default=0.0):
     try:
@@ -294,9 +294,9 @@ def render_timeline_week(df: pd.DataFrame, terminal: str, title: str):
         ticks="outside", ticklen=6,
         hoverformat="%m-%d %H:%M",
         gridcolor="rgba(0,0,0,0.08)",
-        title=f"Time (KST) — snap {TIME_GRID_MIN}min",
+        title=f"Time (KST) — snap {MOVE_GRID_MIN}min",
         minor=dict(
-            dtick=1000 * 60 * 10, showgrid=True,
+            dtick=1000 * 60 * TIME_GRID_MIN, showgrid=True,
             gridcolor="rgba(0,0,0,0.06)", ticklen=3
         ),
     )
@@ -4,13 +4,15 @@
 import json
 import pandas as pd
 import streamlit as st
-import math  # ✅ 추가
 from string import Template     # ✅ f-string 대신 사용
 
 from streamlit import components
 from streamlit_js_eval import streamlit_js_eval
 from ui.viz.common import render_timeline_week, period_str_kr
-from schema import snap_time_5min, snap_y_30m, MIN_CLEARANCE_M, validate_df
+from schema import shift, MOVE_GRID_MIN, Y_GRID_M, MIN_CLEARANCE_M, ValidationCache, OccupancyIndex
+from allocator import allocate
+
+AUTO_ALLOC_BUDGET_SEC = 0.5   # 자동 배정 지역 탐색 시간 예산(초)
 
 # ---- 읽기전용 그리기 함수-----
 def _plotly_scroll(fig_html: str, height: int = 600, min_width_px: int = 2400):
@@ -51,6 +53,8 @@ def _init_edit_buffers(df_norm: pd.DataFrame):
         st.session_state["orig_df_snapshot"] = df_norm.copy()
     if "undo_df" not in st.session_state:
         st.session_state["undo_df"] = None
+    if "undo_loglen" not in st.session_state:
+        st.session_state["undo_loglen"] = None
     if "selected_row_id" not in st.session_state:
         st.session_state["selected_row_id"] = None
     if "edit_logs" not in st.session_state:
@@ -74,92 +78,49 @@ def _append_log(before, after):
         "ts": pd.Timestamp.now()
     })
 
-
-# ---------- 이동 스냅(5분/30m) ----------
-def _move_time_5min(row: pd.Series, minutes: int) -> dict:
-    s = snap_time_5min(row["start"] + pd.Timedelta(minutes=minutes))
-    e = snap_time_5min(row["end"]   + pd.Timedelta(minutes=minutes))
-    return {"start": s, "end": e}
-
-def _move_y_30m(row: pd.Series, dy: float) -> dict:
-    f0, e0 = float(row.get("f",0)), float(row.get("e",0))
-    L = e0 - f0
-    mid = (f0 + e0) / 2.0
-    new_mid = snap_y_30m(mid + dy)
-    return {"f": new_mid - abs(L)/2, "e": new_mid + abs(L)/2}
-
-def _is_finite_num(x) -> bool:
-    try:
-        v = float(x)
-        return not (math.isnan(v) or math.isinf(v))
-    except Exception:
-        return False
-
-def _ts_equal(a, b) -> bool:
-    if pd.isna(a) and pd.isna(b):
-        return True
-    if pd.isna(a) or pd.isna(b):
-        return False
-    return pd.Timestamp(a).value == pd.Timestamp(b).value
-
-def _num_equal(a, b, eps=1e-6) -> bool:
-    if not _is_finite_num(a) and not _is_finite_num(b):
-        return True
-    if not _is_finite_num(a) or not _is_finite_num(b):
-        return False
-    return abs(float(a) - float(b)) < eps
-
-def _apply_move(df: pd.DataFrame, row_id: int, dmin=0, dy=0.0) -> pd.DataFrame:
-    out = df.copy()
-    idx_arr = out.index[out["row_id"] == row_id]
-    if len(idx_arr) == 0:
-        return out
-    idx = idx_arr[0]
-    row = out.loc[idx]
-
-    # 기존 값
-    s0, e0 = row.get("start"), row.get("end")
-    f0, e1 = row.get("f"), row.get("e")
-
-    # 후보 값(초기엔 기존값)
-    s1, e2 = s0, e0
-    f1, e3 = f0, e1
-
-    changed = False
-
-    # 시간 이동 (start/end가 유효할 때만)
-    if dmin != 0 and (pd.notna(s0) and pd.notna(e0)):
-        s1 = snap_time_5min(pd.to_datetime(s0) + pd.Timedelta(minutes=dmin))
-        e2 = snap_time_5min(pd.to_datetime(e0) + pd.Timedelta(minutes=dmin))
-        if (not _ts_equal(s0, s1)) or (not _ts_equal(e0, e2)):
-            changed = True
-
-    # 세로 이동 (f/e가 유효할 때만)
-    if dy != 0 and _is_finite_num(f0) and _is_finite_num(e1):
-        L = float(e1) - float(f0)
-        if _is_finite_num(L) and abs(L) > 0:
-            mid = (float(f0) + float(e1)) / 2.0
-            new_mid = snap_y_30m(mid + float(dy))
-            f1 = new_mid - abs(L) / 2.0
-            e3 = new_mid + abs(L) / 2.0
-            if (not _num_equal(f0, f1)) or (not _num_equal(e1, e3)):
-                changed = True
-
-    # 실제 변화 없으면 그대로 반환(로그 없음)
-    if not changed:
-        return out
-
-    before = dict(row)
-    out.at[idx, "start"] = s1
-    out.at[idx, "end"] = e2
-    out.at[idx, "f"] = f1
-    out.at[idx, "e"] = e3
-    after = dict(out.loc[idx])
-
-    _append_log(before, after)       # ✅ 진짜 바뀐 경우에만
+def _save_undo_point(df: pd.DataFrame):
+    """
+    되돌리기 지점 저장: 편집 전 DataFrame + 그 시점 로그 길이
+      - 한 번의 조작(여러 행 이동/자동 배정)이 남긴 로그는 되돌리기 1회에 함께 지움
+      - 로그를 쓰기 전에 호출
+    """
     st.session_state["undo_df"] = df.copy()
+    st.session_state["undo_loglen"] = len(st.session_state["edit_logs"])
+
+# ---------- 이동(스냅은 schema.shift) ----------
+def _apply_move(df: pd.DataFrame, row_ids, dmin=0, dy=0.0) -> pd.DataFrame:
+    """
+    키보드/드래그/Shift+클릭 공통 이동 → schema.shift로 일괄 스냅
+      row_ids: row_id 1개 또는 여러 개
+      - 실제로 바뀐 행마다 로그 1건, 하나라도 바뀌면 되돌리기 지점 저장(로그 묶음 = 되돌리기 1회)
+    """
+    out, moved = shift(df, row_ids, dmin=dmin, dy=dy)
+    if len(moved) == 0:
+        return out       # 실제 변화 없으면 그대로(로그 없음)
+
+    _edit_occupancy().update_rows(out, moved)   # 옮긴 행만 점유 색인 갱신
+
+    _save_undo_point(df)
+    for idx in moved:
+        _append_log(dict(df.loc[idx]), dict(out.loc[idx]))
     return out
 
+def _auto_allocate(df: pd.DataFrame, terminal: str, allow_time_shift: bool = False):
+    """
+    terminal 선박 자동 배정(allocator.allocate) → (새 DataFrame, 보고서)
+      - 바뀐 행마다 로그 1건, 하나라도 바뀌면 되돌리기 지점 저장(이동과 같은 규칙, 되돌리기 1회에 전부 취소)
+    """
+    out, rep = allocate(df, terminal=terminal, allow_time_shift=allow_time_shift, budget_sec=AUTO_ALLOC_BUDGET_SEC)
+    changed = out.index[out["row_id"].isin(set(rep["moved"]) | set(rep["shifted"]))]
+    if len(changed) == 0:
+        return out, rep
+
+    _save_undo_point(df)
+    for idx in changed:
+        _append_log(dict(df.loc[idx]), dict(out.loc[idx]))
+    _edit_occupancy().update_rows(out, changed)
+    return out, rep
+
 # ---------- HTML wrapper: (키, 클릭) 수집 ----------
 def _plotly_scroll_interactive(fig_html: str, terminal: str, height: int = 600, min_width_px: int = 2400):
     key_ns = "viz_key"
@@ -263,8 +224,8 @@ def _plotly_scroll_interactive(fig_html: str, terminal: str, height: int = 600,
               const mPerPx = mSpan / rect.height;
 
               // 픽셀 이동량 → 데이터 이동량
-              let dmin = Math.round((dx * minPerPx) / 5) * 5;    // 5분 스냅
-              let dym  = Math.round((dy * mPerPx) / 30) * 30;    // 30m 스냅 (아래로 끌면 +)
+              let dmin = Math.round((dx * minPerPx) / ${tgrid}) * ${tgrid};    // 시간 스냅(MOVE_GRID_MIN)
+              let dym  = Math.round((dy * mPerPx) / ${ygrid}) * ${ygrid};    // 세로 스냅(Y_GRID_M, 아래로 끌면 +)
 
               if (dmin !== 0 || dym !== 0) {
                 setLS('${drag}', JSON.stringify({ row_id: dragState.rowId, dmin: dmin, dy: dym }));
@@ -305,15 +266,30 @@ def _plotly_scroll_interactive(fig_html: str, terminal: str, height: int = 600,
     </div>
     """)
 
-    wrapper = tpl.substitute(minw=min_width_px, html=fig_html, click=click_ns, drag=drag_ns)
+    wrapper = tpl.substitute(minw=min_width_px, html=fig_html, click=click_ns, drag=drag_ns,
+                             tgrid=MOVE_GRID_MIN, ygrid=Y_GRID_M)
     components.v1.html(wrapper, height=height+60, scrolling=True)
 
+# ---------- 편집 중 점유 색인(터미널별) ----------
+def _edit_occupancy() -> OccupancyIndex:
+    occ = st.session_state.get("edit_occupancy")
+    if occ is None:
+        occ = st.session_state["edit_occupancy"] = OccupancyIndex()
+    return occ
+
+# ---------- 편집 중 검증(그룹별 캐시) ----------
+def _edit_validation() -> ValidationCache:
+    cache = st.session_state.get("edit_validation")
+    if cache is None:
+        cache = st.session_state["edit_validation"] = ValidationCache()
+    return cache
+
 # ---------- 상호작용 렌더 ----------
 def render_origin_view(df_origin: pd.DataFrame):
     """
     - 중앙 라벨 클릭으로 선택
     - Shift+클릭: 선택된 막대를 해당 좌표로 이동(드래그-드롭 대용)
-    - 키보드: WASD/방향키 (5분/30m)
+    - 키보드: WASD/방향키 (MOVE_GRID_MIN분/Y_GRID_M m)
     - 변경은 st.session_state['edit_df']에 수행, 로그는 st.session_state['edit_logs']
     """
     _init_edit_buffers(df_origin)
@@ -322,7 +298,8 @@ def render_origin_view(df_origin: pd.DataFrame):
     df_edit = st.session_state["edit_df"]
 
     st.subheader("📊 편집 가능한 타임라인 (SND / GAM)")
-    st.caption("· 클릭: 선택  · 더블 클릭: 관점 원상 복귀  · Shift+클릭: 해당 위치로 이동(드롭)  · WASD/←↑↓→: 5분/30m 이동  · 스냅: 5분/30m  · esc: 클릭해제")
+    step = f"{MOVE_GRID_MIN}분/{Y_GRID_M}m"
+    st.caption(f"· 클릭: 선택  · 더블 클릭: 관점 원상 복귀  · Shift+클릭: 해당 위치로 이동(드롭)  · WASD/←↑↓→: {step} 이동  · 스냅: {step}  · esc: 클릭해제")
 
     tab_snd, tab_gam = st.tabs(["신선대 SND", "감만 GAM"])
 
@@ -339,6 +316,29 @@ def render_origin_view(df_origin: pd.DataFrame):
 
         # 선택 상태 배너 자리(그래프 위)
         sel_line = st.empty()
+        occ = _edit_occupancy().update(df_all)   # 바뀐 행만 다시 넣음
+
+        # 자동 배정: 겹침/이격 위반을 원래 계획에서 최소 이동으로 해소
+        c_btn, c_opt = st.columns([1, 3])
+        with c_opt:
+            allow_shift = st.checkbox("입항 시간 미루기 허용", key=f"alloc-shift-{terminal}",
+                                      help=f"안벽에 자리가 없거나 같은 선석이 겹치면 입항을 {MOVE_GRID_MIN}분 단위로 미룸")
+        with c_btn:
+            if st.button("자동 배정", key=f"alloc-{terminal}", use_container_width=True):
+                st.session_state["edit_df"], rep = _auto_allocate(st.session_state["edit_df"], terminal, allow_shift)
+                df_all = st.session_state["edit_df"]
+                df_t = df_all[df_all["terminal"] == terminal].reset_index(drop=True)
+                msg = (f"자동 배정: {rep['vessels']}척 중 위치 {len(rep['moved'])}척 · 시간 {len(rep['shifted'])}척 변경 "
+                       f"(이동 {rep['displacement_m']:.0f}m, 지연 {rep['delay_min']:.0f}분)")
+                if rep["valid"]:
+                    st.success(msg)
+                else:
+                    left = []
+                    if rep["unplaced"]:
+                        left.append(f"자리를 못 찾은 {len(rep['unplaced'])}척은 원래 자리에 그대로 둠")
+                    if rep["berth_overlaps"]:
+                        left.append(f"같은 선석 시간 중첩 {len(rep['berth_overlaps'])}척 남음(시간 미루기 허용 시 해소 시도)")
+                    st.warning(msg + " — " + ", ".join(left))
 
         # 그림 생성
         fig, (x0, x1) = render_timeline_week(df_t, terminal=terminal, title="")
@@ -364,34 +364,25 @@ def render_origin_view(df_origin: pd.DataFrame):
                 if rid is not None:
                     st.session_state["selected_row_id"] = int(rid)
 
-                # Shift+클릭 이동 (5분/30m 스냅)
+                # Shift+클릭 이동 (MOVE_GRID_MIN분/Y_GRID_M m 스냅)
                 if payload.get("shift") and rid is not None:
                     rid = int(rid)
-                    i = st.session_state["edit_df"].index[st.session_state["edit_df"]["row_id"] == rid]
-                    if len(i):
-                        idx = i[0]
-                        s = pd.to_datetime(st.session_state["edit_df"].loc[idx, "start"])
-                        e = pd.to_datetime(st.session_state["edit_df"].loc[idx, "end"])
-                        if pd.notna(s) and pd.notna(e):
-                            mid_old = s + (e - s) / 2
-                            new_x = pd.to_datetime(payload["x"])
-                            # 5분 단위로 반올림 이동량
-                            diff_min = (new_x - mid_old).total_seconds() / 60.0
-                            dmin = int(round(diff_min / 5.0) * 5)
-
-                            # y 이동 (유효할 때만)
-                            f0 = st.session_state["edit_df"].loc[idx, "f"]
-                            e0 = st.session_state["edit_df"].loc[idx, "e"]
+                    rect = occ.rects.get(rid)   # (terminal, start_ns, end_ns, y0, y1) — 시간이 없는 행은 색인에 없음
+                    if rect is not None:
+                        _, s_ns, e_ns, y0, y1 = rect
+                        mid_old = pd.Timestamp((s_ns + e_ns) // 2)
+                        new_x = pd.to_datetime(payload["x"])
+                        # MOVE_GRID_MIN 단위로 반올림 이동량
+                        diff_min = (new_x - mid_old).total_seconds() / 60.0
+                        dmin = int(round(diff_min / MOVE_GRID_MIN) * MOVE_GRID_MIN)
+
+                        # y 이동 (f/e가 없는 행은 shift가 건너뜀)
+                        try:
+                            dy = float(payload["y"]) - (y0 + y1) / 2.0
+                        except Exception:
                             dy = 0.0
-                            try:
-                                if _is_finite_num(f0) and _is_finite_num(e0):
-                                    mid_y_old = (float(f0) + float(e0)) / 2.0
-                                    new_y = float(payload["y"])
-                                    dy = new_y - mid_y_old
-                            except Exception:
-                                dy = 0.0
-
-                            st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dmin=dmin, dy=dy)
+
+                        st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dmin=dmin, dy=dy)
             except Exception:
                 pass
             # 사용 후 정리
@@ -426,13 +417,13 @@ def render_origin_view(df_origin: pd.DataFrame):
             rid = st.session_state.get("selected_row_id")
             if rid is not None:
                 if key in ["ArrowLeft","a","A"]:
-                    st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dmin=-5)
+                    st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dmin=-MOVE_GRID_MIN)
                 elif key in ["ArrowRight","d","D"]:
-                    st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dmin=+5)
+                    st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dmin=+MOVE_GRID_MIN)
                 elif key in ["ArrowUp","w","W"]:
-                    st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dy=-30.0)
+                    st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dy=-float(Y_GRID_M))
                 elif key in ["ArrowDown","s","S"]:
-                    st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dy=+30.0)
+                    st.session_state["edit_df"] = _apply_move(st.session_state["edit_df"], rid, dy=+float(Y_GRID_M))
                 elif key in ["Escape"]:
                     st.session_state["selected_row_id"] = None
 
@@ -441,13 +432,20 @@ def render_origin_view(df_origin: pd.DataFrame):
                 need_return=False, key=f"keyclear-{terminal}"
             )
 
-        # 간단 검증 경고
-        probs = validate_df(st.session_state["edit_df"])
+        # 간단 검증 경고 (이동한 행의 선석 그룹만 다시 검사)
+        probs = _edit_validation().update(st.session_state["edit_df"])
         if any(p[0] == "clearance" for p in probs):
             st.warning(f"동시간대 선박 간 최소 이격 {MIN_CLEARANCE_M}m 위반 항목이 있습니다.")
 
-        # 선택 상태 배너
+        # 선택 선박과 겹치는 선박(같은 터미널, 시간 겹침 + 안벽 이격 미만)
         rid = st.session_state.get("selected_row_id")
+        if rid is not None and occ.rects.get(rid, (None,))[0] == terminal:
+            hits = occ.conflicts(rid, clearance=MIN_CLEARANCE_M)
+            if hits:
+                names = st.session_state["edit_df"].set_index("row_id").loc[hits, "vessel"].astype(str)
+                st.warning(f"선택 선박과 안벽 {MIN_CLEARANCE_M}m 이내로 겹치는 선박: " + ", ".join(names))
+
+        # 선택 상태 배너
         msg = "선택 없음"
         if rid is not None:
             sel = st.session_state["edit_df"]